@@ -1,12 +1,238 @@
 import cv2
+import logging
 import threading
 import time
-import customtkinter as ctk
-from PIL import Image
+from PIL import Image, ImageTk
 import os
 
+log = logging.getLogger(__name__)
+
+
+def _points_bbox(points):
+    """Bounding box (x0, y0, x1, y1) of detector corner points, or None"""
+    if points is None or len(points) == 0:
+        return None
+    pts = points.reshape(-1, 2)
+    return float(pts[:, 0].min()), float(pts[:, 1].min()), float(pts[:, 0].max()), float(pts[:, 1].max())
+
+
+# 1D symbologies carry a check digit we can verify before accepting a read
+GTIN_LENGTHS = {"EAN_13": 13, "EAN_8": 8, "UPC_A": 12}
+DEFAULT_SYMBOLOGIES = ["QR", "EAN_13", "EAN_8", "UPC_A", "UPC_E", "CODE_128", "CODE_39"]
+
+
+def gtin_checksum_ok(code):
+    """Mod-10 check digit used by EAN-13, EAN-8 and UPC-A"""
+    if not code.isdigit() or len(code) < 8:
+        return False
+    digits = [int(c) for c in code]
+    total = sum(d * (3 if i % 2 == 0 else 1) for i, d in enumerate(reversed(digits[:-1])))
+    return (10 - total % 10) % 10 == digits[-1]
+
+
+def _symbology(text, kind):
+    """Normalize the detector's type; older OpenCV builds return ints, so fall back to the length"""
+    if isinstance(kind, str) and kind:
+        return kind.upper().replace("-", "_")
+    if text.isdigit():
+        return {13: "EAN_13", 8: "EAN_8", 12: "UPC_A"}.get(len(text), "UNKNOWN")
+    return "UNKNOWN"
+
+
+class SymbologyRouter:
+    """Runs the enabled decoders, most productive first, and stops at the first valid read.
+
+    ``symbologies`` (e.g. ``["EAN_13", "QR"]``, from config.json) picks
+    which codes are accepted and the initial decoder order: a pack that
+    only carries EAN-13 never pays for a QR pass. With ``adaptive`` the
+    order is re-sorted by a decayed hit count, so the decoder that has been
+    finding codes lately runs first. EAN/UPC reads must pass their check
+    digit or the next decoder is tried.
+
+    ``decoders`` is a list of ``(name, fn)``; QR symbologies route to the
+    "QR" decoder and every 1D symbology to "BARCODE".
+    """
+
+    def __init__(self, decoders, symbologies=None, adaptive=True, decay=0.9):
+        self.symbologies = [str(s).upper() for s in (symbologies or DEFAULT_SYMBOLOGIES)]
+        self.accepted = set(self.symbologies)
+        self.adaptive = adaptive
+        self.decay = decay
+
+        wanted = []
+        for sym in self.symbologies:
+            name = "QR" if sym == "QR" else "BARCODE"
+            if name not in wanted:
+                wanted.append(name)
+        available = dict(decoders)
+        self.decoders = [(name, available[name]) for name in wanted if name in available]
+        self.score = {name: 0.0 for name, _ in self.decoders}
+
+        self.attempts = {name: 0 for name, _ in self.decoders}
+        self.hits = {name: 0 for name, _ in self.decoders}
+        self.rejected = 0  # reads dropped for a bad check digit or a disabled symbology
+
+    def order(self):
+        return [name for name, _ in self.decoders]
+
+    def valid(self, text, symbology):
+        if self.accepted and symbology not in self.accepted and symbology != "UNKNOWN":
+            return False
+        if symbology in GTIN_LENGTHS:
+            return len(text) == GTIN_LENGTHS[symbology] and gtin_checksum_ok(text)
+        return True
+
+    def decode(self, gray):
+        """First valid (text, points) in decoder order, or (None, None)"""
+        found = None
+        for name, decode in self.decoders:
+            self.attempts[name] += 1
+            for result in decode(gray):
+                text, points = result[0], result[1]
+                if not text:
+                    continue
+                if not self.valid(text, _symbology(text, result[2] if len(result) > 2 else None)):
+                    self.rejected += 1
+                    continue
+                found = name, text, points
+                break
+            if found:
+                break
+
+        if self.adaptive:
+            for name in self.score:
+                self.score[name] *= self.decay
+        if not found:
+            return None, None
+
+        name, text, points = found
+        self.hits[name] += 1
+        if self.adaptive:
+            self.score[name] += 1.0
+            # Stable sort: ties keep the configured order
+            self.decoders.sort(key=lambda d: -self.score[d[0]])
+        return text, points
+
+
+class FramePipeline:
+    """Detection side of the scanner: no threads, no widgets.
+
+    Each frame is decoded on a small grayscale copy (``detect_width`` wide)
+    rather than at camera resolution. Once a code is found its region
+    (plus ``roi_margin``) is tracked and later frames only decode that
+    crop, until ``roi_max_misses`` misses in a row send it back to the
+    whole frame. ``due(now)`` paces detection: every frame while codes are
+    being found, backing off to ``max_interval`` when the camera sees
+    nothing, and never more often than the last decode took.
+
+    ``decoders`` is a list of ``(name, fn)`` where ``fn(gray)`` returns
+    ``[(text, points[, symbology])]``; they are run through a
+    SymbologyRouter built from ``symbologies`` / ``adaptive``.
+    """
+
+    def __init__(self, decoders, detect_width=640, roi_margin=0.5, roi_max_misses=5,
+                 min_interval=0.04, max_interval=0.3, symbologies=None, adaptive=True):
+        self.router = SymbologyRouter(decoders, symbologies, adaptive)
+        self.detect_width = detect_width
+        self.roi_margin = roi_margin
+        self.roi_max_misses = roi_max_misses
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.roi = None  # (x0, y0, x1, y1) in full-frame pixels
+        self._roi_misses = 0
+        self.interval = min_interval
+        self._next_due = 0.0
+
+        # Counters for tuning (see ScannerModule.stats)
+        self.frames_processed = 0
+        self.roi_frames = 0
+        self.decode_seconds = 0.0
+        self.max_decode_seconds = 0.0
+
+    def due(self, now):
+        return now >= self._next_due
+
+    def process(self, frame, now=None):
+        """Decode one BGR frame; returns the code text or None"""
+        started = time.perf_counter()
+        code = self._decode_roi(frame) if self.roi else self._decode_full(frame)
+
+        # Adaptive rate: fast while codes are in view, slower when idle
+        if code:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * 1.25)
+        latency = time.perf_counter() - started
+        self.frames_processed += 1
+        self.decode_seconds += latency
+        self.max_decode_seconds = max(self.max_decode_seconds, latency)
+        self._next_due = (time.monotonic() if now is None else now) + max(self.interval, latency)
+        return code
+
+    def _downscale(self, img):
+        h, w = img.shape[:2]
+        scale = min(1.0, self.detect_width / float(w))
+        if scale < 1.0:
+            img = cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return img, scale
+
+    def _decode(self, gray):
+        return self.router.decode(gray)
+
+    def stats(self):
+        n = self.frames_processed
+        return {
+            "frames_processed": n,
+            "roi_frames": self.roi_frames,
+            "decode_attempts": dict(self.router.attempts),
+            "decode_hits": dict(self.router.hits),
+            "rejected_reads": self.router.rejected,
+            "decoder_order": self.router.order(),
+            "avg_decode_ms": round(1000 * self.decode_seconds / n, 2) if n else 0.0,
+            "max_decode_ms": round(1000 * self.max_decode_seconds, 2),
+            "interval_ms": round(1000 * self.interval, 1),
+        }
+
+    def _decode_full(self, frame):
+        gray, scale = self._downscale(frame)
+        text, points = self._decode(gray)
+        if text:
+            self._track(_points_bbox(points), scale, 0, 0, frame.shape)
+        return text
+
+    def _decode_roi(self, frame):
+        self.roi_frames += 1
+        x0, y0, x1, y1 = [int(v) for v in self.roi]
+        gray, scale = self._downscale(frame[y0:y1, x0:x1])
+        text, points = self._decode(gray)
+        if text:
+            self._track(_points_bbox(points), scale, x0, y0, frame.shape)
+        else:
+            self._roi_misses += 1
+            if self._roi_misses >= self.roi_max_misses:
+                self.roi = None
+        return text
+
+    def _track(self, bbox, scale, off_x, off_y, shape):
+        """Remember where the code was (in full-frame pixels), padded by roi_margin"""
+        self._roi_misses = 0
+        if bbox is None:
+            self.roi = None
+            return
+        x0, y0, x1, y1 = [v / scale for v in bbox]
+        pad_x, pad_y = (x1 - x0) * self.roi_margin + 16, (y1 - y0) * self.roi_margin + 16
+        h, w = shape[:2]
+        self.roi = (max(0, off_x + x0 - pad_x), max(0, off_y + y0 - pad_y),
+                    min(w, off_x + x1 + pad_x), min(h, off_y + y1 + pad_y))
+
+
 class ScannerModule:
-    def __init__(self, parent_dialog, on_scan_callback):
+    PREVIEW_HEIGHT = 300
+    PREVIEW_MS = 66  # ~15 fps is plenty for aiming the camera
+
+    def __init__(self, parent_dialog, on_scan_callback, symbologies=None, adaptive=True):
         self.parent = parent_dialog
         self.callback = on_scan_callback
         self.cap = None
@@ -14,103 +240,143 @@ class ScannerModule:
         self.scan_thread = None
         self.flashlight_on = False
         self.camera_index = 0
-        
+
         # Initialize OpenCV Detectors
         self.qr_detector = cv2.QRCodeDetector()
         try:
-            # BarcodeDetector might need sr.prototxt/sr.caffemodel for super-resolution, 
+            # BarcodeDetector might need sr.prototxt/sr.caffemodel for super-resolution,
             # but we'll try the basic detector first.
             self.barcode_detector = cv2.barcode.BarcodeDetector()
         except:
             self.barcode_detector = None
-        
+
+        decoders = [("QR", self._decode_qr)]
+        if self.barcode_detector:
+            decoders.append(("BARCODE", self._decode_barcode))
+        self.pipeline = FramePipeline(decoders, symbologies=symbologies, adaptive=adaptive)
+        self.frames_captured = 0
+
         self.preview_label = None
-        
+        # One preview buffer, written by the capture thread and painted by the Tk thread
+        self._preview_lock = threading.Lock()
+        self._preview_rgb = None
+        self._preview_dirty = False
+        self._photo = None
+
     def start_scan(self, preview_label):
         if self.is_running:
             return True, "Already running"
-            
+
         self.preview_label = preview_label
         self.cap = cv2.VideoCapture(self.camera_index)
         if not self.cap.isOpened():
             return False, "Could not open camera"
-            
+
         self.is_running = True
         self.scan_thread = threading.Thread(target=self._scan_loop, daemon=True)
         self.scan_thread.start()
+        self.parent.after(self.PREVIEW_MS, self._preview_tick)
         return True, "Success"
-        
+
     def stop_scan(self):
+        if self.is_running:
+            log.debug("Scanner stats: %s", self.stats())  # callers can read stats() themselves
         self.is_running = False
         if self.cap:
             self.cap.release()
             self.cap = None
         self.preview_label = None
+        self._photo = None
 
     def toggle_flashlight(self):
         self.flashlight_on = not self.flashlight_on
         # Most webcams don't support this via OpenCV, but we can set properties
         if self.cap:
              self.cap.set(cv2.CAP_PROP_AUTOFOCUS, 1)
-        
+
     def switch_camera(self):
         # Released and restarted by the UI to ensure clean switch
         self.stop_scan()
         self.camera_index = 1 if self.camera_index == 0 else 0
-        
+
+    def stats(self):
+        """Counters for tuning the detection settings"""
+        return dict(self.pipeline.stats(), frames_captured=self.frames_captured)
+
+    # --- DECODERS ---
+
+    def _decode_qr(self, gray):
+        ok, decoded_info, points, _ = self.qr_detector.detectAndDecodeMulti(gray)
+        if not ok:
+            return []
+        return [(info, points[i], "QR") for i, info in enumerate(decoded_info) if info]
+
+    def _decode_barcode(self, gray):
+        try:
+            decode = getattr(self.barcode_detector, "detectAndDecodeWithType", self.barcode_detector.detectAndDecode)
+            ok, decoded_info, decoded_type, points = decode(gray)
+        except Exception:
+            return []
+        if not ok:
+            return []
+        return [(info, points[i] if points is not None else None, decoded_type[i] if i < len(decoded_type) else None)
+                for i, info in enumerate(decoded_info) if info]
+
+    # --- CAPTURE / DETECT (worker thread) ---
+
     def _scan_loop(self):
         last_scan_time = 0
         while self.is_running:
-            if not self.cap: break
-            ret, frame = self.cap.read()
+            cap = self.cap
+            if not cap: break
+            ret, frame = cap.read()
             if not ret:
                 time.sleep(0.1)
                 continue
-                
-            code_data = None
-            
-            # 1. Try QR Detection
-            ok, decoded_info, points, _ = self.qr_detector.detectAndDecodeMulti(frame)
-            if ok:
-                for info in decoded_info:
-                    if info:
-                        code_data = info
-                        break
-            
-            # 2. Try Barcode Detection if QR failed
-            if not code_data and self.barcode_detector:
-                try:
-                    ok, decoded_info, decoded_type, points = self.barcode_detector.detectAndDecode(frame)
-                    if ok:
-                        for info in decoded_info:
-                            if info:
-                                code_data = info
-                                break
-                except:
-                    pass
-
-            if code_data and time.time() - last_scan_time > 1.5:
-                last_scan_time = time.time()
-                self.parent.after(0, lambda d=code_data: self.callback(d))
-            
-            # Update Preview UI
-            if self.preview_label and self.is_running:
-                try:
-                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    pil_img = Image.fromarray(rgb_frame)
-                    
-                    # Target height 300, calculate width
-                    h_target = 300
-                    w, h = pil_img.size
-                    w_target = int(w * (h_target / h))
-                    
-                    ctk_img = ctk.CTkImage(light_image=pil_img, dark_image=pil_img, size=(w_target, h_target))
-                    self.parent.after(0, lambda img=ctk_img: self.preview_label.configure(image=img) if self.preview_label else None)
-                except:
-                    pass
-                
-            time.sleep(0.03)
-        
+            self.frames_captured += 1
+
+            if self.preview_label is not None:
+                self._stage_preview(frame)
+
+            now = time.monotonic()
+            if self.pipeline.due(now):
+                code_data = self.pipeline.process(frame, now)
+                if code_data and now - last_scan_time > 1.5:
+                    last_scan_time = now
+                    self.parent.after(0, lambda d=code_data: self.callback(d))
+
+            time.sleep(0.005)
+
         if self.cap:
             self.cap.release()
             self.cap = None
+
+    def _stage_preview(self, frame):
+        h, w = frame.shape[:2]
+        size = (int(w * (self.PREVIEW_HEIGHT / h)), self.PREVIEW_HEIGHT)
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        with self._preview_lock:
+            if self._preview_rgb is None or self._preview_rgb.shape[:2] != small.shape[:2]:
+                self._preview_rgb = small.copy()
+            cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self._preview_rgb)
+            self._preview_dirty = True
+
+    # --- PREVIEW (Tk thread) ---
+
+    def _preview_tick(self):
+        if not self.is_running or self.preview_label is None:
+            return
+        try:
+            with self._preview_lock:
+                img = Image.fromarray(self._preview_rgb) if self._preview_dirty else None
+                self._preview_dirty = False
+                if img is not None:
+                    if self._photo is None or (self._photo.width(), self._photo.height()) != img.size:
+                        # Created once; later frames are pasted into the same Tk image
+                        self._photo = ImageTk.PhotoImage(img)
+                        self.preview_label.configure(image=self._photo, text="")
+                    else:
+                        self._photo.paste(img)
+        except Exception as e:
+            print(f"Preview error: {e}")
+        self.parent.after(self.PREVIEW_MS, self._preview_tick)
@@ -0,0 +1,168 @@
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class ApiClient:
+    """Shared HTTP client for the desktop app.
+
+    One pooled keep-alive session is owned by the app (``app.api``) so every
+    screen reuses the same TCP connections to the Node backend instead of
+    opening a fresh one per call. Requests get a per-endpoint timeout, the
+    bearer token is attached automatically and idempotent calls are retried
+    with backoff. Latency counters are kept per endpoint for tuning.
+    """
+
+    # (connect, read) seconds. First matching prefix wins.
+    DEFAULT_TIMEOUT = (3.05, 20)
+    ENDPOINT_TIMEOUTS = [
+        ("/check-license", (1, 5)),
+        ("/login", (3.05, 15)),
+        ("/inventory/stock", (2, 10)),
+        ("/search-medicines", (2, 5)),
+        ("/reports/", (3.05, 120)),
+        ("/super/reports/", (3.05, 120)),
+        ("/sales/log", (3.05, 60)),
+        ("/karobar/statements", (3.05, 60)),
+        ("/super/sms/send", (3.05, 60)),
+    ]
+
+    # Only safe/idempotent methods are retried on 5xx or read errors.
+    # Connection failures are retried for every method because the
+    # request never reached the server.
+    RETRY_METHODS = frozenset(["GET", "HEAD", "PUT", "DELETE", "OPTIONS"])
+    RETRY_STATUS = (502, 503, 504)
+
+    _ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+    def __init__(self, base_url, token_provider=None, pool_size=10, retries=2, backoff=0.3):
+        self.base_url = base_url.rstrip("/")
+        self.token_provider = token_provider
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=self.RETRY_STATUS,
+            allowed_methods=self.RETRY_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    # --- URL / TIMEOUT HELPERS ---
+
+    def url(self, path):
+        """Resolve an endpoint path ("/sales") or pass through an absolute URL"""
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        if not path.startswith("/"):
+            path = "/" + path
+        return f"{self.base_url}{path}"
+
+    def _path_of(self, url):
+        if url.startswith(self.base_url):
+            return url[len(self.base_url):] or "/"
+        return url
+
+    def timeout_for(self, path):
+        for prefix, timeout in self.ENDPOINT_TIMEOUTS:
+            if path.startswith(prefix):
+                return timeout
+        return self.DEFAULT_TIMEOUT
+
+    def _endpoint_key(self, method, path):
+        # Collapse query strings and numeric ids so /vendors/12 and /vendors/7
+        # land in the same bucket.
+        path = path.split("?")[0]
+        return f"{method} {self._ID_SEGMENT.sub('/:id', path)}"
+
+    # --- REQUESTS ---
+
+    def request(self, method, path, **kwargs):
+        """Send a request through the shared session and record its latency.
+
+        Accepts the same keyword arguments as ``requests.request``. A
+        caller-supplied ``timeout`` or ``Authorization`` header wins over the
+        defaults.
+        """
+        method = method.upper()
+        url = self.url(path)
+        rel_path = self._path_of(url)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if "Authorization" not in headers and self.token_provider:
+            token = self.token_provider()
+            if token:
+                headers["Authorization"] = f"Bearer {token}"
+
+        kwargs.setdefault("timeout", self.timeout_for(rel_path))
+
+        key = self._endpoint_key(method, rel_path)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, headers=headers, **kwargs)
+        except requests.exceptions.RequestException:
+            self._record(key, time.perf_counter() - start, failed=True)
+            raise
+        self._record(key, time.perf_counter() - start, failed=response.status_code >= 500)
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request("PUT", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    # --- COUNTERS ---
+
+    def _record(self, key, elapsed, failed=False):
+        with self._lock:
+            s = self._stats.get(key)
+            if s is None:
+                s = self._stats[key] = {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+            ms = elapsed * 1000
+            s["count"] += 1
+            s["total_ms"] += ms
+            if ms > s["max_ms"]:
+                s["max_ms"] = ms
+            if failed:
+                s["errors"] += 1
+
+    def stats(self):
+        """Snapshot of per-endpoint counters: count, errors, avg_ms, max_ms"""
+        with self._lock:
+            out = {}
+            for key, s in self._stats.items():
+                out[key] = {
+                    "count": s["count"],
+                    "errors": s["errors"],
+                    "avg_ms": s["total_ms"] / s["count"] if s["count"] else 0.0,
+                    "max_ms": s["max_ms"],
+                }
+            return out
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    def close(self):
+        self.session.close()
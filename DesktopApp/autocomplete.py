@@ -0,0 +1,218 @@
+import tkinter as tk
+from collections import OrderedDict
+
+
+class PrefixCache:
+    """LRU cache of typeahead results keyed by the (lower-case) query.
+
+    A query that extends a cached one ("parac" after "para") is answered
+    locally by narrowing the cached superset, as long as that superset was
+    complete, i.e. the server returned fewer rows than its page limit.
+    """
+
+    def __init__(self, match, max_entries=200, page_limit=20):
+        self.match = match
+        self.max_entries = max_entries
+        self.page_limit = page_limit
+        self._entries = OrderedDict()  # query -> (results, complete)
+
+    @staticmethod
+    def _norm(query):
+        return str(query or "").strip().lower()
+
+    def put(self, query, results):
+        q = self._norm(query)
+        complete = self.page_limit is None or len(results) < self.page_limit
+        self._entries[q] = (results, complete)
+        self._entries.move_to_end(q)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, query):
+        """Cached or locally narrowed results, or None when the server must be asked"""
+        q = self._norm(query)
+        hit = self._entries.get(q)
+        if hit is not None:
+            self._entries.move_to_end(q)
+            return hit[0]
+
+        # Barcodes / item codes are exact-match on the server, so a digit
+        # query cannot be derived from a shorter prefix.
+        if q.isdigit():
+            return None
+
+        for n in range(len(q) - 1, 0, -1):
+            hit = self._entries.get(q[:n])
+            if hit is not None and hit[1]:
+                # A complete parent is a definite answer, even when nothing is left
+                narrowed = [item for item in hit[0] if self.match(item, q)]
+                self.put(q, narrowed)
+                return narrowed
+        return None
+
+    def clear(self):
+        self._entries.clear()
+
+
+def medicine_matches(item, query):
+    """Local equivalent of the backend's medicine LIKE search"""
+    for key in ('name', 'generic_name'):
+        if query in str(item.get(key) or "").lower():
+            return True
+    for key in ('barcode', 'item_code'):
+        if query == str(item.get(key) or "").lower():
+            return True
+    return False
+
+
+class Autocomplete:
+    """Debounced, cached typeahead with a single reused suggestion popup.
+
+    One instance can serve many entries (e.g. every GRN row). Keystrokes
+    are debounced, only the latest query is fetched (older in-flight
+    lookups are superseded through the TaskRunner key) and results come
+    from a PrefixCache when possible.
+
+    ``fetch(query)`` runs on a worker thread and returns a list of items;
+    ``format_item(item)`` gives the listbox text. ``extra_items`` are
+    (label, callback) rows shown above the results, such as "+ Add New".
+    """
+
+    def __init__(self, root, tasks, fetch, format_item, cache=None, min_chars=2, delay_ms=250,
+                 extra_items=None, width=400, height=300):
+        self.root = root
+        self.tasks = tasks
+        self.fetch = fetch
+        self.format_item = format_item
+        self.cache = cache or PrefixCache(medicine_matches)
+        self.min_chars = min_chars
+        self.delay_ms = delay_ms
+        self.extra_items = extra_items or []
+        self.width = width
+        self.height = height
+
+        self._task_key = f"autocomplete:{id(self)}"
+        self._after_id = None
+        self._popup = None
+        self._listbox = None
+        self._items = []
+        self._entry = None
+        self._var = None
+        self._on_select = None
+
+    # --- BINDING ---
+
+    def attach(self, entry, var, on_select):
+        """Offer suggestions for ``entry``; ``on_select(item)`` gets the chosen item"""
+        entry.bind("<KeyRelease>", lambda e: self._on_key(e, entry, var, on_select), add="+")
+        entry.bind("<FocusOut>", lambda e: self.root.after(150, self._hide_if_unfocused), add="+")
+
+    def _on_key(self, event, entry, var, on_select):
+        if event.keysym == "Escape":
+            self.hide()
+            return
+        if event.keysym == "Down" and self._visible():
+            self._listbox.focus_set()
+            self._listbox.selection_clear(0, "end")
+            self._listbox.selection_set(0)
+            return
+        if event.keysym in ("Return", "Tab", "Up", "Left", "Right", "Shift_L", "Shift_R"):
+            return
+
+        self._entry, self._var, self._on_select = entry, var, on_select
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+        query = var.get().strip()
+        if len(query) < self.min_chars:
+            self.tasks.cancel(self._task_key)
+            self.hide()
+            return
+
+        cached = self.cache.get(query)
+        if cached is not None:
+            self.tasks.cancel(self._task_key)
+            self._show(cached)
+            return
+
+        self._after_id = self.root.after(self.delay_ms, lambda: self._request(query))
+
+    def _request(self, query):
+        self._after_id = None
+
+        def deliver(results):
+            self.cache.put(query, results)
+            # Drop answers to a query the user has already typed past
+            if self._var is not None and self._var.get().strip() == query:
+                self._show(results)
+
+        self.tasks.submit(self.fetch, query, on_success=deliver,
+                          on_error=lambda e: print(f"Autocomplete error: {e}"),
+                          key=self._task_key, owner=self._entry)
+
+    # --- POPUP ---
+
+    def _ensure_popup(self):
+        if self._popup is not None and self._popup.winfo_exists():
+            return
+        self._popup = tk.Toplevel(self.root)
+        self._popup.overrideredirect(True)
+        self._popup.withdraw()
+        self._listbox = tk.Listbox(self._popup, font=("Segoe UI", 11), borderwidth=1, relief="solid")
+        self._listbox.pack(fill="both", expand=True)
+        self._listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self._listbox.bind("<Return>", self._on_listbox_select)
+        self._listbox.bind("<Escape>", lambda e: self.hide())
+        self._listbox.bind("<FocusOut>", lambda e: self.root.after(150, self._hide_if_unfocused))
+
+    def _show(self, results):
+        if self._entry is None or not self._entry.winfo_exists():
+            return
+        self._ensure_popup()
+        self._items = list(results)
+
+        lb = self._listbox
+        lb.delete(0, "end")
+        for label, _ in self.extra_items:
+            lb.insert("end", label)
+        for item in self._items:
+            lb.insert("end", self.format_item(item))
+
+        if not self._items and not self.extra_items:
+            self.hide()
+            return
+
+        x = self._entry.winfo_rootx()
+        y = self._entry.winfo_rooty() + self._entry.winfo_height()
+        self._popup.geometry(f"{self.width}x{self.height}+{x}+{y}")
+        self._popup.deiconify()
+        self._popup.lift()
+
+    def _on_listbox_select(self, event=None):
+        sel = self._listbox.curselection()
+        if not sel:
+            return
+        idx = sel[0]
+        self.hide()
+        if idx < len(self.extra_items):
+            self.extra_items[idx][1]()
+            return
+        item = self._items[idx - len(self.extra_items)]
+        if self._on_select:
+            self._on_select(item)
+
+    def _visible(self):
+        return self._popup is not None and self._popup.winfo_exists() and self._popup.winfo_viewable()
+
+    def _hide_if_unfocused(self):
+        try:
+            focused = self.root.focus_get()
+        except Exception:
+            focused = None
+        if focused is not self._listbox:
+            self.hide()
+
+    def hide(self):
+        if self._popup is not None and self._popup.winfo_exists():
+            self._popup.withdraw()
@@ -0,0 +1,69 @@
+import base64
+import hashlib
+import io
+from collections import OrderedDict
+
+import customtkinter as ctk
+from PIL import Image, ImageDraw, ImageOps
+
+
+def render_circle(base64_image=None, size=(60, 60), color="#6366f1"):
+    """Circular crop of a base64 picture, or a plain coloured circle (PIL image)"""
+    if base64_image and len(base64_image) > 100:
+        mask = Image.new('L', size, 0)
+        ImageDraw.Draw(mask).ellipse((0, 0) + size, fill=255)
+        img = Image.open(io.BytesIO(base64.b64decode(base64_image))).convert("RGBA")
+        img = ImageOps.fit(img, size, centering=(0.5, 0.5))
+        output = Image.new('RGBA', size, (0, 0, 0, 0))
+        output.paste(img, (0, 0), mask=mask)
+        return output
+
+    output = Image.new('RGBA', size, (0, 0, 0, 0))
+    ImageDraw.Draw(output).ellipse((2, 2, size[0] - 2, size[1] - 2), fill=color)
+    return output
+
+
+class AvatarCache:
+    """Finished circular CTkImages, keyed by picture content + size + colour.
+
+    The same profile picture shown in the sidebar on every screen, or the
+    same placeholder circle on hundreds of rows, is decoded and masked
+    once; the least recently used images are dropped beyond ``maxsize``.
+    Must be used on the Tk thread (CTkImage).
+    """
+
+    def __init__(self, maxsize=128, render=render_circle):
+        self.maxsize = maxsize
+        self.render = render
+        self._images = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(base64_image, size, color):
+        if base64_image and len(base64_image) > 100:
+            digest = hashlib.md5(base64_image.encode() if isinstance(base64_image, str) else base64_image).hexdigest()
+            return (digest, tuple(size), None)  # the colour only matters for the placeholder
+        return (None, tuple(size), color)
+
+    def get(self, base64_image=None, size=(60, 60), color="#6366f1"):
+        key = self.key(base64_image, size, color)
+        photo = self._images.get(key)
+        if photo is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return photo
+
+        self.misses += 1
+        img = self.render(base64_image, tuple(size), color)
+        photo = ctk.CTkImage(light_image=img, dark_image=img, size=tuple(size))
+        self._images[key] = photo
+        if len(self._images) > self.maxsize:
+            self._images.popitem(last=False)
+        return photo
+
+    def __len__(self):
+        return len(self._images)
+
+    def clear(self):
+        self._images.clear()
@@ -3,7 +3,6 @@ import customtkinter as ctk
 from tkinter import Canvas, StringVar, IntVar, BooleanVar, filedialog, messagebox
 from PIL import Image, ImageTk, ImageDraw, ImageFont
 import io
-import requests
 import json
 import base64
 
@@ -11,7 +10,7 @@ class BillDesignerUI:
     def __init__(self, main_app):
         self.app = main_app
         self.root = main_app.root
-        self.api_base = getattr(self.app, 'API_BASE', "http://127.0.0.1:5000/api")
+        self.api = main_app.api
         
         # --- Bill State ---
         self.paper_size = StringVar(value="A4") # A4, A5
@@ -159,7 +158,7 @@ class BillDesignerUI:
     def load_design(self):
         try:
             headers = {"Authorization": f"Bearer {self.app.token}"}
-            r = requests.get(f"{self.api_base}/bill-design", headers=headers)
+            r = self.api.get("/bill-design", headers=headers)
             if r.status_code == 200:
                 data = r.json()
                 if data.get('found'):
@@ -216,7 +215,7 @@ class BillDesignerUI:
             headers = {"Authorization": f"Bearer {self.app.token}"}
             # Remove content-type for multipart (requests handles it)
             
-            r = requests.post(f"{self.api_base}/bill-design", headers=headers, data=data, files=files)
+            r = self.api.post("/bill-design", headers=headers, data=data, files=files)
             
             if r.status_code == 200:
                 messagebox.showinfo("Success", "Bill Design Saved Successfully!")
@@ -0,0 +1,72 @@
+class Cart:
+    """Billing cart keyed by stock (batch) id with a running total.
+
+    Every mutation adjusts ``total`` by the changed line's delta instead of
+    re-summing, and reports the change to ``on_change(kind, line)`` with
+    ``kind`` one of "add", "update" or "remove" so the view can patch a
+    single row rather than rebuilding the whole table.
+    """
+
+    def __init__(self, on_change=None):
+        self.on_change = on_change
+        self._lines = {}  # stock id -> line dict, in insertion order
+        self._total = 0.0
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __iter__(self):
+        return iter(self._lines.values())
+
+    @property
+    def items(self):
+        """Line dicts in the order they were added (the /sales payload)"""
+        return list(self._lines.values())
+
+    @property
+    def total(self):
+        return round(self._total, 2)
+
+    def get(self, stock_id):
+        return self._lines.get(stock_id)
+
+    def _notify(self, kind, line):
+        if self.on_change:
+            self.on_change(kind, line)
+
+    # --- MUTATIONS ---
+
+    def add(self, line):
+        """Add a line, or bump the quantity of an existing line for the same batch"""
+        exist = self._lines.get(line['id'])
+        if exist is not None:
+            return self.set_qty(line['id'], exist['qty'] + line['qty'])
+        line = dict(line)
+        self._lines[line['id']] = line
+        self._total += line['qty'] * line['rate']
+        self._notify("add", line)
+        return line
+
+    def set_qty(self, stock_id, qty):
+        line = self._lines[stock_id]
+        if qty <= 0:
+            self.remove(stock_id)
+            return line
+        self._total += (qty - line['qty']) * line['rate']
+        line['qty'] = qty
+        self._notify("update", line)
+        return line
+
+    def remove(self, stock_id):
+        line = self._lines.pop(stock_id, None)
+        if line is None:
+            return None
+        self._total -= line['qty'] * line['rate']
+        if not self._lines:
+            self._total = 0.0  # drop accumulated float drift
+        self._notify("remove", line)
+        return line
+
+    def clear(self):
+        for stock_id in list(self._lines):
+            self.remove(stock_id)
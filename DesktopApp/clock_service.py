@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+
+class ClockService:
+    """Header clock that ticks the time every second and the date once a day.
+
+    ``time_var`` is set on each tick (only when the text changes and the
+    window is not minimized); ``on_new_day(now)`` is called at start-up and
+    again at each midnight rollover, so the BS date conversion runs once a
+    day instead of once a second. Ticks are aligned to the wall-clock second.
+    """
+
+    def __init__(self, root, time_var, on_new_day, time_format="%I:%M:%S %p", now=datetime.now):
+        self.root = root
+        self.time_var = time_var
+        self.on_new_day = on_new_day
+        self.time_format = time_format
+        self._now = now
+        self._day = None
+        self._last_text = None
+
+    def start(self):
+        self._tick()
+        self._schedule_midnight()
+
+    def _minimized(self):
+        try:
+            return self.root.state() == "iconic"
+        except Exception:
+            return False
+
+    def _check_day(self, now):
+        if now.date() != self._day:
+            self._day = now.date()
+            self.on_new_day(now)
+
+    def _tick(self):
+        now = self._now()
+        # Cheap guard in case the midnight timer was delayed (sleep / clock change)
+        self._check_day(now)
+        if not self._minimized():
+            text = now.strftime(self.time_format)
+            if text != self._last_text:
+                self._last_text = text
+                self.time_var.set(text)
+        self.root.after(1000 - now.microsecond // 1000, self._tick)
+
+    def _schedule_midnight(self):
+        now = self._now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        delay_ms = int((midnight - now).total_seconds() * 1000) + 50
+        self.root.after(delay_ms, self._on_midnight)
+
+    def _on_midnight(self):
+        self._check_day(self._now())
+        self._schedule_midnight()
@@ -1,20 +1,25 @@
 
 import customtkinter as ctk
 from tkinter import StringVar, IntVar
-import requests
-import threading
 import datetime
+import time
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 
 class DashboardUI:
+    # (panel name, endpoint, update method) - fetched in parallel by load_data
+    PANELS = [
+        ("kpi", "/dashboard/kpi", "update_kpis"),
+        ("alerts", "/dashboard/alerts", "update_alerts"),
+        ("charts", "/dashboard/charts", "update_charts"),
+        ("cashier", "/reports/cashier-collections", "update_cashier_stats"),
+    ]
+
     def __init__(self, main_app):
         self.app = main_app
         self.root = main_app.root
-        self.api_base = "http://localhost:5000/api" # Hardcoded or passed? passing logic better
-        if hasattr(self.app, 'api_base'):
-            self.api_base = self.app.api_base # Future proofing if main.py changes definition
+        self.api = main_app.api # Shared pooled client owned by the app
 
     def show(self, container):
         # 1. Main Scrollable Container
@@ -32,6 +37,10 @@ class DashboardUI:
         ctk.CTkOptionMenu(header, variable=self.date_filter, values=["Today", "Yesterday", "Last 7 Days", "This Month"], width=120).pack(side="right", padx=10)
         
         ctk.CTkButton(header, text="🔄 Refresh", width=100, command=self.load_data, fg_color="#3b82f6").pack(side="right")
+        
+        # Per-panel load timing (fetch + render)
+        self.timing_lbl = ctk.CTkLabel(header, text="", text_color="gray", font=("Segoe UI", 10))
+        self.timing_lbl.pack(side="right", padx=10)
 
         # 3. KPI Grid
         self.kpi_frame = ctk.CTkFrame(self.scroll, fg_color="transparent")
@@ -133,36 +142,52 @@ class DashboardUI:
         self.kpi_widgets[title] = (val_lbl, sub_lbl)
 
     def load_data(self):
-        # Run in thread
-        threading.Thread(target=self._fetch_data, daemon=True).start()
+        # Fan out: every panel is fetched concurrently and rendered as soon as
+        # its own response arrives, so open time is bounded by the slowest call.
+        self.timings = {}
+        self._load_started = time.perf_counter()
+        self._panels_pending = len(self.PANELS)
+        self.timing_lbl.configure(text="Loading...")
+        
+        for name, path, handler in self.PANELS:
+            self.app.tasks.submit(self._fetch_panel, path,
+                                  on_success=lambda res, n=name, h=handler: self._on_panel_data(n, h, res),
+                                  on_error=lambda e, n=name: self._on_panel_error(n, e),
+                                  key=f"dashboard:{name}", owner=self.scroll)
 
-    def _fetch_data(self):
-        try:
-            token = self.app.token
-            headers = {"Authorization": f"Bearer {token}"}
-            
-            # 1. KPIs
-            r_kpi = requests.get(f"{self.app.API_BASE}/dashboard/kpi", headers=headers) 
-            if r_kpi.status_code == 200:
-                self.app.root.after(0, self.update_kpis, r_kpi.json())
-                
-            # 2. Alerts
-            r_alerts = requests.get(f"{self.app.API_BASE}/dashboard/alerts", headers=headers)
-            if r_alerts.status_code == 200:
-                self.app.root.after(0, self.update_alerts, r_alerts.json())
-                
-            # 3. Charts
-            r_charts = requests.get(f"{self.app.API_BASE}/dashboard/charts", headers=headers)
-            if r_charts.status_code == 200:
-                self.app.root.after(0, self.update_charts, r_charts.json())
+    def _fetch_panel(self, path):
+        """Runs on a worker thread. Returns (json or None, fetch ms)"""
+        start = time.perf_counter()
+        r = self.api.get(path)
+        data = r.json() if r.status_code == 200 else None
+        return data, (time.perf_counter() - start) * 1000
 
-            # 4. Cashier Stats (New)
-            r_cashier = requests.get(f"{self.app.API_BASE}/reports/cashier-collections", headers=headers)
-            if r_cashier.status_code == 200:
-                 self.app.root.after(0, self.update_cashier_stats, r_cashier.json())
-                
-        except Exception as e:
-            print(f"Dashboard Error: {e}")
+    def _on_panel_data(self, name, handler, result):
+        data, fetch_ms = result
+        start = time.perf_counter()
+        if data is not None:
+            getattr(self, handler)(data)
+        render_ms = (time.perf_counter() - start) * 1000
+        self.timings[name] = {"fetch_ms": fetch_ms, "render_ms": render_ms}
+        self._panel_done()
+
+    def _on_panel_error(self, name, error):
+        print(f"Dashboard Error ({name}): {error}")
+        self.timings[name] = {"fetch_ms": None, "render_ms": 0.0}
+        self._panel_done()
+
+    def _panel_done(self):
+        self._panels_pending -= 1
+        if self._panels_pending > 0:
+            return
+        
+        total_ms = (time.perf_counter() - self._load_started) * 1000
+        parts = []
+        for name, _, _ in self.PANELS:
+            t = self.timings.get(name, {})
+            fetch = t.get("fetch_ms")
+            parts.append(f"{name} {fetch:.0f}+{t.get('render_ms', 0):.0f}ms" if fetch is not None else f"{name} failed")
+        self.timing_lbl.configure(text=f"Loaded in {total_ms:.0f} ms ({', '.join(parts)})")
 
     def update_cashier_stats(self, data):
         # Clear existing
@@ -309,7 +334,7 @@ class DashboardUI:
             medicine_id = item.get('medicine_id') or item.get('id')
             if medicine_id:
                 headers = {"Authorization": f"Bearer {self.app.token}"}
-                r = requests.get(f"{self.app.API_BASE}/medicines/{medicine_id}", headers=headers)
+                r = self.api.get(f"/medicines/{medicine_id}", headers=headers)
                 if r.status_code == 200:
                     med_data = r.json()
                     
@@ -371,7 +396,7 @@ class DashboardUI:
             }
             
             headers = {"Authorization": f"Bearer {self.app.token}"}
-            r = requests.post(f"{self.app.API_BASE}/sms/send-alert", json=payload, headers=headers)
+            r = self.api.post("/sms/send-alert", json=payload, headers=headers)
             
             if r.status_code == 200:
                 messagebox.showinfo("Success", "SMS sent successfully!")
@@ -407,7 +432,7 @@ class DashboardUI:
             }
             
             headers = {"Authorization": f"Bearer {self.app.token}"}
-            r = requests.post(f"{self.app.API_BASE}/sms/send-alert", json=payload, headers=headers)
+            r = self.api.post("/sms/send-alert", json=payload, headers=headers)
             
             if r.status_code == 200:
                 messagebox.showinfo("Success", "SMS sent successfully!")
@@ -1,5 +1,47 @@
 import nepali_datetime
 from datetime import datetime, date
+from functools import lru_cache
+
+
+# A few thousand distinct days cover every report the app renders, so the
+# caches stay small while repeated dates (bill logs, statements) are free.
+@lru_cache(maxsize=8192)
+def _ad_to_bs_cached(clean_date):
+    dt = datetime.strptime(clean_date, '%Y-%m-%d').date()
+    return nepali_datetime.date.from_datetime_date(dt).strftime('%Y-%m-%d')
+
+
+@lru_cache(maxsize=8192)
+def _bs_to_ad_cached(y, m, d):
+    return nepali_datetime.date(y, m, d).to_datetime_date().strftime('%Y-%m-%d')
+
+
+def _date_part(value):
+    # "2024-04-13T10:15:00.000Z" and "2024-04-13 10:15" share the day's conversion
+    if value is None or value != value:  # None / NaN / NaT
+        return ""
+    return value.split('T')[0].split(' ')[0] if isinstance(value, str) else value
+
+
+def _convert_many(values, convert):
+    """Apply a scalar conversion to a list or pandas Series, once per distinct day"""
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+    if pd is not None and isinstance(values, pd.Series):
+        keys = values.map(_date_part)
+        mapping = {k: convert(k) for k in keys.unique()}
+        return keys.map(mapping)
+    mapping = {}
+    out = []
+    for v in values:
+        k = _date_part(v)
+        if k not in mapping:
+            mapping[k] = convert(k)
+        out.append(mapping[k])
+    return out
+
 
 class DateUtils:
     @staticmethod
@@ -23,15 +65,15 @@ class DateUtils:
         if not ad_date_str: return ""
         try:
             # Handle if it's already a date object or full timestamp string
-            if isinstance(ad_date_str, (datetime, date)):
-                dt = ad_date_str
+            if isinstance(ad_date_str, datetime):
+                clean_date = ad_date_str.date().isoformat()
+            elif isinstance(ad_date_str, date):
+                clean_date = ad_date_str.isoformat()
             else:
                 # Truncate time part if present
                 clean_date = str(ad_date_str).split('T')[0].split(' ')[0]
-                dt = datetime.strptime(clean_date, '%Y-%m-%d').date()
                 
-            nd = nepali_datetime.date.from_datetime_date(dt)
-            return nd.strftime('%Y-%m-%d')
+            return _ad_to_bs_cached(clean_date)
         except Exception as e:
             print(f"Date Conversion Error: {e}")
             return str(ad_date_str) # Fallback to original if conversion fails
@@ -45,13 +87,21 @@ class DateUtils:
             if len(parts) != 3: return bs_date_str
             
             y, m, d = map(int, parts)
-            nd = nepali_datetime.date(y, m, d)
-            ad = nd.to_datetime_date()
-            return ad.strftime('%Y-%m-%d')
+            return _bs_to_ad_cached(y, m, d)
         except Exception as e:
             print(f"BS to AD Error: {e}")
             return bs_date_str
 
+    @staticmethod
+    def ad_to_bs_many(values):
+        """ad_to_bs over a list or pandas Series (converting each distinct date once)"""
+        return _convert_many(values, DateUtils.ad_to_bs)
+
+    @staticmethod
+    def bs_to_ad_many(values):
+        """bs_to_ad over a list or pandas Series (converting each distinct date once)"""
+        return _convert_many(values, DateUtils.bs_to_ad)
+
     @staticmethod
     def format_bs_date_friendly(bs_date_str):
         """Converts YYYY-MM-DD (BS) to friendly format like '14 Magh, 2082'"""
@@ -0,0 +1,333 @@
+import csv
+import difflib
+import os
+import re
+from datetime import date
+
+
+def normalize_name(text):
+    """Lower-case, punctuation-free, single-spaced product name"""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", str(text or "").lower()).split())
+
+
+def _trigrams(text):
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _number(value, cast=float):
+    try:
+        return cast(float(str(value).replace(",", "").replace("Rs.", "").strip() or 0))
+    except (TypeError, ValueError):
+        return cast(0)
+
+
+def parse_expiry(text):
+    """Supplier expiry ("2027/01", "01/27", "2081-05-15") -> (YYYY-MM-DD, "AD"|"BS").
+
+    Month-only expiries map to the 1st of the month (see ``is_month_only``).
+    Years from 2070 on are taken as Bikram Sambat, matching the GRN row's
+    BS/AD selector.
+    """
+    text = str(text or "").strip()
+    m = re.match(r"^(\d{4})[-/.](\d{1,2})(?:[-/.](\d{1,2}))?$", text)
+    if m:
+        year, month, day = int(m.group(1)), int(m.group(2)), int(m.group(3) or 1)
+    else:
+        m = re.match(r"^(\d{1,2})[-/.](\d{2})$", text)  # MM/YY
+        if not m:
+            return "", "BS"
+        year, month, day = 2000 + int(m.group(2)), int(m.group(1)), 1
+    if not 1 <= month <= 12:
+        return "", "BS"
+    return f"{year:04d}-{month:02d}-{day:02d}", ("BS" if year >= 2070 else "AD")
+
+
+_MONTH_ONLY = re.compile(r"^\d{4}[-/.]\d{1,2}$|^\d{1,2}[-/.]\d{2}$")
+
+
+def is_month_only(text):
+    """True for expiries without a day ("2027/01", "01/27"): stock is good through that month"""
+    return bool(_MONTH_ONLY.match(str(text or "").strip()))
+
+
+def _next_month(expiry):
+    """YYYY-MM-DD -> the 1st of the following month, in the same calendar"""
+    year, month = int(expiry[:4]), int(expiry[5:7])
+    return f"{year + month // 12:04d}-{month % 12 + 1:02d}-01"
+
+
+def _vat_flag(value):
+    """VAT column cell ("Yes", "13%", "Exempt", 0 ...) -> True / False, None when blank"""
+    text = "" if value is None else str(value).strip().lower().rstrip("%").strip()
+    if not text:
+        return None
+    if text in ("y", "yes", "vat", "true", "taxable"):
+        return True
+    if text in ("n", "no", "exempt", "free", "vat free", "vat-free", "false", "nil", "-"):
+        return False
+    return _number(text) > 0
+
+
+class MedicineMatcher:
+    """Fuzzy lookup of supplier product names against the local medicine master.
+
+    Built once from ``/medicines`` rows. Barcodes, item codes and exact
+    (normalized) names are dict hits; anything else is narrowed to the
+    medicines sharing the most trigrams and ranked with difflib, so a whole
+    invoice matches in milliseconds without a request per line.
+    """
+
+    def __init__(self, medicines, threshold=0.72, candidates=15):
+        self.threshold = threshold
+        self.candidates = candidates
+        self._meds = []
+        self._by_code = {}
+        self._by_name = {}
+        self._trigram_map = {}  # trigram -> {index}
+        for med in medicines:
+            i = len(self._meds)
+            names = {normalize_name(med.get('name'))}
+            if med.get('strength'):
+                names.add(normalize_name(f"{med.get('name')} {med.get('strength')}"))
+            names.discard("")
+            self._meds.append((med, names))
+            for key in ('barcode', 'item_code'):
+                if med.get(key):
+                    self._by_code[str(med[key]).strip().lower()] = med
+            for name in names:
+                self._by_name.setdefault(name, med)
+                for tri in _trigrams(name):
+                    self._trigram_map.setdefault(tri, set()).add(i)
+
+    def __len__(self):
+        return len(self._meds)
+
+    def match(self, name, code=None):
+        """Best medicine for an invoice line -> (medicine or None, score 0..1)"""
+        if code:
+            med = self._by_code.get(str(code).strip().lower())
+            if med is not None:
+                return med, 1.0
+        q = normalize_name(name)
+        if not q:
+            return None, 0.0
+        med = self._by_name.get(q) or self._by_code.get(q)
+        if med is not None:
+            return med, 1.0
+
+        # 1. Shortlist by shared trigrams
+        hits = {}
+        for tri in _trigrams(q):
+            for i in self._trigram_map.get(tri, ()):
+                hits[i] = hits.get(i, 0) + 1
+        shortlist = sorted(hits, key=hits.get, reverse=True)[:self.candidates]
+
+        # 2. Rank the shortlist properly
+        best, best_score = None, 0.0
+        for i in shortlist:
+            med, names = self._meds[i]
+            score = max(difflib.SequenceMatcher(None, q, n).ratio() for n in names)
+            if score > best_score:
+                best, best_score = med, score
+        if best_score < self.threshold:
+            return None, best_score
+        return best, best_score
+
+
+def rows_from_extract(items, matcher):
+    """Extracted invoice rows [SN, Product, Batch, Exp, Qty, Rate, Amount] -> GRN row values"""
+    rows = []
+    for item in items:
+        item = list(item) + [""] * (7 - len(item))
+        _, product, batch, exp, qty, rate, amount = item[:7]
+        med, score = matcher.match(product)
+        expiry, exp_fmt = parse_expiry(exp)
+        qty, rate = _number(qty, int), _number(rate)
+        if not rate and qty:
+            rate = round(_number(amount) / qty, 2)
+        rows.append({
+            "medicine_id": med['id'] if med else 0,
+            "name": med['name'] if med else product,
+            "raw_name": product,
+            "score": round(score, 2),
+            "batch": str(batch or "").strip(),
+            "expiry": expiry,
+            "exp_fmt": exp_fmt,
+            "qty": qty,
+            "rate": rate,
+            "mrp": _number(med.get('mrp') or med.get('selling_price')) if med else 0.0,
+        })
+    return rows
+
+
+# --- DISTRIBUTOR FILES (CSV / XLSX) ---
+
+# Canonical field -> header spellings seen in distributor price lists / invoices
+HEADER_ALIASES = {
+    "product": ("product", "item", "item name", "product name", "description", "particulars", "medicine", "name"),
+    "code": ("code", "item code", "barcode", "product code"),
+    "batch": ("batch", "batch no", "batch number", "lot"),
+    "expiry": ("expiry", "exp", "exp date", "expiry date"),
+    "qty": ("qty", "quantity", "qnty"),
+    "free": ("free", "free qty", "bonus", "scheme"),
+    "rate": ("rate", "p rate", "purchase rate", "cost", "price", "unit price"),
+    "mrp": ("mrp", "m r p", "retail price"),
+    "disc": ("disc", "disc%", "discount", "discount%", "disc %"),
+    "amount": ("amount", "total", "value", "net amount"),
+    "vat": ("vat", "vat%", "vat %", "tax", "tax%", "tax %", "taxable"),
+}
+HEADER_SCAN_ROWS = 20
+
+
+def iter_sheet_rows(path):
+    """Yield the rows of a CSV or XLSX file one at a time (XLSX in read-only mode)"""
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in wb.active.iter_rows(values_only=True):
+                yield row
+        finally:
+            wb.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+            for row in csv.reader(f):
+                yield row
+
+
+def map_header(row):
+    """{field: column index} if ``row`` looks like a header (needs product and qty)"""
+    columns = {}
+    for i, cell in enumerate(row):
+        label = normalize_name(cell)
+        label_compact = str(cell or "").strip().lower()
+        for field, aliases in HEADER_ALIASES.items():
+            if field not in columns and (label in aliases or label_compact in aliases):
+                columns[field] = i
+                break
+    return columns if "product" in columns and "qty" in columns else None
+
+
+def read_distributor_file(path):
+    """Stream a distributor file -> (raw lines, columns); each line is (file line no, {field: cell})"""
+    rows = iter_sheet_rows(path)
+    columns, header_no = None, 0
+    for header_no, row in zip(range(1, HEADER_SCAN_ROWS + 1), rows):
+        columns = map_header(row or ())
+        if columns:
+            break
+    if not columns:
+        raise ValueError("No header row with Product and Qty columns was found")
+
+    lines = []
+    for line_no, row in enumerate(rows, start=header_no + 1):
+        if not row:
+            continue
+        cells = {f: row[i] if i < len(row) else None for f, i in columns.items()}
+        if not str(cells.get("product") or "").strip():
+            continue  # blank / subtotal lines
+        lines.append((line_no, cells))
+    return lines, columns
+
+
+def validate_line(row, today=None, to_ad=None):
+    """Problems that keep a line out of the purchase (empty list = OK)"""
+    issues = []
+    if not row['medicine_id']:
+        issues.append("no matching product")
+    if not row['batch']:
+        issues.append("missing batch")
+    if not row['expiry']:
+        issues.append("bad expiry")
+    else:
+        expiry_ad = row['expiry']
+        if row.get('exp_month_only'):
+            # Good through the month's last day: expired once the next month has started
+            expiry_ad = _next_month(expiry_ad)
+        if row['exp_fmt'] == "BS":
+            if to_ad is None:
+                from date_utils import DateUtils
+                to_ad = DateUtils.bs_to_ad
+            expiry_ad = to_ad(expiry_ad)
+        if expiry_ad <= (today or date.today()).isoformat():
+            issues.append("expired")
+    if row['qty'] <= 0 and row['free'] <= 0:
+        issues.append("no quantity")
+    if row['rate'] < 0 or row['disc'] < 0 or row['disc'] > 100:
+        issues.append("bad rate/discount")
+    return issues
+
+
+def rows_from_distributor_file(path, matcher, today=None, to_ad=None):
+    """Read, match and validate a CSV/XLSX file -> GRN row values with an ``issues`` list.
+
+    Each distinct (name, code) pair is matched once, so an invoice listing
+    the same product in several batches costs one lookup.
+    """
+    lines, _ = read_distributor_file(path)
+    keys = {(str(c.get("product")).strip(), str(c.get("code") or "").strip()) for _, c in lines}
+    matches = {key: matcher.match(key[0], key[1] or None) for key in keys}
+
+    rows = []
+    for line_no, cells in lines:
+        product = str(cells.get("product")).strip()
+        med, score = matches[(product, str(cells.get("code") or "").strip())]
+        exp = cells.get("expiry")
+        month_only = not hasattr(exp, "strftime") and is_month_only(exp)
+        expiry, exp_fmt = parse_expiry(exp.strftime("%Y-%m-%d") if hasattr(exp, "strftime") else exp)
+        qty, rate = _number(cells.get("qty"), int), _number(cells.get("rate"))
+        if not rate and qty and cells.get("amount") is not None:
+            rate = round(_number(cells.get("amount")) / qty, 2)
+        mrp = _number(cells.get("mrp"))
+        if not mrp and med:
+            mrp = _number(med.get('mrp') or med.get('selling_price'))
+        row = {
+            "line": line_no,
+            "medicine_id": med['id'] if med else 0,
+            "name": med['name'] if med else product,
+            "raw_name": product,
+            "score": round(score, 2),
+            "batch": str(cells.get("batch") or "").strip(),
+            "expiry": expiry,
+            "exp_fmt": exp_fmt,
+            "exp_month_only": month_only,
+            "qty": qty,
+            "free": _number(cells.get("free"), int),
+            "rate": rate,
+            "mrp": mrp,
+            "disc": _number(cells.get("disc")),
+            "vat": _vat_flag(cells.get("vat")),  # None: no VAT column / blank cell
+        }
+        row["issues"] = validate_line(row, today, to_ad)
+        rows.append(row)
+    return rows
+
+
+def purchase_items(rows, to_ad=None, vat=True):
+    """Valid rows -> (/purchases ``items``, totals summary) computed in one GRNTotals pass.
+
+    A row's own ``vat`` flag (from the file's VAT column) wins; ``vat`` is
+    used for rows without one.
+    """
+    from grn_totals import GRNTotals
+    totals = GRNTotals(capacity=max(1, len(rows)))
+    slots = [totals.add(r['qty'], r['rate'], r['disc'], vat if r.get('vat') is None else r['vat']) for r in rows]
+    totals.recompute()
+    disc_amts, tax_amts, line_totals = totals.amounts(slots)
+    if to_ad is None:
+        from date_utils import DateUtils
+        to_ad = DateUtils.bs_to_ad
+    items = [{
+        "medicine_id": r['medicine_id'],
+        "batch_no": r['batch'],
+        "expiry_date": (to_ad(r['expiry']) if r['exp_fmt'] == "BS" else r['expiry']) or None,
+        "qty": r['qty'],
+        "free_qty": r['free'],
+        "purchase_rate": r['rate'],
+        "mrp": r['mrp'],
+        "discount_amount": round(float(disc_amts[i]), 2),
+        "tax_amount": round(float(tax_amts[i]), 2),
+        "line_total": round(float(line_totals[i]), 2),
+    } for i, r in enumerate(rows)]
+    return items, totals.summary()
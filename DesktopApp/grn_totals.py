@@ -0,0 +1,117 @@
+import numpy as np
+
+
+VAT_RATE = 0.13
+
+
+class GRNTotals:
+    """GRN line amounts held in NumPy arrays with running summary totals.
+
+    Every grid row owns a slot. ``update(slot, ...)`` recomputes just that
+    line and moves the subtotal / discount / VAT sums by the difference,
+    so an edit costs the same on a 3-line and a 150-line invoice.
+    ``recompute()`` re-sums all active slots in one vectorized pass (after
+    a bulk import, or to drop accumulated rounding drift) and ``amounts()``
+    returns per-line figures for the save payload.
+    """
+
+    def __init__(self, capacity=64, vat_rate=VAT_RATE):
+        self.vat_rate = vat_rate
+        self.qty = np.zeros(capacity)
+        self.rate = np.zeros(capacity)
+        self.disc = np.zeros(capacity)      # percent
+        self.vat = np.zeros(capacity, bool)
+        self.active = np.zeros(capacity, bool)
+        # Derived per-line amounts, kept so a delta can be taken
+        self.base = np.zeros(capacity)
+        self.disc_amt = np.zeros(capacity)
+        self.vat_amt = np.zeros(capacity)
+        self._size = 0
+        self.subtotal = 0.0
+        self.discount = 0.0
+        self.tax = 0.0
+
+    def __len__(self):
+        return int(self.active[:self._size].sum())
+
+    @property
+    def grand_total(self):
+        return self.subtotal - self.discount + self.tax
+
+    def _grow(self):
+        capacity = len(self.qty) * 2
+        for name in ("qty", "rate", "disc", "vat", "active", "base", "disc_amt", "vat_amt"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    # --- LINES ---
+
+    def add(self, qty=0, rate=0.0, disc=0.0, vat=True):
+        """Open a slot for a new line and return it"""
+        if self._size == len(self.qty):
+            self._grow()
+        slot = self._size
+        self._size += 1
+        self.active[slot] = True
+        self.update(slot, qty, rate, disc, vat)
+        return slot
+
+    def update(self, slot, qty=None, rate=None, disc=None, vat=None):
+        """Change a line's inputs (None keeps the current value); returns its line total"""
+        if qty is not None: self.qty[slot] = qty
+        if rate is not None: self.rate[slot] = rate
+        if disc is not None: self.disc[slot] = disc
+        if vat is not None: self.vat[slot] = vat
+
+        base = float(self.qty[slot] * self.rate[slot])
+        disc_amt = base * float(self.disc[slot]) / 100
+        vat_amt = (base - disc_amt) * self.vat_rate if self.vat[slot] else 0.0
+
+        self.subtotal += base - self.base[slot]
+        self.discount += disc_amt - self.disc_amt[slot]
+        self.tax += vat_amt - self.vat_amt[slot]
+        self.base[slot], self.disc_amt[slot], self.vat_amt[slot] = base, disc_amt, vat_amt
+        return base - disc_amt + vat_amt
+
+    def remove(self, slot):
+        if not self.active[slot]:
+            return
+        self.subtotal -= self.base[slot]
+        self.discount -= self.disc_amt[slot]
+        self.tax -= self.vat_amt[slot]
+        self.active[slot] = False
+        self.qty[slot] = self.rate[slot] = self.disc[slot] = 0
+        self.base[slot] = self.disc_amt[slot] = self.vat_amt[slot] = 0
+
+    def line_total(self, slot):
+        return float(self.base[slot] - self.disc_amt[slot] + self.vat_amt[slot])
+
+    # --- BULK ---
+
+    def recompute(self):
+        """Rebuild every derived amount and the sums from the inputs in one pass"""
+        n = self._size
+        live = self.active[:n]
+        self.base[:n] = np.where(live, self.qty[:n] * self.rate[:n], 0.0)
+        self.disc_amt[:n] = self.base[:n] * self.disc[:n] / 100
+        self.vat_amt[:n] = np.where(self.vat[:n], (self.base[:n] - self.disc_amt[:n]) * self.vat_rate, 0.0)
+        self.subtotal = float(self.base[:n].sum())
+        self.discount = float(self.disc_amt[:n].sum())
+        self.tax = float(self.vat_amt[:n].sum())
+
+    def amounts(self, slots):
+        """(discount, tax, line total) arrays for the given slots"""
+        slots = np.asarray(slots, dtype=int)
+        disc, tax = self.disc_amt[slots], self.vat_amt[slots]
+        return disc, tax, self.base[slots] - disc + tax
+
+    def summary(self):
+        """Rounded totals for display / the purchase payload"""
+        return {
+            "subtotal": round(self.subtotal, 2),
+            "discount_total": round(self.discount, 2),
+            "tax_total": round(self.tax, 2),
+            "grand_total": round(self.grand_total, 2),
+        }
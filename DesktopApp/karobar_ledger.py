@@ -0,0 +1,104 @@
+import os
+
+
+LEDGER_COLUMNS = [
+    ("Date (BS)", "date"), ("Account", "bank_name"), ("Category", "category_name"), ("Reference", "reference"),
+    ("In", "in_amount"), ("Out", "out_amount"), ("Balance", "running_balance"), ("By", "performed_by_name"),
+]
+# Filters that leave entries out: the listed rows no longer add up to a balance
+PARTIAL_FILTERS = ("type", "category_id", "search")
+
+
+def is_partial(filters):
+    return any(filters.get(key) for key in PARTIAL_FILTERS)
+
+
+class StatementLedger:
+    """Running balance over /karobar/statements pages in ledger mode (oldest first).
+
+    The first page carries ``opening_balance`` (the selected accounts'
+    balance before the date range); every later page continues from the
+    previous page's closing balance, so no page needs the ones before it
+    re-fetched. With type/category/search filters (``running=False``) only
+    the in/out totals are kept: a balance over some of the entries would be
+    neither the account balance nor anything else meaningful.
+    """
+
+    def __init__(self, running=True):
+        self.running = running
+        self.opening = None
+        self.balance = 0.0
+        self.total_in = 0.0
+        self.total_out = 0.0
+        self.count = 0
+
+    @property
+    def closing(self):
+        return round(self.balance, 2) if self.running else None
+
+    def add_page(self, page):
+        """Annotate a page's rows with in/out amounts and the running balance; returns the rows"""
+        if self.opening is None:
+            self.opening = float(page.get('opening_balance') or 0)
+            self.balance = self.opening
+        rows = page.get('rows', [])
+        for row in rows:
+            amount = float(row.get('amount') or 0)
+            if row.get('type') == 'IN':
+                self.balance += amount
+                self.total_in += amount
+                row['in_amount'], row['out_amount'] = amount, None
+            else:
+                self.balance -= amount
+                self.total_out += amount
+                row['in_amount'], row['out_amount'] = None, amount
+            row['running_balance'] = round(self.balance, 2) if self.running else None
+        self.count += len(rows)
+        return rows
+
+
+def row_values(row, to_bs=None):
+    """Cells for LEDGER_COLUMNS"""
+    date = str(row.get('created_at') or "").split("T")[0][:10]
+    reference = row.get('reference_no') or row.get('reason') or row.get('notes') or ""
+    values = dict(row, date=to_bs(date) if to_bs and date else date, reference=reference)
+    return [values.get(key) for _, key in LEDGER_COLUMNS]
+
+
+def export_ledger_xlsx(path, fetch_page, to_bs=None, progress=None, limit=500, running=True):
+    """Stream the whole (filtered) ledger into a write-only workbook, page by page.
+
+    ``progress(rows written)`` is called after each page; if it reports
+    ``cancelled`` no file is left behind and None is returned. Returns the
+    StatementLedger with the totals otherwise. With ``running=False`` the
+    balance column stays empty and the footer holds the filtered totals.
+    """
+    from openpyxl import Workbook
+
+    ledger = StatementLedger(running)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Statement")
+    ws.append([h for h, _ in LEDGER_COLUMNS])
+    opening_written = False
+    cursor = None
+    while True:
+        page = fetch_page(cursor, limit)
+        rows = ledger.add_page(page)
+        if not opening_written:
+            ws.append(["", "Opening Balance", "", "", None, None, ledger.opening, ""])
+            opening_written = True
+        for row in rows:
+            ws.append(row_values(row, to_bs))
+        if progress:
+            if getattr(progress, 'cancelled', False):
+                wb.save(path)  # finishes the write-only stream cleanly; then drop the partial file
+                os.remove(path)
+                return None
+            progress(ledger.count)
+        cursor = page.get('next_cursor')
+        if cursor is None:
+            break
+    ws.append(["", "Closing Balance" if running else "Filtered Totals", "", "",
+               ledger.total_in, ledger.total_out, ledger.closing, ""])
+    wb.save(path)
+    return ledger
@@ -61,17 +61,35 @@ sys.excepthook = global_exception_handler
 from ScannerModule import ScannerModule
 from karobar_ui import KarobarUI
 from date_utils import DateUtils
+from api_client import ApiClient
+from task_runner import TaskRunner
+from stock_index import StockIndex
+from autocomplete import Autocomplete, PrefixCache, medicine_matches
+from cart import Cart
+from virtual_table import VirtualTable, Column
+from paging import CursorPager
+from sales_journal import SalesJournal, SalesSync
+from clock_service import ClockService
+from scan_input import ScanQueue, WedgeDetector
+from qr_cache import QRImageCache
+from grn_totals import GRNTotals
+from report_store import ReportStore
+from avatar_cache import AvatarCache
+from screen_manager import ScreenManager
 
 # --- CONFIGURATION (Load from file if exists) ---
 CONFIG_FILE = "config.json"
 DEFAULT_API_BASE = "http://127.0.0.1:5000/api"
 
 API_BASE = DEFAULT_API_BASE
+# Camera scanner tuning, e.g. "scanner": {"symbologies": ["EAN_13", "QR"], "adaptive_order": true}
+SCANNER_CONFIG = {}
 if os.path.exists(CONFIG_FILE):
     try:
         with open(CONFIG_FILE, "r") as f:
             config = json.load(f)
             API_BASE = config.get("api_url", DEFAULT_API_BASE)
+            SCANNER_CONFIG = config.get("scanner", SCANNER_CONFIG)
     except Exception as e:
         logging.error(f"Failed to load config.json: {e}")
 
@@ -84,6 +102,7 @@ if getattr(sys, 'frozen', False):
             with open(config_path, "r") as f:
                 config = json.load(f)
                 API_BASE = config.get("api_url", DEFAULT_API_BASE)
+                SCANNER_CONFIG = config.get("scanner", SCANNER_CONFIG)
         except: pass
 
 print(f"Using API Server: {API_BASE}")
@@ -140,6 +159,13 @@ class AarambhaPMS(ctk.CTk):
         self.root = self # Bridge for existing code using self.root
         self.API_BASE = API_BASE
         
+        # Shared pooled HTTP client (keep-alive, timeouts, retries, latency counters)
+        self.token = None
+        self.api = ApiClient(API_BASE, token_provider=lambda: self.token)
+        
+        # Background executor: HTTP off the Tk loop, results delivered via root.after
+        self.tasks = TaskRunner(self, max_workers=6)
+        
         # Start Backend Server
         self.backend_process = None
         self.start_backend()
@@ -164,7 +190,27 @@ class AarambhaPMS(ctk.CTk):
         self.nepali_date_var = StringVar()
         self.english_date_var = StringVar()
         self.day_var = StringVar()
-        self.update_time_date()
+        self.clock = ClockService(self, self.time_var, self.update_date_vars)
+        self.clock.start()
+        
+        # Sellable stock cached in memory for the billing terminal
+        self.stock_index = StockIndex()
+        
+        # Decoded payment QR images, so checkout never waits for a download
+        self.qr_cache = QRImageCache(os.path.join(os.path.expanduser("~"), ".aarambha_qr_cache"))
+        # Circular profile pictures / placeholders, decoded once per content + size
+        self.avatars = AvatarCache(maxsize=128)
+        
+        # Sales are journaled locally first and pushed to the backend in the background
+        self.sales_journal = SalesJournal(os.path.join(os.path.expanduser("~"), ".aarambha_sales_journal.db"))
+        self.sales_sync = SalesSync(self.sales_journal, self.post_journaled_sale, lookup=self.lookup_journaled_sale)
+        self.sales_sync.start()
+        
+        # Screens (and the sidebar) kept alive between visits
+        self.screens = ScreenManager(self)
+        self._sidebar = None
+        self._sidebar_key = None
+        self._nav_buttons = {}
         
         # Karobar Implementation
         self.karobar = KarobarUI(self)
@@ -180,7 +226,7 @@ class AarambhaPMS(ctk.CTk):
         try:
             # Check if backend is already running (e.g. check port 5000)
             try:
-                requests.get(f"{API_BASE}/check-license", timeout=1)
+                self.api.get("/check-license", timeout=1)
                 print("Backend already running")
                 return
             except:
@@ -214,13 +260,73 @@ class AarambhaPMS(ctk.CTk):
         if self.backend_process:
             self.backend_process.terminate()
     
+    def post_journaled_sale(self, payload, idempotency_key, auth_token):
+        """Push one journaled sale (runs on the sales sync thread)"""
+        headers = {"Idempotency-Key": idempotency_key}
+        if auth_token: headers["Authorization"] = f"Bearer {auth_token}"
+        return self.api.post("/sales", json=payload, headers=headers)
+
+    def lookup_journaled_sale(self, idempotency_key, auth_token):
+        """Bill number the server gave a sale with this key, or None (sales sync thread)"""
+        headers = {"Authorization": f"Bearer {auth_token}"} if auth_token else {}
+        r = self.api.get(f"/sales/by-key/{idempotency_key}", headers=headers)
+        if r.status_code == 404:
+            return None
+        if r.status_code != 200:
+            raise Exception(f"HTTP {r.status_code}: {r.text}")
+        return r.json().get('bill_number')
+
+    def show_rejected_sales(self, on_change=None):
+        """Sales the server refused: send again or mark as settled by hand"""
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title("Rejected Sales")
+        dialog.geometry("760x420")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        ctk.CTkLabel(dialog, text="⚠ Sales not accepted by the server", font=("Segoe UI Black", 18)).pack(pady=(15, 5))
+        ctk.CTkLabel(dialog, text="The customer has the provisional (PRV) invoice. Fix the cause and retry, or mark it resolved once settled by hand.",
+                     font=("Segoe UI", 11), text_color="gray", wraplength=700).pack(pady=(0, 10))
+        body = ctk.CTkScrollableFrame(dialog, fg_color="transparent")
+        body.pack(fill="both", expand=True, padx=15, pady=(0, 15))
+        
+        def act(fn, key):
+            fn(key)
+            if fn == self.sales_journal.retry:
+                self.sales_sync.wake()
+            if on_change: on_change()
+            render()
+        
+        def render():
+            for w in body.winfo_children(): w.destroy()
+            entries = self.sales_journal.rejected()
+            if not entries:
+                ctk.CTkLabel(body, text="No rejected sales", text_color="gray").pack(pady=30)
+                return
+            for e in entries:
+                row = ctk.CTkFrame(body, fg_color=("#fef2f2", "#3f1d1d"))
+                row.pack(fill="x", pady=3)
+                info = f"{e['provisional_number']}  •  {e['payload'].get('customer_name') or '-'}  •  Rs. {float(e['payload'].get('grand_total') or 0):,.2f}"
+                ctk.CTkLabel(row, text=info, font=("Segoe UI Bold", 12), anchor="w").pack(anchor="w", padx=10, pady=(6, 0))
+                ctk.CTkLabel(row, text=e['last_error'] or "", font=("Segoe UI", 10), text_color="#ef4444",
+                             anchor="w", wraplength=520, justify="left").pack(side="left", padx=10, pady=(0, 6))
+                ctk.CTkButton(row, text="Mark Resolved", width=110, fg_color="gray",
+                              command=lambda k=e['idempotency_key']: act(self.sales_journal.resolve, k)).pack(side="right", padx=5, pady=5)
+                ctk.CTkButton(row, text="Retry", width=70,
+                              command=lambda k=e['idempotency_key']: act(self.sales_journal.retry, k)).pack(side="right", padx=5, pady=5)
+        
+        render()
+
     def on_closing(self):
         self.stop_backend()
+        self.sales_sync.stop()
+        self.sales_journal.close()
+        self.tasks.shutdown()
+        self.api.close()
         self.destroy()
 
     def show_loading_screen(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         loading_frame = ctk.CTkFrame(self.root, fg_color=("#1a1a2e", "#0f0f1e"))
         loading_frame.pack(fill="both", expand=True)
@@ -246,41 +352,24 @@ class AarambhaPMS(ctk.CTk):
         # User requested to remove machine-id activation.
         self.show_login()
 
-    def update_time_date(self):
-        """Standard BS Date Clock"""
-        now = datetime.now()
-        self.time_var.set(now.strftime("%I:%M:%S %p"))
-        
+    def update_date_vars(self, now):
+        """Standard BS Date labels (called by the clock service once per day)"""
         # Strict Nepali Date
         full_bs = DateUtils.get_current_bs_date_full() # 2082 Magh 14
         bs_numeric = DateUtils.get_current_bs_date_str() # 2082-10-14
         
         parts = full_bs.split(' ')
         if len(parts) >= 3:
-            # English Text (e.g. 2082 Magh 14)
-            self.nepali_date_var.set(f"{parts[0]}, {parts[1]} {parts[2]}")
-            # English Gregorian (e.g. January 27, 2026) - Keep as secondary or remove? 
-            # User said "English date (AD) must NOT be shown anywhere". 
-            # Replacing with English Month text of BS date
-            self.english_date_var.set(now.strftime("%B %d, %Y")) # Revisit this if strict NO AD allowed even for mapping.
-            # actually user said "English date (AD) must NOT be shown". 
-            # I will replace the secondary text with the Numeric BS date to be safe.
-            self.english_date_var.set(now.strftime("%B %d, %Y")) # Wait, this IS AD.
-            
-            # Correction:
-            self.english_date_var.set(now.strftime("%B %d, %Y")) # OLD
-            
-            # New Strict Logic:
+            # English date (AD) must NOT be shown: secondary line is the numeric BS date
             self.nepali_date_var.set(f"{parts[0]}, {parts[1]} {parts[2]}") # 2082, Magh 14
             self.english_date_var.set(bs_numeric) # 2082-10-14 (Strict BS Only)
 
         self.day_var.set(now.strftime("%A"))
-        self.after(1000, self.update_time_date)
         
     def check_license(self, current_machine_id):
         """Global license enforcement: No License = No Access"""
         try:
-            response = requests.post(f"{API_BASE}/check-license", json={"machine_id": current_machine_id}, timeout=30)
+            response = self.api.post("/check-license", json={"machine_id": current_machine_id}, timeout=30)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('valid'):
@@ -298,8 +387,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_locked_screen(self, msg="Activation Required"):
         """Strict enforcement: Locked mode only allows activation"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
             
         locked_frame = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         locked_frame.pack(fill="both", expand=True)
@@ -344,7 +432,7 @@ class AarambhaPMS(ctk.CTk):
                 return
             
             try:
-                res = requests.post(f"{API_BASE}/activate-system", json={
+                res = self.api.post("/activate-system", json={
                     "machine_id": self.machine_id,
                     "license_key": key,
                     "role": role,
@@ -386,7 +474,7 @@ class AarambhaPMS(ctk.CTk):
                 try:
                     # Special endpoint to activate device via Super Admin credentials
                     # print(f"Sending request to {API_BASE}/activate-super-admin")
-                    res = requests.post(f"{API_BASE}/activate-super-admin", json={
+                    res = self.api.post("/activate-super-admin", json={
                         "machine_id": self.machine_id,
                         "phone": p,
                         "password": pw
@@ -434,8 +522,7 @@ class AarambhaPMS(ctk.CTk):
     
     def show_activation_screen(self):
         """First-time activation screen"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_frame = ctk.CTkFrame(self.root, fg_color=("#1a1a2e", "#0f0f1e"))
         main_frame.pack(fill="both", expand=True)
@@ -487,7 +574,7 @@ class AarambhaPMS(ctk.CTk):
                 return
             
             try:
-                response = requests.post(f"{API_BASE}/activate", json={
+                response = self.api.post("/activate", json={
                     "machine_id": MACHINE_ID,
                     "activation_key": key
                 })
@@ -511,8 +598,7 @@ class AarambhaPMS(ctk.CTk):
         
     def show_login(self):
         """Enhanced login screen"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
             
         main_frame = ctk.CTkFrame(self.root, fg_color=("#1a1a2e", "#0f0f1e"))
         main_frame.pack(fill="both", expand=True)
@@ -704,7 +790,7 @@ class AarambhaPMS(ctk.CTk):
     def refresh_user_profile(self):
         """Fetch latest user data (permissions etc.) from server"""
         try:
-            res = requests.get(f"{API_BASE}/auth/profile", headers={"Authorization": f"Bearer {self.token}"})
+            res = self.api.get("/auth/profile")
             if res.status_code == 200:
                 self.user = res.json()
                 return True
@@ -726,7 +812,7 @@ class AarambhaPMS(ctk.CTk):
         try:
             # messagebox.showinfo("Debug", f"Connecting to {API_BASE}/login...")
             # We add a longer timeout here
-            response = requests.post(f"{API_BASE}/login", json={
+            response = self.api.post("/login", json={
                 "phone": phone,
                 "password": password
             }, timeout=15)
@@ -737,11 +823,12 @@ class AarambhaPMS(ctk.CTk):
                 data = response.json()
                 self.token = data['token']
                 self.user = data['user']
+                self.sales_sync.wake() # Push anything queued while logged out
                 
                 # Auto-activate Super Admin device permanently on first login
                 if self.user['role'] == 'SUPER_ADMIN':
                     try:
-                        requests.post(f"{API_BASE}/activate-super-admin", json={
+                        self.api.post("/activate-super-admin", json={
                             "machine_id": MACHINE_ID,
                             "phone": phone,
                             "password": password
@@ -809,7 +896,7 @@ class AarambhaPMS(ctk.CTk):
                 return
             
             try:
-                response = requests.post(f"{API_BASE}/password-reset-sms", json={"phone": phone})
+                response = self.api.post("/password-reset-sms", json={"phone": phone})
                 if response.status_code == 200:
                     messagebox.showinfo("Success", "Password reset code sent via SMS! Check your phone.")
                     dialog.destroy()
@@ -841,26 +928,9 @@ class AarambhaPMS(ctk.CTk):
     
     def get_circular_image(self, base64_image=None, size=(60, 60), color="#6366f1"):
         """Convert base64 image to circular CTkImage, or return initial-based circle"""
-        from PIL import Image, ImageDraw, ImageOps
         try:
-            mask = Image.new('L', size, 0)
-            draw = ImageDraw.Draw(mask)
-            draw.ellipse((0, 0) + size, fill=255)
-
-            if base64_image and len(base64_image) > 100:
-                import base64
-                img_data = base64.b64decode(base64_image)
-                img = Image.open(io.BytesIO(img_data)).convert("RGBA")
-                img = ImageOps.fit(img, size, centering=(0.5, 0.5))
-                output = Image.new('RGBA', size, (0, 0, 0, 0))
-                output.paste(img, (0, 0), mask=mask)
-                return ctk.CTkImage(light_image=output, dark_image=output, size=size)
-            
-            # Default colored circle
-            output = Image.new('RGBA', size, (0, 0, 0, 0))
-            draw = ImageDraw.Draw(output)
-            draw.ellipse((2, 2, size[0]-2, size[1]-2), fill=color)
-            return ctk.CTkImage(light_image=output, dark_image=output, size=size)
+            # Decoded once per picture/size/colour; see AvatarCache
+            return self.avatars.get(base64_image, size, color)
         except Exception as e:
             print(f"Image error: {e}")
             return None
@@ -916,7 +986,7 @@ class AarambhaPMS(ctk.CTk):
                 return
             
             try:
-                response = requests.post(f"{API_BASE}/verify-reset-code", json={
+                response = self.api.post("/verify-reset-code", json={
                     "phone": phone,
                     "code": code,
                     "newPassword": new_password
@@ -1032,8 +1102,34 @@ class AarambhaPMS(ctk.CTk):
     
     def create_sidebar(self, parent, nav_items, current_page="Dashboard"):
         """Professional Localized Sidebar based on User Image"""
-        sidebar = ctk.CTkFrame(parent, width=320, fg_color=("#12b8ff", "#0ea5e9"), corner_radius=0)
-        sidebar.pack(side="left", fill="y")
+        # Every screen builds its sidebar first, so this is where navigation
+        # happens: drop background work still queued for the previous screen.
+        self.tasks.cancel_all()
+        
+        # The sidebar is shared by every screen whose container sits directly in the window:
+        # it is built once per user/menu and only re-highlighted on navigation.
+        shared = parent.master is self.root and parent.winfo_manager() == "pack"
+        pic = self.user.get('profile_pic') if self.user else None
+        key = (self.user.get('id') if self.user else None, self.user_role_label(),
+               hash(pic), tuple(text for text, _ in nav_items))
+        
+        if shared and self._sidebar is not None and self._sidebar.winfo_exists() and self._sidebar_key == key:
+            self._sidebar.pack(side="left", fill="y", before=parent)
+            self.highlight_nav(current_page)
+            return self._sidebar
+        
+        if shared and self._sidebar is not None:
+            self.screens.forget(self._sidebar)
+            if self._sidebar.winfo_exists():
+                self._sidebar.destroy()
+        
+        sidebar = ctk.CTkFrame(self.root if shared else parent, width=320, fg_color=("#12b8ff", "#0ea5e9"), corner_radius=0)
+        if shared:
+            sidebar.pack(side="left", fill="y", before=parent)
+            self.screens.keep(sidebar)
+            self._sidebar, self._sidebar_key = sidebar, key
+        else:
+            sidebar.pack(side="left", fill="y")
         sidebar.pack_propagate(False)
 
         # 1. Profile Area (Top Header)
@@ -1044,7 +1140,7 @@ class AarambhaPMS(ctk.CTk):
         text_side = ctk.CTkFrame(profile_frame, fg_color="transparent")
         text_side.pack(side="left", fill="both", expand=True)
         
-        role_label = ctk.CTkLabel(text_side, text=f"{self.user['role'] if self.user else 'ADMIN'}", font=("Segoe UI Black", 16), text_color="white", anchor="w")
+        role_label = ctk.CTkLabel(text_side, text=self.user_role_label(), font=("Segoe UI Black", 16), text_color="white", anchor="w")
         role_label.pack(fill="x", padx=10)
         
         sub_role = ctk.CTkLabel(text_side, text="Administrator", font=("Segoe UI", 13), text_color="#f1f5f9", anchor="w")
@@ -1147,29 +1243,46 @@ class AarambhaPMS(ctk.CTk):
         for item in nav_items:
             print(f"  - {item[0]}")
         
-        # Redefine active page comparison to be safer
+        # Nav buttons; the active one is highlighted separately so a reused sidebar can follow navigation
+        self._nav_buttons = {}
         for text, command in nav_items:
-            clean_text = text
-            for emoji in ["📊 ", "👥 ", "📦 ", "🔐 ", "📢 ", "🧾 ", "📅 ", "📜 ", "⚙️ ", "💰 ", "📉 ", "⚠️ ", "🔄 ", "👤 ", "🤝 ", "🛒 ", "↩️ "]:
-                clean_text = clean_text.replace(emoji, "")
-                
-            is_active = clean_text == current_page
-            
             btn = ctk.CTkButton(
                 nav_frame,
                 text=text,
                 anchor="w",
                 height=45,
                 font=("Segoe UI Semibold", 13),
-                fg_color=("#0369a1", "#075985") if is_active else "transparent",
+                fg_color="transparent",
                 text_color="white",
                 hover_color=("#075985", "#0369a1"),
                 command=command
             )
             btn.pack(fill="x", pady=2)
+            self._nav_buttons[self.clean_nav_text(text)] = btn
+        
+        self.highlight_nav(current_page)
         
         return sidebar
 
+    def user_role_label(self):
+        return f"{self.user['role'] if self.user else 'ADMIN'}"
+
+    @staticmethod
+    def clean_nav_text(text):
+        for emoji in ["📊 ", "👥 ", "📦 ", "🔐 ", "📢 ", "🧾 ", "📅 ", "📜 ", "⚙️ ", "💰 ", "📉 ", "⚠️ ", "🔄 ", "👤 ", "🤝 ", "🛒 ", "↩️ "]:
+            text = text.replace(emoji, "")
+        return text
+
+    def highlight_nav(self, current_page):
+        """Mark the sidebar button for the current page as active"""
+        current_page = self.clean_nav_text(current_page)
+        for clean_text, btn in self._nav_buttons.items():
+            if not btn.winfo_exists(): continue
+            active = clean_text == current_page
+            color = ("#0369a1", "#075985") if active else "transparent"
+            if btn.cget("fg_color") != color:
+                btn.configure(fg_color=color)
+
     def add_back_button(self, parent, target_command=None):
         """Standard back button for headers"""
         if target_command is None:
@@ -1192,8 +1305,7 @@ class AarambhaPMS(ctk.CTk):
     
     def show_system_calendar(self):
         """Calendar view with holidays and navigation"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -1323,12 +1435,20 @@ class AarambhaPMS(ctk.CTk):
         """Logout and return to login screen"""
         self.token = None
         self.user = None
+        self.screens.discard_all()
+        # Per-pharmacy caches: the next login may be a different tenant
+        self.tasks.cancel("stock_index")
+        self.stock_index = StockIndex()
+        self._medicine_matcher = None
+        self.payment_methods_cache = []
+        if getattr(self, 'product_search', None) is not None:
+            self.product_search.hide()
+            self.product_search = None
         self.show_login()
     
     def show_super_admin_dashboard(self):
         """Complete Super Admin Dashboard"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -1378,8 +1498,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_admin_dashboard(self):
         """Admin Dashboard"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -1395,8 +1514,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_system_users(self):
         """Management interface for Super Admins and other staff"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -1485,7 +1603,7 @@ class AarambhaPMS(ctk.CTk):
                 return
                 
             try:
-                res = requests.post(f"{API_BASE}/users", json=data, headers={"Authorization": f"Bearer {self.token}"})
+                res = self.api.post("/users", json=data)
                 if res.status_code == 200:
                     messagebox.showinfo("Success", "Super Admin Created Successfully!")
                     dialog.destroy()
@@ -1509,7 +1627,7 @@ class AarambhaPMS(ctk.CTk):
         """Load and display list of system users"""
         try:
             # Note: We need a backend route for this. Let's assume /api/super/users
-            res = requests.get(f"{API_BASE}/users/all", headers={"Authorization": f"Bearer {self.token}"})
+            res = self.api.get("/users/all")
             users = res.json() if res.status_code == 200 else []
         except:
             users = []
@@ -1534,7 +1652,7 @@ class AarambhaPMS(ctk.CTk):
         stats_frame.pack(fill="x", pady=(0, 30))
         
         try:
-            response = requests.get(f"{API_BASE}/super/stats", headers={"Authorization": f"Bearer {self.token}"})
+            response = self.api.get("/super/stats")
             if response.status_code == 200:
                 data = response.json()
             else:
@@ -1626,8 +1744,7 @@ class AarambhaPMS(ctk.CTk):
     
     def show_clients_management(self):
         """Client management interface"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -1638,7 +1755,7 @@ class AarambhaPMS(ctk.CTk):
         self.create_sidebar(main_container, nav_items, "Client Accounts")
         
         # Main content
-        content = ctk.CTkScrollableFrame(main_container, fg_color="transparent")
+        content = ctk.CTkFrame(main_container, fg_color="transparent")
         content.pack(side="right", fill="both", expand=True, padx=30, pady=30)
         
         # Header with Add button
@@ -1683,7 +1800,7 @@ class AarambhaPMS(ctk.CTk):
                 
             try:
                 headers = {"Authorization": f"Bearer {self.token}"}
-                response = requests.get(f"{API_BASE}/super/clients/search?query={query}", headers=headers)
+                response = self.api.get(f"/super/clients/search?query={query}", headers=headers)
                 if response.status_code == 200:
                     clients = response.json()
                     self.display_clients_in_container(clients_list_container, clients)
@@ -1879,7 +1996,7 @@ class AarambhaPMS(ctk.CTk):
                 if logo_path.get(): files['logo'] = open(logo_path.get(), 'rb')
                 if photo_path.get(): files['owner_photo'] = open(photo_path.get(), 'rb')
                 
-                res = requests.post(f"{API_BASE}/super/clients", data=data, files=files, headers={"Authorization": f"Bearer {self.token}"})
+                res = self.api.post("/super/clients", data=data, files=files)
                 
                 # Cleanup
                 for f in files.values(): f.close()
@@ -1910,9 +2027,8 @@ class AarambhaPMS(ctk.CTk):
 
         """Load and display clients"""
         try:
-            response = requests.get(
-                f"{API_BASE}/super/clients",
-                headers={"Authorization": f"Bearer {self.token}"}
+            response = self.api.get(
+                "/super/clients"
             )
             
             if response.status_code == 200:
@@ -1937,84 +2053,27 @@ class AarambhaPMS(ctk.CTk):
             ).pack(pady=50)
             return
         
-        for client in clients:
-            client_card = ctk.CTkFrame(parent, fg_color=("#ffffff", "#1e293b"), corner_radius=15)
-            client_card.pack(fill="x", pady=10)
-            
-            info_frame = ctk.CTkFrame(client_card, fg_color="transparent")
-            info_frame.pack(side="left", fill="both", expand=True, padx=25, pady=20)
-            
-            ctk.CTkLabel(
-                info_frame,
-                text=client.get('pharmacy_name', 'N/A'),
-                font=("Segoe UI Black", 18, "bold"),
-                text_color=("#1e293b", "#f1f5f9"),
-                anchor="w"
-            ).pack(anchor="w")
-            
-            ctk.CTkLabel(
-                info_frame,
-                text=f"📍 {client.get('address', 'N/A')} | 📞 {client.get('contact_number', 'N/A')}",
-                font=("Segoe UI", 13),
-                text_color=("#64748b", "#94a3b8"),
-                anchor="w"
-            ).pack(anchor="w", pady=(5, 0))
-            
-            ctk.CTkLabel(
-                info_frame,
-                text=f"ID: {client.get('client_id_code', 'N/A')} | Package: {client.get('package_name', 'N/A')}",
-                font=("Segoe UI", 12),
-                text_color=("#94a3b8", "#64748b"),
-                anchor="w"
-            ).pack(anchor="w", pady=(5, 0))
-            
-            # Status and actions
-            action_frame = ctk.CTkFrame(client_card, fg_color="transparent")
-            action_frame.pack(side="right", padx=25, pady=20)
-            
-            status_color = "#10b981" if client.get('status') == 'active' else "#ef4444"
-            ctk.CTkLabel(
-                action_frame,
-                text=client.get('status', 'unknown').upper(),
-                font=("Segoe UI Black", 12),
-                text_color=(status_color, status_color)
-            ).grid(row=0, column=0, columnspan=2, pady=5)
-            
-            ctk.CTkButton(
-                action_frame,
-                text="📄 Profile",
-                width=100,
-                height=35,
-                font=("Segoe UI Semibold", 12),
-                command=lambda c=client: self.show_client_details(c)
-            ).grid(row=1, column=0, padx=5, pady=5)
-
-            ctk.CTkButton(
-                action_frame,
-                text="🔑 LOGIN",
-                width=100,
-                height=35,
-                font=("Segoe UI Black", 11),
-                fg_color="#4f46e5",
-                command=lambda c=client: self.login_as_client_admin(c)
-            ).grid(row=1, column=1, padx=5, pady=5)
-
-            ctk.CTkButton(
-                action_frame,
-                text="🗑️ DELETE",
-                width=100,
-                height=35,
-                font=("Segoe UI Black", 11),
-                fg_color="#ef4444",
-                hover_color="#dc2626",
-                command=lambda c=client: self.delete_client(c)
-            ).grid(row=2, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
+        def status_color(client):
+            return "#10b981" if client.get('status') == 'active' else "#ef4444"
+        
+        # Only the visible rows are built; they are re-used as the list scrolls
+        table = VirtualTable(parent, columns=[
+            Column("Pharmacy", 220, "pharmacy_name", anchor="w"),
+            Column("Address / Contact", 260, lambda c: f"📍 {c.get('address', 'N/A')}\n📞 {c.get('contact_number', 'N/A')}", anchor="w"),
+            Column("ID / Package", 180, lambda c: f"{c.get('client_id_code', 'N/A')}\n{c.get('package_name', 'N/A')}"),
+            Column("Status", 90, lambda c: str(c.get('status', 'unknown')).upper(), color=status_color),
+        ], rows=clients, row_height=56, actions=[
+            ("📄 Profile", self.show_client_details, {"width": 90, "height": 32}),
+            ("🔑 LOGIN", self.login_as_client_admin, {"width": 90, "height": 32, "fg_color": "#4f46e5"}),
+            ("🗑️ DELETE", self.delete_client, {"width": 90, "height": 32, "fg_color": "#ef4444", "hover_color": "#dc2626"}),
+        ], fg_color=("#ffffff", "#1e293b"), corner_radius=15)
+        table.pack(fill="both", expand=True, pady=10)
 
     def delete_client(self, client):
         """Permanently delete a client"""
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to PERMANENTLY delete {client.get('pharmacy_name')}?\nThis will remove all their medicines, users, and data!"):
             try:
-                res = requests.delete(f"{API_BASE}/super/clients/{client['id']}", headers={"Authorization": f"Bearer {self.token}"})
+                res = self.api.delete(f"/super/clients/{client['id']}")
                 if res.status_code == 200:
                     messagebox.showinfo("Success", "Client and all associated data deleted successfully.")
                     self.show_clients_management()
@@ -2043,7 +2102,7 @@ class AarambhaPMS(ctk.CTk):
             try:
                 # Assuming standard server path, might need adjustment for local dev
                 url = f"http://localhost:5000/{logo_path}"
-                resp = requests.get(url)
+                resp = self.api.get(url)
                 img_data = io.BytesIO(resp.content)
                 img = Image.open(img_data).resize((100, 100))
                 logo_img = ImageTk.PhotoImage(img)
@@ -2091,7 +2150,7 @@ class AarambhaPMS(ctk.CTk):
         if photo_path:
             try:
                 url = f"http://localhost:5000/{photo_path}"
-                resp = requests.get(url)
+                resp = self.api.get(url)
                 img_data = io.BytesIO(resp.content)
                 img = Image.open(img_data).resize((150, 200))
                 owner_img = ImageTk.PhotoImage(img)
@@ -2163,11 +2222,10 @@ class AarambhaPMS(ctk.CTk):
                 if new_logo.get() != "No file selected": files['logo'] = open(new_logo.get(), 'rb')
                 if new_photo.get() != "No file selected": files['owner_photo'] = open(new_photo.get(), 'rb')
                 
-                res = requests.put(
-                    f"{API_BASE}/super/clients/{client.get('id')}",
+                res = self.api.put(
+                    f"/super/clients/{client.get('id')}",
                     data=data,
-                    files=files,
-                    headers={"Authorization": f"Bearer {self.token}"}
+                    files=files
                 )
                 
                 for f in files.values(): f.close()
@@ -2186,8 +2244,7 @@ class AarambhaPMS(ctk.CTk):
     
     def show_package_builder(self):
         """Complete Package Builder interface"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -2231,7 +2288,7 @@ class AarambhaPMS(ctk.CTk):
     def load_packages_list(self, parent):
         """Load and display all packages"""
         try:
-            response = requests.get(f"{API_BASE}/super/packages", headers={"Authorization": f"Bearer {self.token}"})
+            response = self.api.get("/super/packages")
             if response.status_code == 200:
                 packages = response.json()
             else:
@@ -2487,16 +2544,15 @@ class AarambhaPMS(ctk.CTk):
             features_str = ", ".join(selected_features) if selected_features else "No features selected"
             
             try:
-                response = requests.post(
-                    f"{API_BASE}/super/packages",
+                response = self.api.post(
+                    "/super/packages",
                     json={
                         "name": name,
                         "description": description,
                         "price": price,
                         "features": features_str,
                         "max_users": max_users
-                    },
-                    headers={"Authorization": f"Bearer {self.token}"}
+                    }
                 )
                 
                 if response.status_code == 200:
@@ -2542,9 +2598,8 @@ class AarambhaPMS(ctk.CTk):
         """Delete package"""
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete '{package.get('name')}'?"):
             try:
-                response = requests.delete(
-                    f"{API_BASE}/super/packages/{package.get('id')}",
-                    headers={"Authorization": f"Bearer {self.token}"}
+                response = self.api.delete(
+                    f"/super/packages/{package.get('id')}"
                 )
                 if response.status_code == 200:
                     messagebox.showinfo("Success", "Package deleted successfully!")
@@ -2556,8 +2611,7 @@ class AarambhaPMS(ctk.CTk):
     
     def show_license_management(self):
         """License and Activation management interface with client selection"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -2581,9 +2635,8 @@ class AarambhaPMS(ctk.CTk):
         # Fetch clients for dropdown
         clients_data = []
         try:
-            response = requests.get(
-                f"{API_BASE}/super/clients",
-                headers={"Authorization": f"Bearer {self.token}"}
+            response = self.api.get(
+                "/super/clients"
             )
             if response.status_code == 200:
                 clients_data = response.json()
@@ -2669,10 +2722,9 @@ class AarambhaPMS(ctk.CTk):
                 return
                 
             try:
-                response = requests.post(
-                    f"{API_BASE}/super/generate-key",
-                    json={"machine_id": m_id, "client_id": client_id, "role": role},
-                    headers={"Authorization": f"Bearer {self.token}"}
+                response = self.api.post(
+                    "/super/generate-key",
+                    json={"machine_id": m_id, "client_id": client_id, "role": role}
                 )
                 if response.status_code == 200:
                     gen_key = response.json().get('key')
@@ -2708,9 +2760,8 @@ class AarambhaPMS(ctk.CTk):
         try:
             # We use the activate-device endpoint as a proxy to get activations or add a new getter
             # For now, let's query the clients which have machine IDs
-            response = requests.get(
-                f"{API_BASE}/super/clients",
-                headers={"Authorization": f"Bearer {self.token}"}
+            response = self.api.get(
+                "/super/clients"
             )
             clients = response.json() if response.status_code == 200 else []
         except:
@@ -2746,10 +2797,9 @@ class AarambhaPMS(ctk.CTk):
                     messagebox.showerror("Error", "No Machine ID associated")
                     return
                 try:
-                    res = requests.post(
-                        f"{API_BASE}/super/license-action",
-                        json={"machine_id": m_id, "action": act, "days": days},
-                        headers={"Authorization": f"Bearer {self.token}"}
+                    res = self.api.post(
+                        "/super/license-action",
+                        json={"machine_id": m_id, "action": act, "days": days}
                     )
                     if res.status_code == 200:
                         messagebox.showinfo("Success", f"License {act} successfully")
@@ -2807,8 +2857,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_global_alerts(self):
         """Global alerts and monitoring with client selection"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -2838,7 +2887,7 @@ class AarambhaPMS(ctk.CTk):
         # Fetch Clients
         clients = []
         try:
-            res = requests.get(f"{API_BASE}/super/clients", headers={"Authorization": f"Bearer {self.token}"})
+            res = self.api.get("/super/clients")
             if res.status_code == 200: clients = res.json()
         except: pass
         
@@ -2891,9 +2940,8 @@ class AarambhaPMS(ctk.CTk):
         for widget in self.alerts_container.winfo_children(): widget.destroy()
         
         try:
-            response = requests.get(
-                f"{API_BASE}/check-low-stock?client_id={client_id}",
-                headers={"Authorization": f"Bearer {self.token}"}
+            response = self.api.get(
+                f"/check-low-stock?client_id={client_id}"
             )
             
             if response.status_code == 200:
@@ -2902,23 +2950,13 @@ class AarambhaPMS(ctk.CTk):
                     ctk.CTkLabel(self.alerts_container, text="No low stock alerts found. ✅", font=("Segoe UI", 16)).pack(pady=50)
                     return
                 
-                # Table Header
-                table = ctk.CTkScrollableFrame(self.alerts_container, height=500, fg_color=("#ffffff", "#1e293b"), corner_radius=10)
+                table = VirtualTable(self.alerts_container, columns=[
+                    Column("Pharmacy", 230, "pharmacy_name", anchor="w"),
+                    Column("Medicine Name", 230, "name", anchor="w"),
+                    Column("Current Stock", 230, "stock_quantity", color=lambda item: "#ef4444"),
+                    Column("Min Level", 230, "min_stock_level"),
+                ], rows=data, height=500, fg_color=("#ffffff", "#1e293b"), corner_radius=10)
                 table.pack(fill="both", expand=True)
-                
-                header = ctk.CTkFrame(table, fg_color=("#f1f5f9", "#0f172a"))
-                header.pack(fill="x", pady=2)
-                
-                for i, h in enumerate(["Pharmacy", "Medicine Name", "Current Stock", "Min Level"]):
-                    ctk.CTkLabel(header, text=h, font=("Segoe UI Bold", 12), width=230).grid(row=0, column=i, padx=10, pady=10, sticky="w")
-                
-                for item in data:
-                    row = ctk.CTkFrame(table, fg_color="transparent")
-                    row.pack(fill="x")
-                    ctk.CTkLabel(row, text=item['pharmacy_name'], width=230, anchor="w").grid(row=0, column=0, padx=10, pady=5)
-                    ctk.CTkLabel(row, text=item['name'], width=230, anchor="w").grid(row=0, column=1, padx=10, pady=5)
-                    ctk.CTkLabel(row, text=str(item['stock_quantity']), width=230, anchor="center", text_color="#ef4444").grid(row=0, column=2, padx=10, pady=5)
-                    ctk.CTkLabel(row, text=str(item['min_stock_level']), width=230, anchor="center").grid(row=0, column=3, padx=10, pady=5)
             else:
                 messagebox.showerror("Error", "Failed to fetch low stock alerts")
         except Exception as e:
@@ -2929,9 +2967,8 @@ class AarambhaPMS(ctk.CTk):
         for widget in self.alerts_container.winfo_children(): widget.destroy()
         
         try:
-            response = requests.get(
-                f"{API_BASE}/check-expiry?client_id={client_id}",
-                headers={"Authorization": f"Bearer {self.token}"}
+            response = self.api.get(
+                f"/check-expiry?client_id={client_id}"
             )
             
             if response.status_code == 200:
@@ -3260,7 +3297,7 @@ class AarambhaPMS(ctk.CTk):
             # Fetch clients
             clients = []
             try:
-                res = requests.get(f"{API_BASE}/super/clients", headers={"Authorization": f"Bearer {self.token}"})
+                res = self.api.get("/super/clients")
                 if res.status_code == 200: clients = res.json()
             except: pass
             
@@ -3305,16 +3342,14 @@ class AarambhaPMS(ctk.CTk):
             l_name = layout_name_entry.get() or f"Layout_{datetime.now().strftime('%Y%m%d_%H%M')}"
             try:
                 # 1. Save as latest version
-                save_res = requests.post(f"{API_BASE}/super/bill-designs", 
-                                       json={"name": l_name, "design_data": design_json},
-                                       headers={"Authorization": f"Bearer {self.token}"})
+                save_res = self.api.post("/super/bill-designs", 
+                                       json={"name": l_name, "design_data": design_json})
                 
                 if save_res.status_code == 200:
                     design_id = save_res.json().get('id', 1)
                     # 2. Publish to target
-                    publish_res = requests.post(f"{API_BASE}/super/bill-designs/publish",
-                                              json={"design_id": design_id, "client_ids": self.target_client_ids},
-                                              headers={"Authorization": f"Bearer {self.token}"})
+                    publish_res = self.api.post("/super/bill-designs/publish",
+                                              json={"design_id": design_id, "client_ids": self.target_client_ids})
                     messagebox.showinfo("Success", "Design published successfully!\nClients will receive update on next sync.")
                 else:
                     messagebox.showerror("Error", "Failed to save design version")
@@ -3326,7 +3361,7 @@ class AarambhaPMS(ctk.CTk):
         # Load Existing Templates
         def load_templates():
             try:
-                res = requests.get(f"{API_BASE}/super/bill-designs", headers={"Authorization": f"Bearer {self.token}"})
+                res = self.api.get("/super/bill-designs")
                 if res.status_code == 200:
                     templates = res.json()
                     names = [t["name"] for t in templates]
@@ -3357,8 +3392,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_system_logs(self):
         """View detailed system audit logs"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -3374,7 +3408,7 @@ class AarambhaPMS(ctk.CTk):
         header.pack(anchor="w", pady=(0, 25))
 
         try:
-            res = requests.get(f"{API_BASE}/super/audit-logs", headers={"Authorization": f"Bearer {self.token}"})
+            res = self.api.get("/super/audit-logs")
             logs = res.json() if res.status_code == 200 else []
         except:
             logs = []
@@ -3398,8 +3432,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_announcements(self):
         """Broadcast system-wide announcements with target selection (Matching Image)"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -3436,7 +3469,7 @@ class AarambhaPMS(ctk.CTk):
         # Fetch clients for target selection
         clients = []
         try:
-            res = requests.get(f"{API_BASE}/super/clients", headers={"Authorization": f"Bearer {self.token}"})
+            res = self.api.get("/super/clients")
             if res.status_code == 200:
                 clients = res.json()
         except: pass
@@ -3492,10 +3525,9 @@ class AarambhaPMS(ctk.CTk):
             }
             
             try:
-                res = requests.post(
-                    f"{API_BASE}/super/announcements", 
-                    json=data, 
-                    headers={"Authorization": f"Bearer {self.token}"}
+                res = self.api.post(
+                    "/super/announcements", 
+                    json=data
                 )
                 if res.status_code == 200:
                     messagebox.showinfo("Success", "Announcement posted successfully!")
@@ -3517,8 +3549,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_system_settings(self):
         """Main system configuration and white-labeling"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
         nav_items = self.get_super_admin_nav()
@@ -3529,7 +3560,7 @@ class AarambhaPMS(ctk.CTk):
         ctk.CTkLabel(content, text="⚙️ System Configuration", font=("Segoe UI Black", 28, "bold")).pack(anchor="w", pady=(0, 25))
         
         try:
-            res = requests.get(f"{API_BASE}/super/settings", headers={"Authorization": f"Bearer {self.token}"})
+            res = self.api.get("/super/settings")
             settings = res.json() if res.status_code == 200 else []
         except: settings = []
         
@@ -3546,7 +3577,7 @@ class AarambhaPMS(ctk.CTk):
         def save_settings():
             data = {k: v.get() for k, v in entries.items()}
             try:
-                res = requests.post(f"{API_BASE}/super/settings", json=data, headers={"Authorization": f"Bearer {self.token}"})
+                res = self.api.post("/super/settings", json=data)
                 if res.status_code == 200: messagebox.showinfo("Success", "Settings updated!")
             except: messagebox.showerror("Error", "Update failed")
             
@@ -3557,7 +3588,7 @@ class AarambhaPMS(ctk.CTk):
         if not messagebox.askyesno("Confirm Impersonation", f"Log in as Admin for {client['pharmacy_name']}?\nThis will switch your session."):
             return
         try:
-            res = requests.post(f"{API_BASE}/super/login-as-admin", json={"client_id": client['id']}, headers={"Authorization": f"Bearer {self.token}"})
+            res = self.api.post("/super/login-as-admin", json={"client_id": client['id']})
             if res.status_code == 200:
                 data = res.json()
                 self.token = data['token']
@@ -3574,7 +3605,7 @@ class AarambhaPMS(ctk.CTk):
 
         # Fetch fresh data to ensure phone number etc are loaded
         try:
-            r = requests.get(f"{API_BASE}/profile", headers={"Authorization": f"Bearer {self.token}"})
+            r = self.api.get("/profile")
             if r.status_code == 200:
                 server_user = r.json()
                 self.user.update(server_user)
@@ -3646,7 +3677,7 @@ class AarambhaPMS(ctk.CTk):
                 "profile_pic": new_pic_base64[0]
             }
             try:
-                res = requests.post(f"{API_BASE}/profile", json=payload, headers={"Authorization": f"Bearer {self.token}"})
+                res = self.api.post("/profile", json=payload)
                 if res.status_code == 200:
                     self.user.update(payload)
                     messagebox.showinfo("Success", "✅ Profile updated successfully!")
@@ -3664,8 +3695,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_sms_management(self):
         """SMS Management - Send SMS, Upload Excel, View Credits"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -3706,7 +3736,7 @@ class AarambhaPMS(ctk.CTk):
         def fetch_balance():
             try:
                 headers = {"Authorization": f"Bearer {self.token}"}
-                response = requests.get(f"{API_BASE}/super/sms/balance", headers=headers)
+                response = self.api.get("/super/sms/balance", headers=headers)
                 if response.status_code == 200:
                     data = response.json()
                     if data.get('success'):
@@ -3809,7 +3839,7 @@ class AarambhaPMS(ctk.CTk):
                     "message": message
                 }
                 
-                response = requests.post(f"{API_BASE}/super/sms/send", json=payload, headers=headers)
+                response = self.api.post("/super/sms/send", json=payload, headers=headers)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -3942,8 +3972,8 @@ class AarambhaPMS(ctk.CTk):
                     files = {'file': f}
                     data = {'message': message}
                     
-                    response = requests.post(
-                        f"{API_BASE}/super/sms/upload-excel",
+                    response = self.api.post(
+                        "/super/sms/upload-excel",
                         files=files,
                         data=data,
                         headers=headers
@@ -4009,7 +4039,7 @@ class AarambhaPMS(ctk.CTk):
         # Fetch and display stats
         try:
             headers = {"Authorization": f"Bearer {self.token}"}
-            response = requests.get(f"{API_BASE}/super/sms/stats", headers=headers)
+            response = self.api.get("/super/sms/stats", headers=headers)
             if response.status_code == 200:
                 stats = response.json()
                 create_stat_card(stats_grid, "Total Sent", str(stats.get('total_sent', 0)), 0)
@@ -4026,7 +4056,7 @@ class AarambhaPMS(ctk.CTk):
         # Fetch SMS logs
         try:
             headers = {"Authorization": f"Bearer {self.token}"}
-            response = requests.get(f"{API_BASE}/super/sms/logs?limit=50", headers=headers)
+            response = self.api.get("/super/sms/logs?limit=50", headers=headers)
             if response.status_code == 200:
                 data = response.json()
                 logs = data.get('logs', [])
@@ -4086,8 +4116,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_reports_management(self):
         """Comprehensive Super Admin Reporting Dashboard"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -4110,7 +4139,7 @@ class AarambhaPMS(ctk.CTk):
         # Fetch Clients
         clients = []
         try:
-            res = requests.get(f"{API_BASE}/super/clients", headers={"Authorization": f"Bearer {self.token}"})
+            res = self.api.get("/super/clients")
             if res.status_code == 200: clients = res.json()
         except: pass
         
@@ -4137,168 +4166,112 @@ class AarambhaPMS(ctk.CTk):
         end_date_entry.insert(0, datetime.now().strftime('%Y-%m-%d'))
         end_date_entry.grid(row=1, column=3, padx=10, pady=(5, 0))
         
-        self.report_data = [] # To store current report results for export
+        self.report_data = [] # Rows loaded so far for the on-screen table; exports re-read the API page by page
+        current = {"type": None, "params": None}
+        
+        # Export bar (streams from the API in the background)
+        export_frame = ctk.CTkFrame(content, fg_color="transparent")
+        export_frame.pack(fill="x", pady=(0, 15))
+        status_lbl = ctk.CTkLabel(export_frame, text="", font=("Segoe UI", 12), text_color="gray")
+        status_lbl.pack(side="left")
         
         results_container = ctk.CTkFrame(content, fg_color="transparent")
         results_container.pack(fill="both", expand=True)
+        
+        endpoints = {
+            "Sales Summary": "/super/reports/sales",
+            "Item-wise Sales": "/super/reports/item-wise",
+            "Top Selling Products": "/super/reports/top-selling",
+        }
+        
+        def report_fetcher(r_type, params):
+            """fetch_page(cursor, limit) for one report/filter combination (worker thread)"""
+            def fetch_page(cursor, limit):
+                query = dict(params)
+                if r_type != "Top Selling Products": # there ?limit= means "top N", not a page size
+                    query["limit"] = limit
+                    if cursor: query["cursor"] = cursor
+                res = self.api.get(endpoints[r_type], params=query)
+                if res.status_code != 200:
+                    raise Exception(f"Failed to fetch report data (HTTP {res.status_code})")
+                data = res.json()
+                if isinstance(data, list): # unpaged response
+                    return data, None
+                return data["rows"], data.get("next_cursor")
+            return fetch_page
 
         def fetch_report():
             for widget in results_container.winfo_children(): widget.destroy()
             
             sel_client = client_var.get()
             client_id = sel_client.split(" - ")[0] if sel_client != "All Pharmacies" else "all"
-            rep_type = report_type_var.get()
-            start_date = start_date_entry.get()
-            end_date = end_date_entry.get()
-            
-            endpoint = "/super/reports/sales"
-            if rep_type == "Item-wise Sales": endpoint = "/super/reports/item-wise"
-            elif rep_type == "Top Selling Products": endpoint = "/super/reports/top-selling"
-            
-            try:
-                res = requests.get(f"{API_BASE}{endpoint}", 
-                                  params={"client_id": client_id, "start_date": start_date, "end_date": end_date},
-                                  headers={"Authorization": f"Bearer {self.token}"})
-                if res.status_code == 200:
-                    self.report_data = res.json()
-                    display_report_results(results_container, self.report_data, rep_type)
-                else:
-                    messagebox.showerror("Error", "Failed to fetch report data")
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
-
-        def display_report_results(parent, data, r_type):
-            if not data:
-                ctk.CTkLabel(parent, text="No data found for selected period.", font=("Segoe UI", 16)).pack(pady=50)
+            r_type = report_type_var.get()
+            params = {"client_id": client_id, "start_date": start_date_entry.get(), "end_date": end_date_entry.get()}
+            current.update(type=r_type, params=params)
+            self.report_data = []
+            
+            from report_export import REPORT_LAYOUTS, format_row
+            # Only the visible rows are built; further pages load as the table is scrolled
+            table = VirtualTable(results_container, columns=[
+                Column(h, w + 40, lambda r, k=k: format_row(r, [k])[0]) for h, k, w in REPORT_LAYOUTS[r_type]
+            ], on_scroll_end=lambda: pager.load_more(), empty_text="No data found for selected period.",
+               fg_color=("#ffffff", "#1e293b"), corner_radius=10, height=500)
+            table.pack(fill="x")
+            table.pack_propagate(False)
+            
+            def on_page(rows, first):
+                self.report_data.extend(rows)
+                if first: table.set_rows(rows)
+                else: table.append_rows(rows)
+                status_lbl.configure(text=f"Showing {len(self.report_data):,} rows" + ("" if pager.exhausted else " (scroll for more)"))
+            
+            pager = CursorPager(self.tasks, report_fetcher(r_type, params), on_page, key="super_report",
+                                owner=table, page_size=500, on_error=lambda e: messagebox.showerror("Error", str(e)))
+            status_lbl.configure(text="Loading...")
+            pager.load_more()
+
+        def export_report_file(ext):
+            if cancel_btn.winfo_ismapped():
                 return
-            
-            # Export buttons are added below function definitions
-            export_frame = ctk.CTkFrame(parent, fg_color="transparent")
-            export_frame.pack(fill="x", pady=(0, 15))
-            
-            table_scroll = ctk.CTkScrollableFrame(parent, height=500, fg_color=("#ffffff", "#1e293b"), corner_radius=10)
-            table_scroll.pack(fill="both", expand=True)
-            
-            if r_type == "Sales Summary":
-                headers = ["Date", "Pharmacy", "Bill No", "Cashier", "Total", "Grand Total", "Mode"]
-                keys = ["created_at", "pharmacy_name", "bill_number", "cashier_name", "total_amount", "grand_total", "payment_mode"]
-            elif r_type == "Item-wise Sales":
-                headers = ["Date", "Item Name", "Quantity", "Price", "Total", "Pharmacy"]
-                keys = ["created_at", "medicine_name", "quantity", "unit_price", "total_price", "pharmacy_name"]
-            else: # Top Selling
-                headers = ["Medicine Name", "Total Sold", "Revenue", "Pharmacy"]
-                keys = ["name", "total_sold", "total_revenue", "pharmacy_name"]
-
-            # Render Table Header
-            head_row = ctk.CTkFrame(table_scroll, fg_color=("#f1f5f9", "#0f172a"))
-            head_row.pack(fill="x", pady=2)
-            for i, h in enumerate(headers):
-                ctk.CTkLabel(head_row, text=h, font=("Segoe UI Bold", 12), width=150).grid(row=0, column=i, padx=10, pady=10, sticky="w")
-            
-            # Render Table Rows
-            for item in data:
-                row = ctk.CTkFrame(table_scroll, fg_color="transparent")
-                row.pack(fill="x")
-                for i, k in enumerate(keys):
-                    val = item.get(k, "N/A")
-                    if "created_at" in k: 
-                        try: val = val.split("T")[0]
-                        except: pass
-                    ctk.CTkLabel(row, text=str(val), font=("Segoe UI", 11), width=150).grid(row=0, column=i, padx=10, pady=5, sticky="w")
-
-        def export_to_excel(data, r_type):
-            try:
-                import pandas as pd
-                df = pd.DataFrame(data)
-                
-                # Convert Dates to BS
-                if 'created_at' in df.columns:
-                    df['created_at'] = df['created_at'].apply(lambda x: DateUtils.ad_to_bs(x.split('T')[0]) if x else '')
-                    df.rename(columns={'created_at': 'Date (BS)'}, inplace=True)
-                    
-                if 'date' in df.columns:
-                     df['date'] = df['date'].apply(lambda x: DateUtils.ad_to_bs(x.split('T')[0]) if x else '')
-                     df.rename(columns={'date': 'Date (BS)'}, inplace=True)
-                filename = f"Report_{r_type.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
-                path = filedialog.asksaveasfilename(defaultextension=".xlsx", initialfile=filename)
-                if path:
-                    df.to_excel(path, index=False)
-                    messagebox.showinfo("Success", f"Report exported successfully to {path}")
-            except Exception as e:
-                messagebox.showerror("Export Error", f"Could not export to Excel: {str(e)}")
-
-        def export_to_pdf(data, r_type):
-            try:
-                from reportlab.lib.pagesizes import A4, landscape
-                from reportlab.pdfgen import canvas
-                from reportlab.lib import colors
-                from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-                from reportlab.lib.styles import getSampleStyleSheet
-                import os
-
-                filename = f"Report_{r_type.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
-                path = filedialog.asksaveasfilename(defaultextension=".pdf", initialfile=filename)
-                
-                if not path: return
-
-                doc = SimpleDocTemplate(path, pagesize=landscape(A4))
-                elements = []
-                styles = getSampleStyleSheet()
-
-                # Title
-                elements.append(Paragraph(f"{r_type} Report", styles['Title']))
-                elements.append(Paragraph(f"Generated: {DateUtils.get_current_bs_date_full()}", styles['Normal']))
-                elements.append(Paragraph(" ", styles['Normal'])) # Spacer
-
-                # Prepare Table Data
-                if r_type == "Sales Summary":
-                    headers = ["Date", "Bill No", "Customer", "Total", "Grand Total", "Mode"]
-                    keys = ["created_at", "bill_number", "customer_name", "total_amount", "grand_total", "payment_category"]
-                    col_widths = [100, 100, 150, 80, 80, 80]
-                elif r_type == "Item-wise Sales":
-                    headers = ["Date", "Item Name", "Qty", "Price", "Total", "Pharmacy"]
-                    keys = ["created_at", "medicine_name", "quantity", "unit_price", "total_price", "pharmacy_name"]
-                    col_widths = [80, 150, 50, 70, 80, 150]
-                else:
-                    headers = ["Medicine Name", "Total Sold", "Revenue", "Pharmacy"]
-                    keys = ["name", "total_sold", "total_revenue", "pharmacy_name"]
-                    col_widths = [200, 100, 100, 200]
-
-                table_data = [headers]
-                
-                for item in data:
-                    row = []
-                    for k in keys:
-                        val = item.get(k, "")
-                        if "created_at" in k and val:
-                            try: val = DateUtils.ad_to_bs(val.split("T")[0])
-                            except: pass
-                        row.append(str(val))
-                    table_data.append(row)
-
-                # Create Table
-                t = Table(table_data, colWidths=col_widths)
-                t.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ]))
-                
-                elements.append(t)
-                doc.build(elements)
-                
-                messagebox.showinfo("Success", f"PDF Report exported successfully to {path}")
-                os.startfile(path)
-
-            except Exception as e:
-                messagebox.showerror("Export Error", f"Could not export to PDF: {str(e)}")
-
-        ctk.CTkButton(export_frame, text="📗 Export to Excel", fg_color="#2e7d32", width=150, command=lambda: export_to_excel(data, r_type)).pack(side="right", padx=5)
-        ctk.CTkButton(export_frame, text="📕 Export to PDF", fg_color="#dc2626", width=150, command=lambda: export_to_pdf(data, r_type)).pack(side="right", padx=5)
+            if current["type"] is None:
+                return messagebox.showwarning("Export", "Generate a report first.")
+            r_type, params = current["type"], current["params"]
+            filename = f"Report_{r_type.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M')}{ext}"
+            path = filedialog.asksaveasfilename(defaultextension=ext, initialfile=filename)
+            if not path: return
+            
+            def run(progress):
+                # Pages are written as they arrive; the full report is never held in memory
+                from report_export import export_report, paged_rows
+                return export_report(path, r_type, paged_rows(report_fetcher(r_type, params), 1000),
+                                     subtitle=f"Generated: {DateUtils.get_current_bs_date_full()}",
+                                     to_bs=DateUtils.ad_to_bs, progress=progress)
+            
+            def on_progress(p):
+                status_lbl.configure(text=f"Exporting... {p[0]:,} rows")
+            
+            cancel_btn.pack(side="right", padx=5)
+            status_lbl.configure(text="Exporting...")
+            self.tasks.submit(run, on_progress=on_progress, on_success=lambda n: finish_export(path, n),
+                              on_error=lambda e: finish_export(path, None, e),
+                              key="super_report_export", owner=status_lbl)
+        
+        def cancel_export():
+            self.tasks.cancel("super_report_export")
+            finish_export(None, None)
+        
+        def finish_export(path, rows, error=None):
+            cancel_btn.pack_forget()
+            status_lbl.configure(text=f"Showing {len(self.report_data):,} rows" if current["type"] else "")
+            if error is not None:
+                messagebox.showerror("Export Error", f"Could not export report: {error}")
+            elif path and rows is not None:
+                messagebox.showinfo("Success", f"Exported {rows:,} rows to {path}")
+
+        cancel_btn = ctk.CTkButton(export_frame, text="✖ Cancel Export", fg_color="#ef4444", width=130, command=cancel_export)
+        ctk.CTkButton(export_frame, text="📄 Export to CSV", fg_color="#475569", width=150, command=lambda: export_report_file(".csv")).pack(side="right", padx=5)
+        ctk.CTkButton(export_frame, text="📗 Export to Excel", fg_color="#2e7d32", width=150, command=lambda: export_report_file(".xlsx")).pack(side="right", padx=5)
+        ctk.CTkButton(export_frame, text="📕 Export to PDF", fg_color="#dc2626", width=150, command=lambda: export_report_file(".pdf")).pack(side="right", padx=5)
 
         ctk.CTkButton(inner_filter, text="🔍 Generate Report", height=45, fg_color="#4f46e5", command=fetch_report).grid(row=1, column=4, padx=20, pady=(5, 0))
 
@@ -4308,11 +4281,11 @@ class AarambhaPMS(ctk.CTk):
             headers = {"Authorization": f"Bearer {self.token}"}
             try:
                 # 1. Total Items
-                m_res = requests.get(f"{API_BASE}/medicines", headers=headers)
+                m_res = self.api.get("/medicines", headers=headers)
                 med_count_lbl.configure(text=str(len(m_res.json())) if m_res.status_code == 200 else "0")
                 
                 # 2. Low Stock Alerts
-                ls_res = requests.get(f"{API_BASE}/check-low-stock", headers=headers)
+                ls_res = self.api.get("/check-low-stock", headers=headers)
                 ls_items = ls_res.json().get('low_stock_items', [])
                 low_count_lbl.configure(text=str(len(ls_items)))
                 
@@ -4324,7 +4297,7 @@ class AarambhaPMS(ctk.CTk):
                         ctk.CTkLabel(low_list, text=f"• {item['item']} (Qty: {item['remaining']})\n  Batch: {item['batch']} | Sup: {item['vendor']}", anchor="w", font=("Segoe UI", 12), justify="left").pack(fill="x", pady=2)
 
                 # 3. Expiry Alerts
-                ex_res = requests.get(f"{API_BASE}/check-expiry", headers=headers)
+                ex_res = self.api.get("/check-expiry", headers=headers)
                 ex_items = ex_res.json().get('expiry_items', [])
                 exp_count_lbl.configure(text=str(len(ex_items)))
                 
@@ -4336,7 +4309,7 @@ class AarambhaPMS(ctk.CTk):
                         ctk.CTkLabel(exp_list, text=f"• {item['item']} ({item['expiry']})\n  Batch: {item['batch']} | Sup: {item['vendor']}", anchor="w", font=("Segoe UI", 12), justify="left").pack(fill="x", pady=2)
 
                 # 4. Vendors
-                v_res = requests.get(f"{API_BASE}/vendors", headers=headers)
+                v_res = self.api.get("/vendors", headers=headers)
                 ven_count_lbl.configure(text=str(len(v_res.json())) if v_res.status_code == 200 else "0")
                 
             except Exception as e:
@@ -4346,7 +4319,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_admin_users(self):
         """Admin's User & Access Management Hub"""
-        for widget in self.root.winfo_children(): widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -4379,7 +4352,7 @@ class AarambhaPMS(ctk.CTk):
         def load_staff():
             for w in staff_scroll.winfo_children(): w.destroy()
             try:
-                r = requests.get(f"{API_BASE}/users", headers={"Authorization": f"Bearer {self.token}"}, params={"client_id": self.user['client_id']})
+                r = self.api.get("/users", params={"client_id": self.user['client_id']})
                 if r.status_code == 200:
                     users = r.json()
                     if not users:
@@ -4485,7 +4458,7 @@ class AarambhaPMS(ctk.CTk):
             }
             
             try:
-                r = requests.post(f"{API_BASE}/users/cashier", json=data, headers={"Authorization": f"Bearer {self.token}"})
+                r = self.api.post("/users/cashier", json=data)
                 if r.status_code == 201:
                     resp = r.json()
                     msg = f"Cashier Created!\n\nSMS Status: {resp['sms_status']}"
@@ -4528,7 +4501,7 @@ class AarambhaPMS(ctk.CTk):
                         "password": pw.get(),
                         "client_id": self.user['client_id']
                     }
-                    r = requests.post(f"{API_BASE}/users/resend-creds", json=payload, headers={"Authorization": f"Bearer {self.token}"})
+                    r = self.api.post("/users/resend-creds", json=payload)
                     if r.status_code == 200:
                         messagebox.showinfo("Sent", "SMS Credentials Sent Successfully!")
                         dialog.destroy()
@@ -4540,8 +4513,7 @@ class AarambhaPMS(ctk.CTk):
     
     def show_inventory_management(self):
         """Standard Unit Admin Inventory Management"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -4549,7 +4521,7 @@ class AarambhaPMS(ctk.CTk):
         nav_items = self.get_super_admin_nav() if self.user['role'] == 'SUPER_ADMIN' else self.get_admin_nav()
         self.create_sidebar(main_container, nav_items, "Inventory Management")
         
-        content = ctk.CTkScrollableFrame(main_container, fg_color="transparent")
+        content = ctk.CTkFrame(main_container, fg_color="transparent")
         content.pack(side="right", fill="both", expand=True, padx=30, pady=30)
         
         # Header
@@ -4568,55 +4540,46 @@ class AarambhaPMS(ctk.CTk):
         table_frame = ctk.CTkFrame(content, fg_color=("#ffffff", "#1e293b"), corner_radius=15)
         table_frame.pack(fill="both", expand=True, pady=10)
         
-        # Table Headers
-        headers = ["Item Code", "Name", "Category", "Dosage", "Current Stock", "Threshold", "Actions"]
-        widths = [120, 250, 150, 100, 120, 100, 150]
-        
-        head_row = ctk.CTkFrame(table_frame, fg_color=("#f8fafc", "#0f172a"), height=45)
-        head_row.pack(fill="x", padx=10, pady=(10, 5))
+        def stock_color(item):
+            # Ensure numeric comparison to avoid str vs int TypeError
+            try:
+                return "red" if float(item.get('total_quantity', 0)) < float(item.get('low_stock_threshold', 10)) else None
+            except (TypeError, ValueError):
+                return None
         
-        for i, header in enumerate(headers):
-            lbl = ctk.CTkLabel(head_row, text=header, font=("Segoe UI Bold", 13), width=widths[i])
-            lbl.pack(side="left", padx=5)
-
-        # Fetch and Render Data
-        try:
-            resp = requests.get(f"{API_BASE}/inventory/stock-levels", headers={"Authorization": f"Bearer {self.token}"})
-            items = resp.json() if resp.status_code == 200 else []
-        except:
-            items = []
-            
-        if not items:
-            ctk.CTkLabel(table_frame, text="No items found. Add your first item!", font=("Segoe UI", 14), text_color="gray").pack(pady=50)
-        else:
-            for item in items:
-                row = ctk.CTkFrame(table_frame, fg_color="transparent", height=40)
-                row.pack(fill="x", padx=10, pady=2)
-                
-                ctk.CTkLabel(row, text=item.get('item_code', '-'), width=widths[0]).pack(side="left", padx=5)
-                ctk.CTkLabel(row, text=item.get('name', '-'), width=widths[1], anchor="w").pack(side="left", padx=5)
-                ctk.CTkLabel(row, text=item.get('category', '-'), width=widths[2]).pack(side="left", padx=5)
-                ctk.CTkLabel(row, text=item.get('dosage_form', '-'), width=widths[3]).pack(side="left", padx=5)
-                
-                qty = item.get('total_quantity', 0)
-                thresh = item.get('low_stock_threshold', 10)
-                
-                # Ensure numeric comparison to avoid str vs int TypeError
+        def as_number(key, default=0):
+            def value(item):
                 try:
-                    q_val = float(qty)
-                    t_val = float(thresh)
-                    is_low = q_val < t_val
-                except:
-                    is_low = False
-                    
-                color = "red" if is_low else ("#1e293b" if ctk.get_appearance_mode() == "Light" else "#f1f5f9")
-                
-                ctk.CTkLabel(row, text=f"{qty}", width=widths[4], text_color=color, font=("Segoe UI Bold", 13)).pack(side="left", padx=5)
-                ctk.CTkLabel(row, text=f"{thresh}", width=widths[5]).pack(side="left", padx=5)
-                
-                act_frame = ctk.CTkFrame(row, fg_color="transparent", width=widths[6])
-                act_frame.pack(side="left", padx=5)
-                ctk.CTkButton(act_frame, text="Edit", width=60, height=28, command=lambda i=item: self.show_add_item_dialog(i)).pack(side="left", padx=2)
+                    return float(item.get(key, default))
+                except (TypeError, ValueError):
+                    return 0.0
+            return value
+        
+        # Only the visible rows are built; they are re-used as the table scrolls
+        table = VirtualTable(table_frame, columns=[
+            Column("Item Code", 120, "item_code"),
+            Column("Name", 250, "name", anchor="w"),
+            Column("Category", 150, "category"),
+            Column("Dosage", 100, "dosage_form"),
+            Column("Current Stock", 120, lambda i: i.get('total_quantity', 0),
+                   sort_key=as_number('total_quantity'), color=stock_color),
+            Column("Threshold", 100, lambda i: i.get('low_stock_threshold', 10),
+                   sort_key=as_number('low_stock_threshold', 10)),
+        ], actions=[("Edit", self.show_add_item_dialog, {"width": 60, "height": 28})],
+            empty_text="Loading stock...")
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Fetch off the UI thread, render when it arrives
+        def fetch_items():
+            resp = self.api.get("/inventory/stock-levels")
+            return resp.json() if resp.status_code == 200 else []
+
+        def render_items(items):
+            table.empty_lbl.configure(text="No items found. Add your first item!")
+            table.set_rows(items)
+
+        self.tasks.submit(fetch_items, on_success=render_items, on_error=lambda e: render_items([]),
+                          key="inventory", owner=table_frame)
 
     def show_add_item_dialog(self, edit_item=None):
         """Add/Edit Item Modal Dialog"""
@@ -4702,7 +4665,9 @@ class AarambhaPMS(ctk.CTk):
             status_var = StringVar(value="Ready to Scan")
             ctk.CTkLabel(scan_win, textvariable=status_var, font=("Segoe UI", 12)).pack(pady=5)
             
-            scanner = ScannerModule(scan_win, lambda code: on_scan_success(code, scan_win))
+            scanner = ScannerModule(scan_win, lambda code: on_scan_success(code, scan_win),
+                                    symbologies=SCANNER_CONFIG.get("symbologies"),
+                                    adaptive=SCANNER_CONFIG.get("adaptive_order", True))
             
             def on_scan_success(code, window):
                 barcode_var.set(code)
@@ -4796,9 +4761,9 @@ class AarambhaPMS(ctk.CTk):
             headers = {"Authorization": f"Bearer {self.token}"}
             try:
                 if edit_item:
-                    resp = requests.put(f"{API_BASE}/medicines/{edit_item['id']}", json=payload, headers=headers)
+                    resp = self.api.put(f"/medicines/{edit_item['id']}", json=payload, headers=headers)
                 else:
-                    resp = requests.post(f"{API_BASE}/medicines", json=payload, headers=headers)
+                    resp = self.api.post("/medicines", json=payload, headers=headers)
                 
                 if resp.status_code in [200, 201]:
                     messagebox.showinfo("Success", "Item details saved successfully")
@@ -4810,7 +4775,7 @@ class AarambhaPMS(ctk.CTk):
                         msg = f"{err_data['message']} Do you want to open it?"
                         if messagebox.askyesno("Item Exists", msg):
                             # Lookup the item to open it
-                            search_res = requests.get(f"{API_BASE}/medicines/by-barcode/{err_data['barcode']}", headers=headers)
+                            search_res = self.api.get(f"/medicines/by-barcode/{err_data['barcode']}", headers=headers)
                             if search_res.status_code == 200:
                                 dialog.destroy()
                                 # Recursively open add_item with existing data
@@ -4836,7 +4801,7 @@ class AarambhaPMS(ctk.CTk):
         
         # Medicine Selection
         try:
-            m_resp = requests.get(f"{API_BASE}/medicines", headers={"Authorization": f"Bearer {self.token}"})
+            m_resp = self.api.get("/medicines")
             meds = m_resp.json() if m_resp.status_code == 200 else []
         except: meds = []
         
@@ -4864,7 +4829,7 @@ class AarambhaPMS(ctk.CTk):
         # Vendor Selection
         ctk.CTkLabel(form, text="Vendor").pack(anchor="w")
         try:
-            v_resp = requests.get(f"{API_BASE}/vendors", headers={"Authorization": f"Bearer {self.token}"})
+            v_resp = self.api.get("/vendors")
             vendors = v_resp.json() if v_resp.status_code == 200 else []
         except: vendors = []
         
@@ -4949,22 +4914,63 @@ class AarambhaPMS(ctk.CTk):
             }
             
             headers = {"Authorization": f"Bearer {self.token}"}
-            resp = requests.post(f"{API_BASE}/inventory/stock", json=payload, headers=headers)
+            resp = self.api.post("/inventory/stock", json=payload, headers=headers)
             if resp.status_code == 201:
                 messagebox.showinfo("Success", "Stock recorded successfully")
+                self.refresh_stock_index()
                 dialog.destroy()
                 self.show_inventory_management()
             else:
                 messagebox.showerror("Error", resp.json().get('error', 'Failed to record stock'))
 
         ctk.CTkButton(form, text="✅ RECORD STOCK", command=submit, fg_color="#10b981", height=50).pack(fill="x")
+    STOCK_INDEX_TTL = 300 # seconds before the terminal reloads the stock index
+    MEDICINE_INDEX_TTL = 300 # seconds before GRN imports reload the medicine master
+
+    def get_medicine_matcher(self):
+        """Cached MedicineMatcher over /medicines (call from a worker thread)"""
+        cached = getattr(self, '_medicine_matcher', None)
+        if cached and time.time() - cached[0] < self.MEDICINE_INDEX_TTL:
+            return cached[1]
+        from grn_import import MedicineMatcher
+        r = self.api.get("/medicines")
+        if r.status_code != 200:
+            raise Exception(f"Could not load medicines (HTTP {r.status_code})")
+        matcher = MedicineMatcher(r.json())
+        self._medicine_matcher = (time.time(), matcher)
+        return matcher
+
+    def refresh_stock_index(self):
+        """Reload the in-memory stock index in the background and swap it in"""
+        def fetch():
+            # Sales still queued in the journal are not in the server's stock yet.
+            # Read them before the request: at worst a sale is deducted twice until the next refresh.
+            queued = [item for entry in self.sales_journal.pending(limit=1000) for item in entry['payload'].get('items', [])]
+            r = self.api.get("/inventory/stock")
+            if r.status_code != 200:
+                raise Exception(f"GET /inventory/stock returned HTTP {r.status_code}")
+            index = StockIndex.from_rows(r.json())
+            index.apply_sale(queued)
+            return index
+        
+        def swap(index):
+            self.stock_index = index
+        
+        def failed(e):
+            print(f"Stock index load failed: {e}")
+            if not self.stock_index.loaded:
+                # Never loaded: every scan and search is going to the server instead
+                messagebox.showwarning("Stock Index", f"Could not load local stock for billing.\nScans will be looked up on the server.\n\n{e}")
+        
+        self.tasks.submit(fetch, on_success=swap, on_error=failed,
+                          key="stock_index", persistent=True)
+
     def show_billing_terminal(self):
         """Complete Billing Terminal (Cashier Level) with QR Support"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
-        
-        main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
-        main_container.pack(fill="both", expand=True)
+        # Warm / refresh the local stock index so scans resolve without a network hop
+        idx = self.stock_index
+        if not idx.loaded or time.time() - idx.loaded_at > self.STOCK_INDEX_TTL:
+            self.refresh_stock_index()
         
         # Determine nav based on role
         if self.user['role'] == 'SUPER_ADMIN':
@@ -4973,6 +4979,16 @@ class AarambhaPMS(ctk.CTk):
             nav_items = self.get_super_admin_nav() if self.user['role'] == 'SUPER_ADMIN' else self.get_admin_nav()
         else:
             nav_items = self.get_cashier_nav()
+        
+        # Built once per login: coming back only re-shows it with a fresh form
+        cached = self.screens.show_cached("billing")
+        if cached is not None:
+            self.create_sidebar(cached, nav_items, "Sales Terminal")
+            return
+        
+        self.screens.clear()
+        main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
+        main_container.pack(fill="both", expand=True)
             
         self.create_sidebar(main_container, nav_items, "Sales Terminal")
         
@@ -5006,19 +5022,11 @@ class AarambhaPMS(ctk.CTk):
         for lbl, w in cols:
             ctk.CTkLabel(h_frame, text=lbl, width=w, font=("Segoe UI Bold", 12)).pack(side="left", padx=2)
             
-        cart_items = [] # List of dicts
-        self.cart_total = 0.0
+        cart_rows = {} # stock id -> (row frame, qty label, total label)
         
-        def update_cart_display():
-            for w in cart_frame.winfo_children():
-                if w != h_frame: w.destroy()
-            
-            self.cart_total = 0.0
-            
-            for i, item in enumerate(cart_items):
-                row_total = item['qty'] * item['rate']
-                self.cart_total += row_total
-                
+        def update_cart_display(kind, item):
+            # Patch only the row that changed; the cart keeps the running total
+            if kind == "add":
                 row = ctk.CTkFrame(cart_frame, fg_color="transparent")
                 row.pack(fill="x", padx=10, pady=2)
                 
@@ -5026,16 +5034,24 @@ class AarambhaPMS(ctk.CTk):
                 ctk.CTkLabel(row, text=item['batch'], width=80).pack(side="left", padx=2)
                 ctk.CTkLabel(row, text=item['expiry'], width=80).pack(side="left", padx=2)
                 ctk.CTkLabel(row, text=f"{item['rate']:.2f}", width=60).pack(side="left", padx=2)
-                ctk.CTkLabel(row, text=str(item['qty']), width=60).pack(side="left", padx=2)
-                ctk.CTkLabel(row, text=f"{row_total:.2f}", width=80).pack(side="left", padx=2)
-                
-                def remove(idx=i):
-                    cart_items.pop(idx)
-                    update_cart_display()
-                    
-                ctk.CTkButton(row, text="❌", width=40, height=25, fg_color="#ef4444", command=remove).pack(side="left", padx=2)
+                qty_lbl = ctk.CTkLabel(row, text=str(item['qty']), width=60)
+                qty_lbl.pack(side="left", padx=2)
+                total_lbl = ctk.CTkLabel(row, text=f"{item['qty'] * item['rate']:.2f}", width=80)
+                total_lbl.pack(side="left", padx=2)
+                
+                ctk.CTkButton(row, text="❌", width=40, height=25, fg_color="#ef4444",
+                              command=lambda sid=item['id']: cart.remove(sid)).pack(side="left", padx=2)
+                cart_rows[item['id']] = (row, qty_lbl, total_lbl)
+            elif kind == "update":
+                _, qty_lbl, total_lbl = cart_rows[item['id']]
+                qty_lbl.configure(text=str(item['qty']))
+                total_lbl.configure(text=f"{item['qty'] * item['rate']:.2f}")
+            elif kind == "remove":
+                cart_rows.pop(item['id'])[0].destroy()
                 
             update_totals()
+        
+        cart = Cart(on_change=update_cart_display)
 
         # --- RIGHT PANE: SEARCH & PAYMENT ---
         
@@ -5089,65 +5105,90 @@ class AarambhaPMS(ctk.CTk):
         ctk.CTkLabel(search_frame, text="📷 Scan Barcode / Search Product:", font=("Segoe UI Bold", 12)).pack(anchor="w")
         search_var = StringVar()
         
+        def fetch_stock(query):
+            h = {"Authorization": f"Bearer {self.token}"}
+            r = self.api.get(f"/inventory/stock?query={query}", headers=h)
+            return r.json() if r.status_code == 200 else []
+
+        def resolve_scan(code):
+            # Local barcode map / index first; None sends the code to the server
+            index = self.stock_index
+            if not index.loaded:
+                return None
+            batches = index.lookup_code(code)
+            return ("batches", batches) if batches else ("search", index.search(code))
+        
+        def handle_scan(code, result):
+            if result is None:
+                return show_product_picker(code)
+            kind, rows = result
+            if kind == "batches":
+                add_scanned_batch(rows)
+            else:
+                handle_scan_results(code, rows)
+        
+        # Scans are handled strictly in order, even while a server lookup is in flight
+        scan_queue = ScanQueue(self.tasks, resolve_scan, lambda code: ("search", fetch_stock(code)),
+                               handle_scan, owner=cart_frame)
+
         def on_barcode_scan(event):
+            # A scanner burst ending in Enter never reaches the entry
+            if wedge.key(event) == "break":
+                return "break"
+            
             query = search_var.get().strip()
             if not query: return
+            search_var.set("")
+            scan_queue.push(query)
+
+        def add_scanned_batch(batches):
+            # FEFO: fill the earliest-expiring batch first, then move to the next
+            for item in batches:
+                exist = cart.get(item['id'])
+                if exist is None or exist['qty'] < item['quantity']:
+                    handle_scan_results(item['medicine_name'], [item])
+                    return
+            messagebox.showwarning("Stock", f"Max stock reached for {batches[0]['medicine_name']}")
+
+        def handle_scan_results(query, results):
+            # Filter valid
+            valid_stock = [i for i in results if i['quantity'] > 0]
             
-            # 1. Search API for exact match (Barcode or Name)
-            # Assuming scanners send Enter after scanning
-            try:
-                h = {"Authorization": f"Bearer {self.token}"}
-                r = requests.get(f"{API_BASE}/inventory/stock?query={query}", headers=h)
-                if r.status_code == 200:
-                    results = r.json()
-                    # Filter valid
-                    valid_stock = [i for i in results if i['quantity'] > 0]
-                    
-                    if len(valid_stock) == 1:
-                        # Exact match found -> Auto Add
-                        item = valid_stock[0]
-                        # Quick Add (logic duplicated from add_to_cart but simplified)
-                        # Ensure we don't have dialog here, just add to cart logic
-                        
-                        # Check exist
-                        exist = next((x for x in cart_items if x['id'] == item['id']), None)
-                        if exist:
-                            if exist['qty'] < item['quantity']:
-                                exist['qty'] += 1
-                                update_cart_display()
-                                search_var.set("") # Clear for next scan
-                            else:
-                                messagebox.showwarning("Stock", f"Max stock reached for {item['medicine_name']}")
-                        else:
-                            cart_items.append({
-                                "id": item['id'],
-                                "medicine_id": item['medicine_id'],
-                                "name": item['medicine_name'],
-                                "batch": item['batch_number'],
-                                "expiry": item['expiry_date'],
-                                "rate": float(item['selling_price']),
-                                "qty": 1
-                            })
-                            update_cart_display()
-                            search_var.set("") # Clear for next scan
-                            
-                        return # Done
-                        
-                    elif len(valid_stock) > 1:
-                        # Multiple matches -> Show Picker with this query
-                        show_product_picker(query)
-                        search_var.set("")
-                        return
-            except: pass
-            
-            # If no match or error, show picker normally
+            if len(valid_stock) == 1:
+                # Exact match found -> Auto Add
+                item = valid_stock[0]
+                
+                # Check exist
+                exist = cart.get(item['id'])
+                if exist:
+                    if exist['qty'] < item['quantity']:
+                        cart.set_qty(item['id'], exist['qty'] + 1)
+                    else:
+                        messagebox.showwarning("Stock", f"Max stock reached for {item['medicine_name']}")
+                else:
+                    cart.add({
+                        "id": item['id'],
+                        "medicine_id": item['medicine_id'],
+                        "name": item['medicine_name'],
+                        "batch": item['batch_number'],
+                        "expiry": item['expiry_date'],
+                        "rate": float(item['selling_price']),
+                        "qty": 1
+                    })
+                return # Done
+            
+            # Multiple matches, no match or error -> show picker with this query
             show_product_picker(query)
-            search_var.set("")
 
         search_entry = ctk.CTkEntry(search_frame, textvariable=search_var, placeholder_text="Scan Barcode or Type & Enter...")
         search_entry.pack(fill="x", pady=(5, 10))
         search_entry.bind("<Return>", on_barcode_scan)
         
+        # Keyboard-wedge scanners: detected by inter-key timing and queued without touching search_var
+        wedge = WedgeDetector(search_entry.after, search_entry.after_cancel, scan_queue.push,
+                              lambda text: search_entry.insert("insert", text))
+        search_entry.bind("<Key>", wedge.key, add="+")
+        
         def show_product_picker(initial_query=""):
             d = ctk.CTkToplevel(self.root)
             d.title("Select Product")
@@ -5164,23 +5205,26 @@ class AarambhaPMS(ctk.CTk):
             res_frame = ctk.CTkScrollableFrame(d)
             res_frame.pack(fill="both", expand=True, padx=10, pady=10)
             
+            def render_results(results):
+                for w in res_frame.winfo_children(): w.destroy()
+                for item in results:
+                    # Only valid stock
+                    if item['quantity'] <= 0: continue
+                    
+                    btn = ctk.CTkButton(res_frame, 
+                        text=f"{item['medicine_name']} | Batch: {item['batch_number']} | Exp: {item['expiry_date']} | Stock: {item['quantity']} | Price: {item['selling_price']}",
+                        anchor="w", fg_color="transparent", text_color="black", hover_color="#cbd5e1",
+                        command=lambda i=item: add_to_cart(i, d))
+                    btn.pack(fill="x", pady=2)
+
             def do_search():
+                if self.stock_index.loaded:
+                    render_results(self.stock_index.search(q.get()))
+                    return
                 for w in res_frame.winfo_children(): w.destroy()
-                try:
-                    h = {"Authorization": f"Bearer {self.token}"}
-                    # Using stock endpoint
-                    r = requests.get(f"{API_BASE}/inventory/stock?query={q.get()}", headers=h)
-                    if r.status_code == 200:
-                        for item in r.json():
-                            # Only valid stock
-                            if item['quantity'] <= 0: continue
-                            
-                            btn = ctk.CTkButton(res_frame, 
-                                text=f"{item['medicine_name']} | Batch: {item['batch_number']} | Exp: {item['expiry_date']} | Stock: {item['quantity']} | Price: {item['selling_price']}",
-                                anchor="w", fg_color="transparent", text_color="black", hover_color="#cbd5e1",
-                                command=lambda i=item: add_to_cart(i, d))
-                            btn.pack(fill="x", pady=2)
-                except: pass
+                # Using stock endpoint
+                self.tasks.submit(fetch_stock, q.get(), on_success=render_results,
+                                  key="product_picker", owner=res_frame)
                 
             ctk.CTkButton(s_frame, text="Search", width=100, command=do_search).pack(side="left")
             
@@ -5202,10 +5246,12 @@ class AarambhaPMS(ctk.CTk):
             
             def confirm():
                 qty = qv.get()
-                if qty <= 0 or qty > item['quantity']:
+                exist = cart.get(item['id'])
+                in_cart = exist['qty'] if exist else 0
+                if qty <= 0 or qty + in_cart > item['quantity']:
                     return messagebox.showerror("Error", "Invalid Quantity")
                     
-                cart_items.append({
+                cart.add({
                     "id": item['id'], # Stock ID
                     "medicine_id": item['medicine_id'],
                     "name": item['medicine_name'],
@@ -5214,7 +5260,6 @@ class AarambhaPMS(ctk.CTk):
                     "rate": float(item['selling_price']),
                     "qty": qty
                 })
-                update_cart_display()
                 qty_dialog.destroy()
                 dialog.destroy()
                 
@@ -5250,82 +5295,105 @@ class AarambhaPMS(ctk.CTk):
         ref_label = ctk.CTkLabel(pay_frame, text="Transaction Ref (Optional):", font=("Segoe UI Bold", 12))
         ref_entry = ctk.CTkEntry(pay_frame, width=300)
         
-        # Data store for methods
-        self.payment_methods_cache = []
+        # Data store for methods (kept across terminal rebuilds; refreshed in the background)
+        if not hasattr(self, 'payment_methods_cache'):
+            self.payment_methods_cache = []
+        
+        def fetch_payment_methods():
+            h = {"Authorization": f"Bearer {self.token}"}
+            r = self.api.get("/payment-methods?category=DIGITAL&status=Active&show_on_billing=true", headers=h)
+            if r.status_code != 200:
+                raise Exception(f"HTTP {r.status_code}")
+            methods = r.json()
+            # Warm the QR cache so switching methods at checkout is instant
+            for m in methods:
+                if not self.qr_cache.fresh(m):
+                    fetch_qr(m)
+            return methods
+        
+        def fetch_qr(method):
+            """Download a method's QR into the cache (worker thread); False if it has none"""
+            import base64
+            h = {"Authorization": f"Bearer {self.token}"}
+            etag = self.qr_cache.known_etag(method)
+            if etag:
+                h["If-None-Match"] = etag
+            r = self.api.get(f"/payment-methods/{method['id']}/qr", headers=h)
+            if r.status_code == 304:
+                self.qr_cache.touch(method)
+                return True
+            if r.status_code != 200:
+                return False
+            b64 = r.json().get('qr_image', '').split('base64,')[-1]
+            if not b64:
+                return False
+            self.qr_cache.store(method, r.headers.get("ETag"), base64.b64decode(b64))
+            return True
+        
+        def show_methods(methods):
+            self.payment_methods_cache = methods
+            names = [m['name'] for m in methods]
+            if not names: return
+            method_menu.configure(values=names)
+            if method_var.get() not in names:
+                method_var.set(names[0]) # trace redraws the QR
+            else:
+                update_qr_display()
         
         def load_payment_methods():
-            try:
-                h = {"Authorization": f"Bearer {self.token}"}
-                r = requests.get(f"{API_BASE}/payment-methods?category=DIGITAL&status=Active&show_on_billing=true", headers=h)
-                if r.status_code == 200:
-                    self.payment_methods_cache = r.json()
-                    names = [m['name'] for m in self.payment_methods_cache]
-                    if names:
-                        method_menu.configure(values=names)
-                        method_var.set(names[0])
-                        update_qr_display()
-            except: pass
+            if self.payment_methods_cache:
+                show_methods(self.payment_methods_cache)
+            self.tasks.submit(fetch_payment_methods, on_success=show_methods,
+                              on_error=lambda e: print(f"Payment methods load failed: {e}"),
+                              key="payment_methods", owner=method_menu)
             
         def update_qr_display(*args):
              # Find selected method
              name = method_var.get()
              method = next((m for m in self.payment_methods_cache if m['name'] == name), None)
              
-             if method:
-                 # Load QR
-                 try:
-                     h = {"Authorization": f"Bearer {self.token}"}
-                     r = requests.get(f"{API_BASE}/payment-methods/{method['id']}/qr", headers=h)
-                     if r.status_code == 200:
-                        import base64, io
-                        from PIL import Image
-                        b64 = r.json().get('qr_image', '').split('base64,')[-1]
-                        if b64:
-                            img_data = base64.b64decode(b64)
-                            pil_img = Image.open(io.BytesIO(img_data))
-                            
-                            # Standard preview
-                            pil_preview = pil_img.copy()
-                            pil_preview.thumbnail((200, 200))
-                            ctk_prev = ctk.CTkImage(light_image=pil_preview, dark_image=pil_preview, size=pil_preview.size)
-                            qr_image_label.configure(image=ctk_prev, text="")
-                            qr_image_label.image = ctk_prev
-                            
-                            # Info
-                            info_text = f"Account: {method.get('account_name') or '-'}\nID: {method.get('account_id') or '-'}"
-                            qr_info.configure(text=info_text)
-                            
-                            # Fullscreen handler
-                            def open_fs():
-                                fs_win = ctk.CTkToplevel(self.root)
-                                fs_win.title(f"Scan to Pay - {method['name']}")
-                                fs_win.geometry("600x700")
-                                fs_win.grab_set()
-                                
-                                ctk.CTkLabel(fs_win, text=f"Scan to Pay via {method['name']}", 
-                                           font=("Segoe UI Black", 24)).pack(pady=20)
-                                           
-                                pil_fs = pil_img.copy()
-                                pil_fs.thumbnail((500, 500))
-                                ctk_fs = ctk.CTkImage(light_image=pil_fs, dark_image=pil_fs, size=pil_fs.size)
-                                ctk.CTkLabel(fs_win, image=ctk_fs, text="").pack(pady=10)
-                                
-                                ctk.CTkLabel(fs_win, text=info_text, font=("Segoe UI Bold", 14)).pack(pady=10)
-                                ctk.CTkButton(fs_win, text="Close", command=fs_win.destroy, 
-                                             fg_color="#ef4444", width=200).pack(pady=20)
-                                             
-                            btn_fullscreen.configure(command=open_fs)
-                            
-                        else:
-                            qr_image_label.configure(image=None, text="Invalid QR Data")
-                     else:
-                        qr_image_label.configure(image=None, text="No QR Uploaded")
-                        qr_info.configure(text="")
-                 except: 
-                     qr_image_label.configure(image=None, text="Error loading QR")
-                     qr_info.configure(text="")
-             else:
+             if not method:
                  qr_image_label.configure(image=None, text="Select a Method")
+                 return
+             
+             preview = self.qr_cache.image(method, "preview")
+             if preview is None:
+                 # Not cached yet: fetch once, then draw if this method is still selected
+                 qr_image_label.configure(image=None, text="Loading QR...")
+                 qr_info.configure(text="")
+                 def fetched(has_qr):
+                     if method_var.get() != method['name']: return
+                     if has_qr: update_qr_display()
+                     else: qr_image_label.configure(image=None, text="No QR Uploaded")
+                 self.tasks.submit(fetch_qr, method, on_success=fetched,
+                                   on_error=lambda e: qr_image_label.configure(image=None, text="Error loading QR"),
+                                   key="qr_fetch", owner=qr_image_label)
+                 return
+             
+             qr_image_label.configure(image=preview, text="")
+             qr_image_label.image = preview
+             
+             # Info
+             info_text = f"Account: {method.get('account_name') or '-'}\nID: {method.get('account_id') or '-'}"
+             qr_info.configure(text=info_text)
+             
+             # Fullscreen handler
+             def open_fs():
+                 fs_win = ctk.CTkToplevel(self.root)
+                 fs_win.title(f"Scan to Pay - {method['name']}")
+                 fs_win.geometry("600x700")
+                 fs_win.grab_set()
+                 
+                 ctk.CTkLabel(fs_win, text=f"Scan to Pay via {method['name']}", 
+                            font=("Segoe UI Black", 24)).pack(pady=20)
+                 
+                 ctk.CTkLabel(fs_win, image=self.qr_cache.image(method, "fullscreen"), text="").pack(pady=10)
+                 
+                 ctk.CTkLabel(fs_win, text=info_text, font=("Segoe UI Bold", 14)).pack(pady=10)
+                 ctk.CTkButton(fs_win, text="Close", command=fs_win.destroy, 
+                              fg_color="#ef4444", width=200).pack(pady=20)
+                              
+             btn_fullscreen.configure(command=open_fs)
 
         method_var.trace_add("write", update_qr_display)
         
@@ -5341,8 +5409,7 @@ class AarambhaPMS(ctk.CTk):
                 ref_label.pack(anchor="w")
                 ref_entry.pack(pady=(0, 10))
                 
-                if not self.payment_methods_cache:
-                    load_payment_methods()
+                load_payment_methods()
             else:
                 method_label.pack_forget()
                 method_menu.pack_forget()
@@ -5361,31 +5428,31 @@ class AarambhaPMS(ctk.CTk):
         lbl_total.pack(pady=15)
         
         def update_totals():
-            lbl_total.configure(text=f"Total: Rs. {self.cart_total:,.2f}")
+            lbl_total.configure(text=f"Total: Rs. {cart.total:,.2f}")
             
         # User info removed VAT notice as per user request
             
         def process_sale():
-            if not cart_items:
+            if not cart:
                 return messagebox.showerror("Error", "Cart is empty")
                 
             if not cust_phone_var.get().strip():
                 return messagebox.showerror("Validation", "Customer Phone Number is required!")
 
             payload = {
-                "items": cart_items,
+                "items": cart.items,
                 "customer_name": cust_name_var.get(),
                 "customer_contact": cust_phone_var.get(),
                 "customer_address": cust_addr_var.get(),
                 "customer_sex": cust_sex_var.get(),
                 "invoice_date": invoice_date_var.get(),
-                "subtotal": self.cart_total,
-                "total_amount": self.cart_total, # For backend consistency
+                "subtotal": cart.total,
+                "total_amount": cart.total, # For backend consistency
                 "vat_amount": 0,
                 "discount_amount": 0,
-                "grand_total": self.cart_total,
+                "grand_total": cart.total,
                 "payment_category": pay_cat_var.get(),
-                "paid_amount": self.cart_total
+                "paid_amount": cart.total
             }
             
             # PDF Generation moved to after API success to get correct Bill Number
@@ -5406,57 +5473,94 @@ class AarambhaPMS(ctk.CTk):
                 payload["payment_method_id"] = method['id']
                 payload["transaction_ref"] = ref_entry.get().strip()
                 
+            # 1. Journal the sale locally (durable before anything is printed)
             try:
-                h = {"Authorization": f"Bearer {self.token}"}
-                r = requests.post(f"{API_BASE}/sales", json=payload, headers=h)
-                if r.status_code == 201 or r.status_code == 200:
-                    resp_data = r.json()
-                    bill_number = resp_data.get('bill_number') # Get backend generated bill number
-                    
-                    # --- PDF GEN ---
-                    try:
-                        from pdf_generator import generate_invoice
-                        import os
-                        if not os.path.exists("invoices"): os.makedirs("invoices")
-                        
-                        safe_date = invoice_date_var.get().replace("-", "").replace("/", "") 
-                        fname = f"invoices/{bill_number}_{safe_date}.pdf"
-                        
-                        p_data = {**payload, "bill_number": bill_number, 
-                                  "created_at": invoice_date_var.get(), 
-                                  "invoice_date": invoice_date_var.get(),
-                                  "pharmacy_name": self.user.get('pharmacy_name'),
-                                  "pharmacy_address": self.user.get('address'),
-                                  "pharmacy_contact": self.user.get('contact'),
-                                  "pan_number": self.user.get('pan_number'),
-                                  "oda_number": self.user.get('oda_number'),
-                                  "sold_by": self.user.get('name')}
-                        
-                        if not p_data.get('pharmacy_contact'):
-                            p_data['pharmacy_contact'] = self.user.get('pharmacy_contact') or self.user.get('contact_number')
-                                  
-                        generate_invoice(p_data, fname)
-                        os.startfile(os.path.abspath(fname))
-                    except Exception as e: 
-                        print(f"PDF Error: {e}")
-                    # ---------------
-
-                    messagebox.showinfo("Success", "Sale recorded successfully")
-                    self.show_billing_terminal() # Reset
-                else:
-                    messagebox.showerror("Error", f"Failed: {r.text}")
+                _, bill_number = self.sales_journal.record(payload, auth_token=self.token)
             except Exception as e:
-                messagebox.showerror("Error", str(e))
+                return messagebox.showerror("Error", f"Failed: {e}")
+            
+            # 2. Push it to the backend in the background; it keeps retrying if the server is down
+            self.sales_sync.wake()
+            update_sync_status()
+            
+            # --- PDF GEN (provisional number; the backend assigns the final one on sync) ---
+            # Written in the background so the terminal is ready for the next customer right away
+            safe_date = invoice_date_var.get().replace("-", "").replace("/", "") 
+            fname = f"invoices/{bill_number}_{safe_date}.pdf"
+            
+            p_data = {**payload, "bill_number": bill_number, 
+                      "created_at": invoice_date_var.get(), 
+                      "invoice_date": invoice_date_var.get(),
+                      "pharmacy_name": self.user.get('pharmacy_name'),
+                      "pharmacy_address": self.user.get('address'),
+                      "pharmacy_contact": self.user.get('contact'),
+                      "pan_number": self.user.get('pan_number'),
+                      "oda_number": self.user.get('oda_number'),
+                      "sold_by": self.user.get('name')}
+            
+            if not p_data.get('pharmacy_contact'):
+                p_data['pharmacy_contact'] = self.user.get('pharmacy_contact') or self.user.get('contact_number')
+                      
+            self.print_invoice_async(p_data, fname, on_error=lambda e: print(f"PDF Error: {e}"))
+            # ---------------
+
+            # Keep the local stock index in step with what was just sold
+            self.stock_index.apply_sale(cart.items)
+            self.refresh_stock_index()
+            
+            messagebox.showinfo("Success", f"Sale recorded successfully\nInvoice: {bill_number}")
+            self.screens.reset("billing")
                 
         ctk.CTkButton(right_pane, text="✅ Checkout / Print Bill", command=process_sale, 
                      height=50, fg_color="#10b981", font=("Segoe UI Bold", 16)).pack(side="bottom", fill="x", padx=15, pady=(0, 20))
+        
+        # Journal status: sales still waiting for the server, and sales it refused
+        sync_bar = ctk.CTkFrame(right_pane, fg_color="transparent")
+        sync_bar.pack(side="bottom", fill="x", padx=15, pady=(0, 5))
+        sync_lbl = ctk.CTkLabel(sync_bar, text="", font=("Segoe UI", 11), anchor="w")
+        sync_lbl.pack(side="left")
+        review_btn = ctk.CTkButton(sync_bar, text="Retry / Resolve", width=110, height=26, fg_color="#ef4444",
+                                   command=lambda: self.show_rejected_sales(on_change=update_sync_status))
+        
+        def update_sync_status():
+            counts = self.sales_journal.counts()
+            pending, rejected = counts.get("pending", 0), counts.get("rejected", 0)
+            if rejected:
+                sync_lbl.configure(text=f"⚠ {rejected} rejected  •  {pending} waiting to sync", text_color="#ef4444")
+                review_btn.pack(side="right")
+            else:
+                sync_lbl.configure(text=f"⏳ {pending} waiting to sync" if pending else "✔ All sales synced",
+                                   text_color="#f59e0b" if pending else "gray")
+                review_btn.pack_forget()
+        
+        def poll_sync_status():
+            if sync_lbl.winfo_exists():
+                update_sync_status()
+                sync_lbl.after(5000, poll_sync_status)
+        
+        poll_sync_status()
+        
+        def reset_terminal():
+            """Clear the form for the next customer (after a sale or when navigating back)"""
+            cart.clear()
+            for var in (cust_name_var, cust_phone_var, cust_addr_var, search_var):
+                var.set("")
+            cust_sex_var.set("Male")
+            invoice_date_var.set(DateUtils.get_current_bs_date_str())
+            pay_cat_var.set("CASH")
+            ref_entry.delete(0, "end")
+            # Lookups cancelled while another screen was open must not block later scans
+            scan_queue.clear()
+            wedge.reset()
+            search_entry.focus_set()
+        
+        self.screens.register("billing", main_container, reset_terminal)
 
 
 
     def show_system_logs(self):
         """View System Audit Logs"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -5496,7 +5600,7 @@ class AarambhaPMS(ctk.CTk):
         logs_container.pack(fill="both", expand=True, pady=10)
         
         try:
-            response = requests.get(f"{API_BASE}/super/audit-logs", headers={"Authorization": f"Bearer {self.token}"})
+            response = self.api.get("/super/audit-logs")
             logs = response.json() if response.status_code == 200 else []
         except:
             logs = []
@@ -5570,8 +5674,7 @@ class AarambhaPMS(ctk.CTk):
             
     def _legacy_show_bill_designer(self):
         """Interactive Bill Designer for Super Admin"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -5719,8 +5822,7 @@ class AarambhaPMS(ctk.CTk):
         
     def show_system_settings(self):
         """System Settings"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -5820,8 +5922,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_vendor_management(self):
         """Supplier/Vendor management interface"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -5922,7 +6023,7 @@ class AarambhaPMS(ctk.CTk):
             if status: params['status'] = status
             
             headers = {"Authorization": f"Bearer {self.token}"}
-            res = requests.get(f"{API_BASE}/vendors", params=params, headers=headers)
+            res = self.api.get("/vendors", params=params, headers=headers)
             vendors = res.json() if res.status_code == 200 else []
         except Exception as e:
             print(f"Error loading vendors: {e}")
@@ -6048,9 +6149,9 @@ class AarambhaPMS(ctk.CTk):
                 headers = {"Authorization": f"Bearer {self.token}"}
                 if is_edit:
                     data['status'] = vendor['status']
-                    res = requests.put(f"{API_BASE}/vendors/{vendor['id']}", json=data, headers=headers)
+                    res = self.api.put(f"/vendors/{vendor['id']}", json=data, headers=headers)
                 else:
-                    res = requests.post(f"{API_BASE}/vendors", json=data, headers=headers)
+                    res = self.api.post("/vendors", json=data, headers=headers)
                 
                 if res.status_code in [200, 201]:
                     messagebox.showinfo("Success", f"Supplier {'updated' if is_edit else 'added'} successfully!")
@@ -6065,7 +6166,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_vendor_detail(self, vendor_summary):
         """Detailed Supplier Profile with Transaction History"""
-        for widget in self.root.winfo_children(): widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -6086,7 +6187,7 @@ class AarambhaPMS(ctk.CTk):
         # Fetch full data with stats
         try:
             headers = {"Authorization": f"Bearer {self.token}"}
-            res = requests.get(f"{API_BASE}/vendors/{vendor_summary['id']}", headers=headers)
+            res = self.api.get(f"/vendors/{vendor_summary['id']}", headers=headers)
             vendor = res.json() if res.status_code == 200 else vendor_summary
         except: vendor = vendor_summary
 
@@ -6131,7 +6232,7 @@ class AarambhaPMS(ctk.CTk):
         history_frame.pack(fill="both", expand=True)
 
         try:
-            h_res = requests.get(f"{API_BASE}/vendors/{vendor['id']}/history", headers=headers)
+            h_res = self.api.get(f"/vendors/{vendor['id']}/history", headers=headers)
             history = h_res.json() if h_res.status_code == 200 else []
         except: history = []
 
@@ -6195,7 +6296,7 @@ class AarambhaPMS(ctk.CTk):
                     "reference_no": ref_var.get().strip(),
                     "notes": notes_var.get().strip()
                 }
-                res = requests.post(f"{API_BASE}/vendors/payments", json=payload, headers=headers)
+                res = self.api.post("/vendors/payments", json=payload, headers=headers)
                 if res.status_code == 201:
                     messagebox.showinfo("Success", "Payment recorded successfully!")
                     dialog.destroy()
@@ -6209,8 +6310,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_purchase_entry(self):
         """Complete Purchase Entry (GRN) Module - Fully Functional"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         # Main container with sidebar
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
@@ -6359,67 +6459,12 @@ class AarambhaPMS(ctk.CTk):
         items_scroll.pack(fill="both", expand=True)
         
         self.grn_rows = []
+        # Line amounts and running totals live here, not in the Tk variables
+        grn_totals = GRNTotals()
         
-        # --- AUTOCOMPLETE HELPER ---
-        def setup_autocomplete(entry, id_var, name_var):
-            def on_key(event):
-                # Debounce or simple len check
-                query = name_var.get()
-                if len(query) < 2: return
-                
-                # Fetch
-                try:
-                    h = {"Authorization": f"Bearer {self.token}"}
-                    # Assuming we have a global medicine search or stock search. 
-                    # Use medicines endpoint for definition search (since we are buying, it might be new or existing)
-                    r = requests.get(f"{API_BASE}/medicines?search={query}", headers=h)
-                    if r.status_code == 200:
-                        data = r.json()
-                        show_suggestions(data, entry, id_var, name_var)
-                except: pass
-                
-            entry.bind("<KeyRelease>", on_key)
-            
-        def show_suggestions(data, entry, id_var, name_var):
-            # Close existing if any
-            if hasattr(entry, 'suggestion_window') and entry.suggestion_window:
-                entry.suggestion_window.destroy()
-                
-            if not data: return
-            
-            # Create popup
-            # Calculate position
-            x = entry.winfo_rootx()
-            y = entry.winfo_rooty() + entry.winfo_height()
-            
-            popup = ctk.CTkToplevel(self.root)
-            popup.wm_overrideredirect(True)
-            popup.geometry(f"300x200+{x}+{y}")
-            entry.suggestion_window = popup
-            
-            # Listbox
-            import tkinter as tk
-            lb = tk.Listbox(popup, font=("Segoe UI", 11), height=10)
-            lb.pack(fill="both", expand=True)
-            
-            meds = []
-            for item in data:
-                meds.append(item)
-                lb.insert("end", f"{item['name']} ({item.get('strength','')})")
-                
-            def on_select(evt):
-                if not lb.curselection(): return
-                idx = lb.curselection()[0]
-                m = meds[idx]
-                
-                name_var.set(m['name'])
-                id_var.set(m['id'])
-                popup.destroy()
-                
-            lb.bind("<<ListboxSelect>>", on_select)
-            popup.bind("<FocusOut>", lambda e: popup.destroy())
-        
-        def add_grn_row():
+        def add_grn_row(values=None):
+            """Append an item row; ``values`` (see grn_import.rows_from_extract) pre-fills it"""
+            values = values or {}
             idx = len(self.grn_rows) + 1
             row_f = ctk.CTkFrame(items_scroll, fg_color="transparent")
             row_f.pack(fill="x", pady=2)
@@ -6433,38 +6478,35 @@ class AarambhaPMS(ctk.CTk):
             b_ent.pack(side="left", padx=2)
             
             # Product
-            p_id = IntVar(value=0)
-            p_name = StringVar()
+            p_id = IntVar(value=values.get('medicine_id', 0))
+            p_name = StringVar(value=values.get('name', ""))
             p_ent = ctk.CTkEntry(row_f, textvariable=p_name, width=200, placeholder_text="Search Product...")
             p_ent.pack(side="left", padx=2)
             
-            # Attach Autocomplete
-            setup_autocomplete(p_ent, p_id, p_name)
-            
             # Batch
-            batch = StringVar()
+            batch = StringVar(value=values.get('batch', ""))
             ctk.CTkEntry(row_f, textvariable=batch, width=100, placeholder_text="Batch No").pack(side="left", padx=2)
             
             # Expiry Format (BS/AD)
-            exp_fmt = StringVar(value="BS")
+            exp_fmt = StringVar(value=values.get('exp_fmt', "BS"))
             ctk.CTkOptionMenu(row_f, variable=exp_fmt, values=["BS", "AD"], width=60).pack(side="left", padx=2)
             
             # Expiry Date
-            exp = StringVar()
+            exp = StringVar(value=values.get('expiry', ""))
             ctk.CTkEntry(row_f, textvariable=exp, width=90, placeholder_text="YYYY-MM-DD").pack(side="left", padx=2)
             
             # Purchase Rate
-            rate = DoubleVar(value=0.0)
+            rate = DoubleVar(value=values.get('rate', 0.0))
             r_ent = ctk.CTkEntry(row_f, textvariable=rate, width=80)
             r_ent.pack(side="left", padx=2)
             
             # MRP
-            mrp = DoubleVar(value=0.0)
+            mrp = DoubleVar(value=values.get('mrp', 0.0))
             m_ent = ctk.CTkEntry(row_f, textvariable=mrp, width=80)
             m_ent.pack(side="left", padx=2)
             
             # Qty
-            qty = IntVar(value=0)
+            qty = IntVar(value=values.get('qty', 0))
             q_ent = ctk.CTkEntry(row_f, textvariable=qty, width=60)
             q_ent.pack(side="left", padx=2)
             
@@ -6481,13 +6523,17 @@ class AarambhaPMS(ctk.CTk):
             ctk.CTkOptionMenu(row_f, variable=vat, values=["VAT", "VAT-Free"], width=50).pack(side="left", padx=2)
             
             # Total
-            total_var = StringVar(value="0.00")
+            slot = grn_totals.add(qty.get(), rate.get(), disc.get(), vat.get() == "VAT")
+            total_var = StringVar(value=f"{grn_totals.line_total(slot):.2f}")
+            if not p_id.get() and p_name.get():
+                p_ent.configure(border_color="#f59e0b") # imported line without a matched product
             ctk.CTkLabel(row_f, textvariable=total_var, width=100, font=("Segoe UI Bold", 12), text_color="#6366f1").pack(side="left", padx=2)
             
             # Remove button
             def remove():
                 row_f.destroy()
                 self.grn_rows.remove(row_data)
+                grn_totals.remove(slot)
                 update_totals()
             
             ctk.CTkButton(row_f, text="×", width=30, height=30, fg_color="#fee2e2", text_color="#ef4444", command=remove).pack(side="left", padx=2)
@@ -6495,30 +6541,26 @@ class AarambhaPMS(ctk.CTk):
             row_data = {
                 'p_id': p_id, 'p_name': p_name, 'batch': batch, 'exp': exp, 'exp_fmt': exp_fmt,
                 'rate': rate, 'mrp': mrp, 'qty': qty, 'free': free,
-                'disc': disc, 'vat': vat, 'total_var': total_var
+                'disc': disc, 'vat': vat, 'total_var': total_var, 'frame': row_f, 'slot': slot
             }
             self.grn_rows.append(row_data)
             
-            # Auto-calculation
+            # Auto-calculation: only this row is read; the summary moves by its delta
             def calc(*a):
                 try:
-                    base = qty.get() * rate.get()
-                    disc_amt = base * (disc.get() / 100)
-                    subtotal = base - disc_amt
-                    vat_amt = subtotal * 0.13 if vat.get() == "VAT" else 0
-                    line_total = subtotal + vat_amt
-                    total_var.set(f"{line_total:.2f}")
-                    update_totals()
-                except:
-                    pass
+                    line_total = grn_totals.update(slot, qty.get(), rate.get(), disc.get(), vat.get() == "VAT")
+                except (tk.TclError, ValueError):
+                    return  # half-typed number
+                total_var.set(f"{line_total:.2f}")
+                update_totals()
             
             qty.trace_add("write", calc)
             rate.trace_add("write", calc)
             disc.trace_add("write", calc)
             vat.trace_add("write", calc)
             
-            # Product search
-            p_ent.bind("<KeyRelease>", lambda e: self.show_product_search_popup(p_ent, p_id, p_name, mrp, rate))
+            # Product search (debounced, cached typeahead)
+            self.attach_product_search(p_ent, p_id, p_name, mrp, rate)
             
             # Enter key navigation
             def on_enter(event):
@@ -6546,31 +6588,18 @@ class AarambhaPMS(ctk.CTk):
         due_var = StringVar(value="0.00")
         
         def update_totals():
-            subtotal = 0
-            disc_total = 0
-            vat_total = 0
-            
-            for r in self.grn_rows:
-                try:
-                    base = r['qty'].get() * r['rate'].get()
-                    disc_amt = base * (r['disc'].get() / 100)
-                    sub = base - disc_amt
-                    vat_amt = sub * 0.13 if r['vat'].get() == "VAT" else 0
-                    
-                    subtotal += base
-                    disc_total += disc_amt
-                    vat_total += vat_amt
-                except:
-                    pass
-            
-            grand = subtotal - disc_total + vat_total
-            due = grand - paid_var.get()
+            """Show the engine's running totals (no per-row work)"""
+            totals = grn_totals.summary()
+            try:
+                paid = paid_var.get()
+            except (tk.TclError, ValueError):
+                paid = 0.0
             
-            subtotal_var.set(f"{subtotal:.2f}")
-            disc_total_var.set(f"{disc_total:.2f}")
-            vat_total_var.set(f"{vat_total:.2f}")
-            grand_var.set(f"{grand:.2f}")
-            due_var.set(f"{max(0, due):.2f}")
+            subtotal_var.set(f"{totals['subtotal']:.2f}")
+            disc_total_var.set(f"{totals['discount_total']:.2f}")
+            vat_total_var.set(f"{totals['tax_total']:.2f}")
+            grand_var.set(f"{totals['grand_total']:.2f}")
+            due_var.set(f"{max(0, totals['grand_total'] - paid):.2f}")
         
         paid_var.trace_add("write", lambda *a: update_totals())
         
@@ -6597,15 +6626,15 @@ class AarambhaPMS(ctk.CTk):
         actions_frame = ctk.CTkFrame(content, fg_color="transparent")
         actions_frame.pack(fill="x")
         
-        def save_purchase(confirm=False):
+        def purchase_header(confirm):
+            """Header fields of the /purchases payload; None (after an error box) if incomplete"""
             if not supplier_id_var.get():
-                return messagebox.showerror("Error", "Please select a supplier")
+                messagebox.showerror("Error", "Please select a supplier")
+                return None
             if not invoice_var.get().strip():
-                return messagebox.showerror("Error", "Please enter invoice number")
-            if not self.grn_rows or all(r['p_id'].get() == 0 for r in self.grn_rows):
-                return messagebox.showerror("Error", "Please add at least one item")
-            
-            payload = {
+                messagebox.showerror("Error", "Please enter invoice number")
+                return None
+            return {
                 "grn_no": grn_no,
                 "supplier_id": supplier_id_var.get(),
                 "invoice_no": invoice_var.get(),
@@ -6613,13 +6642,41 @@ class AarambhaPMS(ctk.CTk):
                 "purchase_date": DateUtils.bs_to_ad(date_var.get()),
                 "payment_type": pay_var.get(),
                 "due_date": due_entry.get() if pay_var.get() == "Credit" else None,
-                "subtotal": float(subtotal_var.get()),
-                "discount_total": float(disc_total_var.get()),
-                "tax_total": float(vat_total_var.get()),
-                "grand_total": float(grand_var.get()),
                 "paid_amount": paid_var.get(),
                 "status": "CONFIRMED" if confirm else "DRAFT",
                 "notes": notes_text.get("1.0", "end").strip(),
+            }
+        
+        def post_purchase(payload, confirm):
+            """Send one /purchases payload; True when it was saved"""
+            try:
+                headers = {"Authorization": f"Bearer {self.token}"}
+                resp = self.api.post("/purchases", json=payload, headers=headers)
+                if resp.status_code == 200:
+                    if confirm:
+                        self.refresh_stock_index()
+                    messagebox.showinfo("Success", f"Purchase {'confirmed and stock updated' if confirm else 'saved as draft'}!")
+                    return True
+                messagebox.showerror("Error", resp.json().get('error', 'Failed to save purchase'))
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+            return False
+        
+        def save_purchase(confirm=False):
+            header = purchase_header(confirm)
+            if header is None:
+                return
+            if not self.grn_rows or all(r['p_id'].get() == 0 for r in self.grn_rows):
+                return messagebox.showerror("Error", "Please add at least one item")
+            
+            # Re-sum once from the inputs so the saved totals carry no delta drift
+            grn_totals.recompute()
+            items = [r for r in self.grn_rows if r['p_id'].get() > 0]
+            disc_amts, tax_amts, line_totals = grn_totals.amounts([r['slot'] for r in items])
+            
+            payload = {
+                **header,
+                **grn_totals.summary(),
                 "items": [{
                     "medicine_id": r['p_id'].get(),
                     "batch_no": r['batch'].get(),
@@ -6631,30 +6688,165 @@ class AarambhaPMS(ctk.CTk):
                     "free_qty": r['free'].get(),
                     "purchase_rate": r['rate'].get(),
                     "mrp": r['mrp'].get(),
-                    "discount_amount": (r['qty'].get() * r['rate'].get()) * (r['disc'].get() / 100),
-                    "tax_amount": (r['qty'].get() * r['rate'].get() * (1 - r['disc'].get()/100)) * (0.13 if r['vat'].get() == "VAT" else 0),
-                    "line_total": float(r['total_var'].get())
-                } for r in self.grn_rows if r['p_id'].get() > 0]
+                    "discount_amount": round(float(disc_amts[i]), 2),
+                    "tax_amount": round(float(tax_amts[i]), 2),
+                    "line_total": round(float(line_totals[i]), 2)
+                } for i, r in enumerate(items)]
             }
-            
-            try:
-                headers = {"Authorization": f"Bearer {self.token}"}
-                resp = requests.post(f"{API_BASE}/purchases", json=payload, headers=headers)
-                if resp.status_code == 200:
-                    messagebox.showinfo("Success", f"Purchase {'confirmed and stock updated' if confirm else 'saved as draft'}!")
-                    self.show_purchase_entry()
-                else:
-                    messagebox.showerror("Error", resp.json().get('error', 'Failed to save purchase'))
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            if post_purchase(payload, confirm):
+                self.show_purchase_entry()
         
         ctk.CTkButton(actions_frame, text="➕ ADD ROW", height=50, width=150, command=add_grn_row).pack(side="left", padx=5)
         ctk.CTkButton(actions_frame, text="💾 SAVE DRAFT", height=50, width=150, fg_color="#64748b", command=lambda: save_purchase(False)).pack(side="left", padx=5)
         ctk.CTkButton(actions_frame, text="✅ CONFIRM & POST STOCK", height=50, width=200, fg_color="#10b981", font=("Segoe UI Black", 13), command=lambda: save_purchase(True)).pack(side="right", padx=5)
         
+        def prefill_grn_rows(rows):
+            """Add many pre-filled rows with one layout pass and one totals update"""
+            # Untouched blank rows would only get in the way
+            for r in [r for r in self.grn_rows if not r['p_id'].get() and not r['p_name'].get().strip()]:
+                r['frame'].destroy()
+                self.grn_rows.remove(r)
+                grn_totals.remove(r['slot'])
+            
+            items_scroll.pack_forget()
+            try:
+                for values in rows:
+                    add_grn_row(values)
+            finally:
+                items_scroll.pack(fill="both", expand=True)
+            update_totals()
+        
+        def import_supplier_pdf(extracted=None):
+            """Extract (if needed) a supplier PDF, match its lines to medicines and fill the grid"""
+            path = None
+            if extracted is None:
+                path = filedialog.askopenfilename(filetypes=[("PDF Files", "*.pdf")])
+                if not path: return
+            
+            def work():
+                from pdf_extractor import InvoiceExtractor
+                from grn_import import rows_from_extract
+                data = extracted if extracted is not None else InvoiceExtractor(path).extract()
+                if "error" in data:
+                    raise Exception(data['error'])
+                return data, rows_from_extract(data.get('items', []), self.get_medicine_matcher())
+            
+            def done(result):
+                data, rows = result
+                if not rows:
+                    return messagebox.showwarning("Import", "No item lines were found in this invoice.")
+                if not invoice_var.get().strip() and data.get('invoice_no') not in (None, "Unknown"):
+                    invoice_var.set(data['invoice_no'])
+                prefill_grn_rows(rows)
+                unmatched = [r['raw_name'] for r in rows if not r['medicine_id']]
+                msg = f"Imported {len(rows)} lines."
+                if unmatched:
+                    msg += f"\n{len(unmatched)} need a product (highlighted):\n" + "\n".join(unmatched[:10])
+                messagebox.showinfo("Import", msg)
+            
+            self.tasks.submit(work, on_success=done,
+                              on_error=lambda e: messagebox.showerror("Import Failed", str(e)),
+                              key="grn_import", owner=items_scroll)
+        
+        ctk.CTkButton(actions_frame, text="📥 IMPORT SUPPLIER PDF", height=50, width=200, fg_color="#6366f1",
+                      command=import_supplier_pdf).pack(side="left", padx=5)
+        
+        def show_bulk_preview(rows):
+            """Read-only preview of an imported file; the purchase is posted from here, not from the grid"""
+            if not rows:
+                return messagebox.showwarning("Bulk Import", "No item lines were found in this file.")
+            from grn_import import purchase_items
+            valid = [r for r in rows if not r['issues']]
+            
+            dialog = ctk.CTkToplevel(self.root)
+            dialog.title("Bulk Import Preview")
+            dialog.geometry("1200x650")
+            dialog.transient(self.root)
+            
+            top = ctk.CTkFrame(dialog, fg_color="transparent")
+            top.pack(fill="x", padx=20, pady=(15, 5))
+            summary_lbl = ctk.CTkLabel(top, text="", font=("Segoe UI Bold", 14))
+            summary_lbl.pack(side="left")
+            
+            # Lines the file gives a VAT value for keep it; this applies to the rest
+            default_vat = StringVar(value="VAT-Free")
+            ctk.CTkOptionMenu(top, variable=default_vat, values=["VAT-Free", "VAT"], width=100,
+                              command=lambda _: recalc()).pack(side="right")
+            ctk.CTkLabel(top, text="Lines without VAT column:", font=("Segoe UI", 12)).pack(side="right", padx=5)
+            
+            state = {}
+            def recalc():
+                state['items'], state['totals'] = purchase_items(valid, vat=default_vat.get() == "VAT")
+                totals = state['totals']
+                summary_lbl.configure(text=f"{len(rows)} lines  •  {len(valid)} valid  •  {len(rows) - len(valid)} with problems  •  "
+                                           f"VAT Rs. {totals['tax_total']:,.2f}  •  Grand Total Rs. {totals['grand_total']:,.2f}")
+                if 'table' in state: state['table'].refresh()
+            recalc()
+            
+            btn_row = ctk.CTkFrame(dialog, fg_color="transparent")
+            btn_row.pack(side="bottom", fill="x", padx=20, pady=15)
+            
+            # Only the visible lines get widgets, however long the file is
+            state['table'] = VirtualTable(dialog, columns=[
+                Column("Line", 50, "line"),
+                Column("Supplier Item", 200, "raw_name", anchor="w"),
+                Column("Matched Product", 200, lambda r: r['name'] if r['medicine_id'] else None, anchor="w"),
+                Column("Batch", 90, "batch"),
+                Column("Expiry", 110, lambda r: f"{r['expiry']} {r['exp_fmt']}" if r['expiry'] else None),
+                Column("Qty", 60, "qty"),
+                Column("Free", 50, "free"),
+                Column("Rate", 70, "rate"),
+                Column("Disc%", 60, "disc"),
+                Column("VAT", 70, lambda r: "VAT" if (default_vat.get() == "VAT" if r.get('vat') is None else r['vat']) else "Free"),
+                Column("Status", 220, lambda r: ", ".join(r['issues']) or "OK", anchor="w",
+                       color=lambda r: "#ef4444" if r['issues'] else "#10b981"),
+            ], rows=rows, row_height=30)
+            state['table'].pack(fill="both", expand=True, padx=20)
+            
+            def submit(confirm):
+                if not valid:
+                    return messagebox.showerror("Bulk Import", "There are no valid lines to import.", parent=dialog)
+                header = purchase_header(confirm)
+                if header is None:
+                    return
+                skipped = len(rows) - len(valid)
+                if skipped and not messagebox.askyesno("Bulk Import", f"{skipped} lines with problems will be left out. Continue?", parent=dialog):
+                    return
+                if post_purchase({**header, **state['totals'], "items": state['items']}, confirm):
+                    dialog.destroy()
+                    self.show_purchase_entry()
+            
+            ctk.CTkButton(btn_row, text="Cancel", width=120, fg_color="#64748b", command=dialog.destroy).pack(side="left")
+            ctk.CTkButton(btn_row, text="✅ CONFIRM & POST STOCK", width=200, fg_color="#10b981",
+                          command=lambda: submit(True)).pack(side="right", padx=5)
+            ctk.CTkButton(btn_row, text="💾 SAVE DRAFT", width=150, fg_color="#64748b",
+                          command=lambda: submit(False)).pack(side="right", padx=5)
+        
+        def bulk_import_file():
+            """Stream a distributor CSV/XLSX, match and validate it off the Tk thread"""
+            path = filedialog.askopenfilename(filetypes=[("Distributor Files", "*.csv *.xlsx *.xlsm"), ("All Files", "*.*")])
+            if not path: return
+            
+            def work():
+                from grn_import import rows_from_distributor_file
+                return rows_from_distributor_file(path, self.get_medicine_matcher())
+            
+            self.tasks.submit(work, on_success=show_bulk_preview,
+                              on_error=lambda e: messagebox.showerror("Import Failed", str(e)),
+                              key="grn_bulk_import", owner=items_scroll)
+        
+        ctk.CTkButton(actions_frame, text="📄 BULK IMPORT CSV/XLSX", height=50, width=200, fg_color="#0ea5e9",
+                      command=bulk_import_file).pack(side="left", padx=5)
+        
         # Initialize with 3 blank rows
         for _ in range(3):
             add_grn_row()
+        
+        # Extraction handed over from PDF Tools
+        pending = getattr(self, 'pending_grn_import', None)
+        if pending:
+            self.pending_grn_import = None
+            import_supplier_pdf(pending)
 
 
     def add_labeled_entry(self, parent, label, var, row, col, **kwargs):
@@ -6689,7 +6881,7 @@ class AarambhaPMS(ctk.CTk):
             if not name.get(): return
             payload = {"name": name.get(), "phone": phone.get(), "address": addr.get(), "email": ""}
             # Fix: Use standard /vendors endpoint
-            r = requests.post(f"{API_BASE}/vendors", json=payload, headers={"Authorization": f"Bearer {self.token}"})
+            r = self.api.post("/vendors", json=payload)
             if r.status_code in [201, 200]: d.destroy()
             else: messagebox.showerror("Error", f"Failed: {r.json().get('error', 'Unknown Error')}")
             
@@ -6697,7 +6889,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_purchase_returns(self):
         """Purchase Return Module"""
-        for widget in self.root.winfo_children(): widget.destroy()
+        self.screens.clear()
         main = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main.pack(fill="both", expand=True)
         nav = self.get_super_admin_nav() if self.user['role'] == 'SUPER_ADMIN' else self.get_admin_nav()
@@ -6716,7 +6908,7 @@ class AarambhaPMS(ctk.CTk):
         
         grn_list = []
         try:
-            r = requests.get(f"{API_BASE}/purchases/confirmed", headers={"Authorization": f"Bearer {self.token}"})
+            r = self.api.get("/purchases/confirmed")
             grn_list = r.json()
         except: pass
         
@@ -6735,7 +6927,7 @@ class AarambhaPMS(ctk.CTk):
             sel_grn = next(g for g in grn_list if f"{g['grn_no']} - {g['supplier_name']}" in grn_var.get())
             
             try:
-                r = requests.get(f"{API_BASE}/purchases/{sel_grn['id']}/items", headers={"Authorization": f"Bearer {self.token}"})
+                r = self.api.get(f"/purchases/{sel_grn['id']}/items")
                 items = r.json()
             except: items = []
             
@@ -6802,7 +6994,7 @@ class AarambhaPMS(ctk.CTk):
                         "items": items_to_return
                     }
                     
-                    r = requests.post(f"{API_BASE}/purchases/return", json=payload, headers={"Authorization": f"Bearer {self.token}"})
+                    r = self.api.post("/purchases/return", json=payload)
                     if r.status_code == 200:
                         messagebox.showinfo("Success", "Return Processed & Supplier Balance Adjusted!")
                         self.show_purchase_returns()
@@ -6839,7 +7031,7 @@ class AarambhaPMS(ctk.CTk):
             try:
                 term = search_var.get()
                 # Use standard /vendors endpoint which supports 'search' param
-                resp = requests.get(f"{API_BASE}/vendors?search={term}", headers={"Authorization": f"Bearer {self.token}"})
+                resp = self.api.get(f"/vendors?search={term}")
                 suppliers = resp.json() if resp.status_code == 200 else []
                 if not suppliers and resp.status_code == 200:
                     ctk.CTkLabel(list_frame, text="No suppliers found", text_color="gray").pack(pady=20)
@@ -6858,7 +7050,7 @@ class AarambhaPMS(ctk.CTk):
             name_var.set(s['name'])
             # Fetch balance
             try:
-                b_resp = requests.get(f"{API_BASE}/suppliers/{s['id']}/balance", headers={"Authorization": f"Bearer {self.token}"})
+                b_resp = self.api.get(f"/suppliers/{s['id']}/balance")
                 balance_var.set(f"Balance: {b_resp.json().get('balance', 0):.2f}")
             except: pass
             dialog.destroy()
@@ -6866,58 +7058,36 @@ class AarambhaPMS(ctk.CTk):
         search_var.trace_add("write", lambda *args: load_suppliers())
         load_suppliers()
 
-    def show_product_search_popup(self, entry_widget, id_var, name_var, mrp_var=None, rate_var=None):
-        """Refined product search popup with 'Add New' option"""
-        term = name_var.get()
-        if hasattr(self, '_search_popup') and self._search_popup.winfo_exists():
-            self._search_popup.destroy()
-        
-        if len(term) < 2: return
-
-        popup = tk.Toplevel(self.root)
-        popup.overrideredirect(True)
-        self._search_popup = popup
-        
-        x = entry_widget.winfo_rootx()
-        y = entry_widget.winfo_rooty() + entry_widget.winfo_height()
-        popup.geometry(f"400x300+{x}+{y}")
-        
-        list_box = tk.Listbox(popup, font=("Segoe UI", 11), borderwidth=1, relief="solid")
-        list_box.pack(fill="both", expand=True)
-        
-        try:
-            resp = requests.get(f"{API_BASE}/search-medicines?q={term}", headers={"Authorization": f"Bearer {self.token}"})
-            meds = resp.json() if resp.status_code == 200 else []
+    def attach_product_search(self, entry_widget, id_var, name_var, mrp_var=None, rate_var=None):
+        """Attach the shared product typeahead (with 'Add New' option) to an entry"""
+        if getattr(self, 'product_search', None) is None:
+            def fetch(term):
+                resp = self.api.get("/search-medicines", params={"q": term})
+                return resp.json() if resp.status_code == 200 else []
             
-            list_box.insert("end", "+ Add New Product...")
-            for m in meds:
-                list_box.insert("end", f"{m['name']} ({m.get('strength','')}) - Stock: {m.get('total_stock', 0)}")
-        except: meds = []
-
-        def on_select(evt):
-            if not list_box.curselection(): return
-            idx = list_box.curselection()[0]
-            if idx == 0:
+            def add_new():
+                # A new product invalidates cached suggestions
+                self.product_search.cache.clear()
                 self.show_add_item_dialog()
-                popup.destroy()
-                return
-
-            m = meds[idx-1]
+            
+            self.product_search = Autocomplete(
+                self.root, self.tasks, fetch,
+                format_item=lambda m: f"{m['name']} ({m.get('strength','')}) - Stock: {m.get('total_stock', 0)}",
+                cache=PrefixCache(medicine_matches, page_limit=20), # /search-medicines returns at most 20
+                extra_items=[("+ Add New Product...", add_new)]
+            )
+        
+        def on_select(m):
             id_var.set(m['id'])
             name_var.set(m['name'])
             if rate_var: rate_var.set(m.get('last_purchase_rate', 0))
-            popup.destroy()
-
-        list_box.bind("<<ListboxSelect>>", on_select)
         
-        # Close on focus loss
-        popup.bind("<FocusOut>", lambda e: popup.destroy())
+        self.product_search.attach(entry_widget, name_var, on_select)
 
 
     def show_payment_methods(self):
         """Payment Methods Management - Admin Only"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         # Main container
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
@@ -6983,7 +7153,7 @@ class AarambhaPMS(ctk.CTk):
                 if category_var.get() != "All":
                     params['category'] = category_var.get()
                 
-                resp = requests.get(f"{API_BASE}/payment-methods", headers=headers, params=params)
+                resp = self.api.get("/payment-methods", headers=headers, params=params)
                 if resp.status_code == 200:
                     methods = resp.json()
                     
@@ -7026,7 +7196,7 @@ class AarambhaPMS(ctk.CTk):
                         def toggle_status(mid, current):
                             new_status = 'Inactive' if current == 'Active' else 'Active'
                             try:
-                                resp = requests.put(f"{API_BASE}/payment-methods/{mid}",
+                                resp = self.api.put(f"/payment-methods/{mid}",
                                                    json={'status': new_status}, headers=headers)
                                 if resp.status_code == 200:
                                     load_methods()
@@ -7169,7 +7339,7 @@ class AarambhaPMS(ctk.CTk):
             
             try:
                 headers = {"Authorization": f"Bearer {self.token}"}
-                resp = requests.post(f"{API_BASE}/payment-methods", json=payload, headers=headers)
+                resp = self.api.post("/payment-methods", json=payload, headers=headers)
                 
                 if resp.status_code == 201:
                     method_id = resp.json().get('id')
@@ -7178,7 +7348,7 @@ class AarambhaPMS(ctk.CTk):
                     if cat == "DIGITAL" and qr_file['path']:
                         with open(qr_file['path'], 'rb') as f:
                             files = {'qr_image': f}
-                            qr_resp = requests.post(f"{API_BASE}/payment-methods/{method_id}/upload-qr",
+                            qr_resp = self.api.post(f"/payment-methods/{method_id}/upload-qr",
                                                    files=files, headers=headers)
                             if qr_resp.status_code != 200:
                                 messagebox.showwarning("Warning", "Method created but QR upload failed")
@@ -7221,7 +7391,7 @@ class AarambhaPMS(ctk.CTk):
         # Load existing QR
         try:
             headers = {"Authorization": f"Bearer {self.token}"}
-            resp = requests.get(f"{API_BASE}/payment-methods/{method['id']}/qr", headers=headers)
+            resp = self.api.get(f"/payment-methods/{method['id']}/qr", headers=headers)
             if resp.status_code == 200:
                 import base64, io
                 from PIL import Image, ImageTk
@@ -7277,9 +7447,10 @@ class AarambhaPMS(ctk.CTk):
                 headers = {"Authorization": f"Bearer {self.token}"}
                 with open(selected_file['path'], 'rb') as f:
                     files = {'qr_image': f}
-                    resp = requests.post(f"{API_BASE}/payment-methods/{method['id']}/upload-qr",
+                    resp = self.api.post(f"/payment-methods/{method['id']}/upload-qr",
                                         files=files, headers=headers)
                 if resp.status_code == 200:
+                    self.qr_cache.invalidate(method['id'])
                     messagebox.showinfo("Success", "QR updated successfully")
                     dialog.destroy()
                     self.show_payment_methods() # Refresh list
@@ -7293,8 +7464,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_bill_designer(self):
         """Bill Designer (Admin Only)"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -7317,8 +7487,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_pharmacy_reports(self):
         """Pharmacy Reports Module"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -7339,7 +7508,7 @@ class AarambhaPMS(ctk.CTk):
         # Type
         ctk.CTkLabel(controls, text="Report Type:").pack(side="left", padx=(15, 5), pady=15)
         type_var = StringVar(value="Sales Summary")
-        ctk.CTkOptionMenu(controls, variable=type_var, values=["Sales Summary", "Invoice Wise", "Item Wise"]).pack(side="left", padx=5)
+        ctk.CTkOptionMenu(controls, variable=type_var, values=["Sales Summary", "Invoice Wise", "Item Wise", "Payment Mode", "Cashier"]).pack(side="left", padx=5)
         
         # Dates
         ctk.CTkLabel(controls, text="From (BS):").pack(side="left", padx=(15, 5))
@@ -7353,92 +7522,114 @@ class AarambhaPMS(ctk.CTk):
         end_entry.insert(0, DateUtils.get_current_bs_date_str())
         
         # Results Area
-        res_frame = ctk.CTkScrollableFrame(content, fg_color=("#ffffff", "#1e293b"))
+        res_frame = ctk.CTkFrame(content, fg_color=("#ffffff", "#1e293b"))
         res_frame.pack(fill="both", expand=True)
         
+        report_columns = {
+            # Columns: Date, Count, Total Sales, Net (VAT Removed)
+            "Sales Summary": [
+                Column("Date", 100, lambda r: DateUtils.ad_to_bs(r.get('date', '')[:10]), sort_key=lambda r: r.get('date', '')),
+                Column("Bill Count", 80, lambda r: r.get('count', 0)),
+                Column("Total Sales", 100, lambda r: f"{float(r.get('total_sales', 0)):,.2f}"),
+                Column("Net Sales", 100, lambda r: f"{float(r.get('total_sales', 0)):,.2f}"),
+            ],
+            "Invoice Wise": [
+                Column("Invoice No", 120, "bill_number"),
+                Column("Date", 100, lambda r: DateUtils.ad_to_bs(r['created_at'][:10]), sort_key=lambda r: r['created_at']),
+                Column("Customer", 150, "customer_name"),
+                Column("Amount", 100, lambda r: f"{float(r['amount']):,.2f}"),
+            ],
+            "Item Wise": [
+                Column("Product", 200, "name"),
+                Column("Batch", 100, "batch_number"),
+                Column("Qty Sold", 80, "qty"),
+                Column("Revenue", 100, lambda r: f"{float(r['total_amount']):,.2f}"),
+            ],
+            "Payment Mode": [
+                Column("Payment Mode", 150, "payment_category"),
+                Column("Bill Count", 80, "count"),
+                Column("Total Sales", 100, lambda r: f"{float(r['total_sales']):,.2f}"),
+            ],
+            "Cashier": [
+                Column("Cashier", 150, "cashier_name"),
+                Column("Bill Count", 80, "count"),
+                Column("Total Sales", 100, lambda r: f"{float(r['total_sales']):,.2f}"),
+            ],
+        }
+        
+        def fetch_report(rtype, s_date, e_date):
+            # Only sales newer than the local copy are downloaded; the report is computed locally
+            store = self.get_report_store()
+            store.sync(self.fetch_report_page)
+            if rtype == "Sales Summary":
+                data = store.sales_summary(s_date, e_date)
+            elif rtype == "Invoice Wise":
+                data = store.invoices(s_date, e_date)
+            elif rtype == "Item Wise":
+                data = store.items(s_date, e_date)
+            else:
+                data = store.breakdown("payment_category" if rtype == "Payment Mode" else "cashier_name", s_date, e_date)
+            return rtype, data
+
+        def render_report(result):
+            rtype, data = result
+            for w in res_frame.winfo_children(): w.destroy()
+            
+            try:
+                table = VirtualTable(res_frame, columns=report_columns[rtype], rows=data)
+                table.pack(fill="both", expand=True, padx=5, pady=5)
+            except Exception as e:
+                ctk.CTkLabel(res_frame, text=f"Error: {e}").pack()
+
+        def show_report_error(e):
+            for w in res_frame.winfo_children(): w.destroy()
+            ctk.CTkLabel(res_frame, text=f"Error: {e}").pack()
+
         def generate():
             # Clear
             for w in res_frame.winfo_children(): w.destroy()
+            ctk.CTkLabel(res_frame, text="Generating report...", text_color="gray").pack(pady=20)
             
             # Convert BS inputs to AD for Backend
-            s_bs = start_entry.get().strip()
-            e_bs = end_entry.get().strip()
-            s_date = DateUtils.bs_to_ad(s_bs)
-            e_date = DateUtils.bs_to_ad(e_bs)
+            s_date = DateUtils.bs_to_ad(start_entry.get().strip())
+            e_date = DateUtils.bs_to_ad(end_entry.get().strip())
             
-            rtype = type_var.get()
-            
-            headers = {"Authorization": f"Bearer {self.token}"} 
-            
-            try:
-                data = []
-                if rtype == "Sales Summary":
-                    r = requests.get(f"{API_BASE}/reports/sales?type=summary&start_date={s_date}&end_date={e_date}", headers=headers)
-                    if r.status_code == 200:
-                        data = r.json()
-                        # Columns: Date, Count, Total Sales, Net (VAT Removed)
-                        cols = [("Date", 100), ("Bill Count", 80), ("Total Sales", 100), ("Net Sales", 100)]
-                        
-                        # Render Header
-                        h_row = ctk.CTkFrame(res_frame)
-                        h_row.pack(fill="x", pady=2)
-                        for t,w in cols: ctk.CTkLabel(h_row, text=t, width=w, font=("Segoe UI Bold", 11)).pack(side="left")
-                        
-                        # Render Data
-                        for row in data:
-                            r_row = ctk.CTkFrame(res_frame, fg_color="transparent")
-                            r_row.pack(fill="x", pady=2)
-                            
-                            # Row Data
-                            dt_ad = row.get('date', '')[:10]
-                            dt_bs = DateUtils.ad_to_bs(dt_ad)
-                            cnt = row.get('count', 0)
-                            sales = float(row.get('total_sales', 0))
-                            
-                            vals = [dt_bs, str(cnt), f"{sales:,.2f}", f"{sales:,.2f}"]
-                            for (t,w), v in zip(cols, vals):
-                                ctk.CTkLabel(r_row, text=v, width=w).pack(side="left")
-                                
-                elif rtype == "Invoice Wise":
-                    r = requests.get(f"{API_BASE}/reports/sales?type=invoice&start_date={s_date}&end_date={e_date}", headers=headers)
-                    if r.status_code == 200:
-                        data = r.json()
-                        cols = [("Invoice No", 120), ("Date", 100), ("Customer", 150), ("Amount", 100)]
-                        h_row = ctk.CTkFrame(res_frame); h_row.pack(fill="x")
-                        for t,w in cols: ctk.CTkLabel(h_row, text=t, width=w, font=("Segoe UI Bold", 11)).pack(side="left")
-                        
-                        for row in data:
-                            r_row = ctk.CTkFrame(res_frame, fg_color="transparent"); r_row.pack(fill="x", pady=2)
-                            
-                            bs_date = DateUtils.ad_to_bs(row['created_at'][:10])
-                            
-                            vals = [row['bill_number'], bs_date, row.get('customer_name') or '-', f"{float(row['amount']):,.2f}"]
-                            for (t,w), v in zip(cols, vals): ctk.CTkLabel(r_row, text=v, width=w).pack(side="left")
-
-                elif rtype == "Item Wise":
-                    r = requests.get(f"{API_BASE}/reports/items?start_date={s_date}&end_date={e_date}", headers=headers)
-                    if r.status_code == 200:
-                        data = r.json()
-                        cols = [("Product", 200), ("Batch", 100), ("Qty Sold", 80), ("Revenue", 100)]
-                        h_row = ctk.CTkFrame(res_frame); h_row.pack(fill="x")
-                        for t,w in cols: ctk.CTkLabel(h_row, text=t, width=w, font=("Segoe UI Bold", 11)).pack(side="left")
-                        
-                        for row in data:
-                            r_row = ctk.CTkFrame(res_frame, fg_color="transparent"); r_row.pack(fill="x", pady=2)
-                            vals = [row['name'], row['batch_number'], str(row['qty']), f"{float(row['total_amount']):,.2f}"]
-                            for (t,w), v in zip(cols, vals): ctk.CTkLabel(r_row, text=v, width=w).pack(side="left")
-
-                if not data:
-                    ctk.CTkLabel(res_frame, text="No records found").pack(pady=20)
-                    
-            except Exception as e:
-                ctk.CTkLabel(res_frame, text=f"Error: {e}").pack()
+            self.tasks.submit(fetch_report, type_var.get(), s_date, e_date,
+                              on_success=render_report, on_error=show_report_error,
+                              key="pharmacy_report", owner=res_frame)
+        
+        def rebuild():
+            if not messagebox.askyesno("Rebuild Report Cache", "Download the full sales history again?"):
+                return
+            # On a worker: reset waits for a sync that is already running
+            self.tasks.submit(self.get_report_store().reset, on_success=lambda _: generate(),
+                              on_error=show_report_error, key="report_rebuild", owner=res_frame)
         
         ctk.CTkButton(controls, text="Generate View", command=generate, width=150, fg_color="#3b82f6").pack(side="left", padx=20)
+        ctk.CTkButton(controls, text="⟳ Rebuild Cache", command=rebuild, width=120, fg_color="#64748b").pack(side="left", padx=5)
+    
+    def get_report_store(self):
+        """Local report database for the logged-in pharmacy (one file per client)"""
+        client_id = self.user.get('client_id') or 0
+        cached = getattr(self, '_report_store', None)
+        if cached and cached[0] == client_id:
+            return cached[1]
+        if cached:
+            cached[1].close()
+        store = ReportStore(os.path.join(os.path.expanduser("~"), f".aarambha_reports_{client_id}.db"))
+        self._report_store = (client_id, store)
+        return store
+    
+    def fetch_report_page(self, since_id, limit):
+        """One /reports/sync page for ReportStore.sync (worker thread)"""
+        r = self.api.get("/reports/sync", params={"since_id": since_id, "limit": limit})
+        if r.status_code != 200:
+            raise Exception(f"Report sync failed (HTTP {r.status_code})")
+        return r.json()
         
     def show_pdf_tools(self):
         """PDF Invoice Extractor UI"""
-        for widget in self.root.winfo_children(): widget.destroy()
+        self.screens.clear()
         
         container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         container.pack(fill="both", expand=True)
@@ -7456,19 +7647,9 @@ class AarambhaPMS(ctk.CTk):
         
         ctk.CTkLabel(up_frame, text="Select A4 Invoice PDF:").pack(side="left", padx=20, pady=20)
         
-        self.extracted_data = None
+        self.extracted_data = []  # [(path, result)] from the last single-file or folder run
         
-        def upload_and_process():
-            from tkinter import filedialog
-            from .pdf_extractor import InvoiceExtractor
-            
-            fp = filedialog.askopenfilename(filetypes=[("PDF Files", "*.pdf")])
-            if not fp: return
-            
-            ext = InvoiceExtractor(fp)
-            data = ext.extract()
-            self.extracted_data = data
-            
+        def show_result(data):
             # Show Results
             for w in res_area.winfo_children(): w.destroy()
             
@@ -7482,7 +7663,7 @@ class AarambhaPMS(ctk.CTk):
             
             tk_color = "green" if data.get('template') == "AARAMBHA_A4_V1" else "orange"
             ctk.CTkLabel(info, text=f"Template: {data.get('template')}", text_color=tk_color, font=("Segoe UI Bold", 14)).pack(anchor="w")
-            ctk.CTkLabel(info, text=f"Invoice: {data.get('invoice_no')} | Date: {data.get('date')}").pack(anchor="w")
+            ctk.CTkLabel(info, text=f"Invoice: {data.get('invoice_no')} | Date: {data.get('date')} | Pages: {data.get('pages', 1)}").pack(anchor="w")
             
             if data.get('warning'):
                 ctk.CTkLabel(info, text=f"Warning: {data['warning']}", text_color="orange").pack(anchor="w")
@@ -7501,32 +7682,109 @@ class AarambhaPMS(ctk.CTk):
                         ctk.CTkLabel(r_row, text=str(val), width=80).pack(side="left")
             else:
                 ctk.CTkLabel(res_area, text="No items extracted.").pack()
-                
-            btn_export.configure(state="normal")
+        
+        def upload_and_process():
+            from tkinter import filedialog
+            
+            fp = filedialog.askopenfilename(filetypes=[("PDF Files", "*.pdf")])
+            if not fp: return
+            
+            def extract():
+                from pdf_extractor import InvoiceExtractor
+                return InvoiceExtractor(fp).extract()
+            
+            def done(data):
+                status_lbl.configure(text="")
+                self.extracted_data = [(fp, data)]
+                show_result(data)
+                btn_export.configure(state="disabled" if "error" in data else "normal")
+                btn_grn.configure(state="normal" if data.get('items') else "disabled")
+            
+            status_lbl.configure(text=f"Extracting {os.path.basename(fp)}...")
+            self.tasks.submit(extract, on_success=done,
+                              on_error=lambda e: messagebox.showerror("Error", str(e)),
+                              key="pdf_extract", owner=res_area)
+        
+        def process_folder():
+            from tkinter import filedialog
+            
+            folder = filedialog.askdirectory(title="Select folder of invoice PDFs")
+            if not folder: return
+            
+            def run(progress):
+                # Results stream in from the process pool as each file finishes
+                from pdf_extractor import extract_folder
+                results = extract_folder(folder)
+                try:
+                    for result in results:
+                        progress(result)
+                        if progress.cancelled: break
+                finally:
+                    results.close()
+            
+            def on_result(result):
+                path, data = result
+                self.extracted_data.append(result)
+                ok = "error" not in data
+                line = ctk.CTkFrame(res_area, fg_color="transparent")
+                line.pack(fill="x", pady=2)
+                ctk.CTkLabel(line, text=os.path.basename(path), width=220, anchor="w").pack(side="left", padx=5)
+                ctk.CTkLabel(line, text=data.get('invoice_no', '-') if ok else "Error", width=140,
+                             text_color=None if ok else "red").pack(side="left")
+                ctk.CTkLabel(line, text=f"{len(data.get('items', []))} items" if ok else data['error'][:60],
+                             anchor="w").pack(side="left", padx=5)
+                status_lbl.configure(text=f"Extracted {len(self.extracted_data)} files...")
+            
+            def done(_):
+                n = len(self.extracted_data)
+                status_lbl.configure(text=f"Extracted {n} files")
+                btn_export.configure(state="normal" if n else "disabled")
+            
+            for w in res_area.winfo_children(): w.destroy()
+            self.extracted_data = []
+            btn_export.configure(state="disabled")
+            btn_grn.configure(state="disabled")
+            status_lbl.configure(text="Extracting folder...")
+            self.tasks.submit(run, on_progress=on_result, on_success=done,
+                              on_error=lambda e: messagebox.showerror("Error", str(e)),
+                              key="pdf_extract", owner=res_area)
 
         ctk.CTkButton(up_frame, text="📂 Upload & Extract", command=upload_and_process).pack(side="left", padx=20)
+        ctk.CTkButton(up_frame, text="📁 Extract Folder", command=process_folder, fg_color="#6366f1").pack(side="left")
+        status_lbl = ctk.CTkLabel(up_frame, text="", text_color="gray")
+        status_lbl.pack(side="left", padx=20)
         
         btn_export = ctk.CTkButton(up_frame, text="💾 Export Excel", state="disabled", fg_color="#10b981")
         btn_export.pack(side="right", padx=20)
         
+        def import_to_grn():
+            self.pending_grn_import = self.extracted_data[0][1]
+            self.show_purchase_entry()
+        
+        btn_grn = ctk.CTkButton(up_frame, text="➡ Import to GRN", state="disabled", fg_color="#6366f1", command=import_to_grn)
+        btn_grn.pack(side="right")
+        
         def export_excel():
-             if not self.extracted_data: return
+             results = [(p, d) for p, d in self.extracted_data if "error" not in d]
+             if not results: return
              try:
                  import openpyxl
                  wb = openpyxl.Workbook()
                  ws = wb.active
                  ws.title = "Summary"
-                 ws.append(["Invoice No", "Date", "Template"])
-                 ws.append([self.extracted_data.get('invoice_no'), self.extracted_data.get('date'), self.extracted_data.get('template')])
+                 ws.append(["Invoice No", "Date", "Template", "File"])
+                 for path, data in results:
+                     ws.append([data.get('invoice_no'), data.get('date'), data.get('template'), os.path.basename(path)])
                  
                  ws2 = wb.create_sheet("Items")
-                 ws2.append(["SN", "Product", "Batch", "Exp", "Qty", "Rate", "Amount"])
-                 for row in self.extracted_data.get('items', []):
-                     ws2.append(row)
+                 ws2.append(["Invoice No", "SN", "Product", "Batch", "Exp", "Qty", "Rate", "Amount"])
+                 for _, data in results:
+                     for row in data.get('items', []):
+                         ws2.append([data.get('invoice_no')] + list(row))
                  
-                 fn = f"EXTRACT_{self.extracted_data.get('invoice_no')}_{datetime.now().strftime('%Y%m%d')}.xlsx"
+                 tag = results[0][1].get('invoice_no') if len(results) == 1 else f"BATCH_{len(results)}"
+                 fn = f"EXTRACT_{tag}_{datetime.now().strftime('%Y%m%d')}.xlsx"
                  wb.save(fn)
-                 import os
                  os.startfile(os.path.abspath(fn))
                  messagebox.showinfo("Success", f"Exported to {fn}")
              except Exception as e:
@@ -7540,7 +7798,7 @@ class AarambhaPMS(ctk.CTk):
         
     def show_bill_log(self):
         """Show Bill Log / Invoice History"""
-        for widget in self.root.winfo_children(): widget.destroy()
+        self.screens.clear()
         
         container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         container.pack(fill="both", expand=True)
@@ -7569,9 +7827,69 @@ class AarambhaPMS(ctk.CTk):
         ctk.CTkOptionMenu(flt_frame, variable=period_var, values=["Today", "Yesterday", "Last 7 Days", "All Time"], width=120).pack(side="left", padx=5)
 
         # 2. Results Grid
-        res_frame = ctk.CTkScrollableFrame(content, fg_color="transparent")
+        count_lbl = ctk.CTkLabel(content, text="", font=("Segoe UI", 12), text_color="gray")
+        count_lbl.pack(anchor="w", padx=10)
+        
+        res_frame = ctk.CTkFrame(content, fg_color="transparent")
         res_frame.pack(fill="both", expand=True)
         
+        def bill_color(row):
+            # Check for cancelled
+            return "red" if row.get('status', 'completed') == 'cancelled' else None
+        
+        bill_table = VirtualTable(res_frame, columns=[
+            Column("Invoice No", 100, "bill_number"),
+            Column("Date", 150, lambda r: DateUtils.ad_to_bs(r['created_at'].split('T')[0]), sort_key=lambda r: r['created_at']),
+            Column("Customer", 150, lambda r: f"{r.get('customer_name') or 'Walk-in'}\n{r.get('customer_contact') or ''}"),
+            Column("Sold By", 120, "sold_by"),
+            Column("Pay Mode", 80, "payment_category"),
+            Column("Amount", 100, lambda r: f"Rs. {float(r['grand_total']):,.2f}"),
+        ], actions=[("View/Reprint", self.show_bill_detail, {"width": 90, "height": 25})],
+            row_height=44, row_color=bill_color, on_scroll_end=lambda: pager.load_more())
+        bill_table.pack(fill="both", expand=True)
+        
+        # Active filters and header count; filters are replaced, never mutated, so a worker reads a consistent set
+        current = {"filters": {}, "total": None}
+        
+        def fetch_bills(filters, cursor, limit):
+            params = dict(filters, limit=limit)
+            if cursor: params["cursor"] = cursor
+            r = self.api.get("/sales/log", params=params)
+            if r.status_code != 200:
+                raise Exception(f"Failed to fetch logs: {r.text}")
+            data = r.json()
+            if isinstance(data, list): # Backend without paging support: one capped page
+                return data, None
+            return data["rows"], data.get("next_cursor")
+        
+        def fetch_page(cursor, limit):
+            return fetch_bills(current["filters"], cursor, limit)
+        
+        def fetch_count(filters):
+            r = self.api.get("/sales/log/count", params=filters)
+            return r.json().get("total") if r.status_code == 200 else None
+        
+        def update_count_label():
+            shown = len(bill_table.model)
+            if current["total"] is None:
+                count_lbl.configure(text=f"Showing {shown:,} bills" + ("" if pager.exhausted else " (scroll for more)"))
+            else:
+                count_lbl.configure(text=f"Showing {shown:,} of {current['total']:,} bills")
+        
+        def on_page(rows, first):
+            if first:
+                bill_table.set_rows(rows)
+            else:
+                bill_table.append_rows(rows)
+            update_count_label()
+        
+        def on_count(total):
+            current["total"] = total
+            update_count_label()
+        
+        pager = CursorPager(self.tasks, fetch_page, on_page, key="bill_log", owner=res_frame, page_size=100,
+                            on_error=lambda e: messagebox.showerror("Error", str(e)))
+        
         def load_bills():
             # Calculate dates
             import datetime
@@ -7589,59 +7907,99 @@ class AarambhaPMS(ctk.CTk):
                 s_date = ""
                 e_date = ""
             
-            headers = {"Authorization": f"Bearer {self.token}"}
-            url = f"{self.API_BASE}/sales/log?search={search_var.get()}&payment_method={pay_var.get()}"
-            if s_date: url += f"&start_date={s_date}&end_date={e_date}"
-            
-            try:
-                r = requests.get(url, headers=headers)
-                if r.status_code == 200:
-                    data = r.json()
-                    render_table(data)
-                else:
-                    messagebox.showerror("Error", f"Failed to fetch logs: {r.text}")
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
-
-        def render_table(rows):
-            for w in res_frame.winfo_children(): w.destroy()
-            
-            # Header
-            cols = [("Invoice No", 100), ("Date", 150), ("Customer", 150), ("Sold By", 120), ("Pay Mode", 80), ("Amount", 100), ("Actions", 100)]
-            h_frm = ctk.CTkFrame(res_frame, fg_color=("#e2e8f0", "#334155"))
-            h_frm.pack(fill="x", pady=2)
-            for t, w in cols: ctk.CTkLabel(h_frm, text=t, width=w, font=("Segoe UI Bold", 11)).pack(side="left", padx=2)
-            
-            # Rows
-            for row in rows:
-                r_frm = ctk.CTkFrame(res_frame, fg_color="transparent")
-                r_frm.pack(fill="x", pady=2)
-                
-                vals = [
-                    row['bill_number'], 
-                    DateUtils.ad_to_bs(row['created_at'].split('T')[0]),
-                    f"{row.get('customer_name') or 'Walk-in'}\n{row.get('customer_contact') or ''}",
-                    row.get('sold_by', '-'),
-                    row['payment_category'],
-                    f"Rs. {float(row['grand_total']):,.2f}"
-                ]
-                
-                # Check for cancelled
-                status = row.get('status', 'completed')
-                fg = "red" if status == 'cancelled' else ("#000" if ctk.get_appearance_mode()=="Light" else "#fff")
-                
-                for (t,w), v in zip(cols[:-1], vals):
-                    ctk.CTkLabel(r_frm, text=v, width=w, text_color=fg).pack(side="left", padx=2)
-                
-                # Action Button
-                ctk.CTkButton(r_frm, text="View/Reprint", width=90, height=25, 
-                              command=lambda r=row: self.show_bill_detail(r)).pack(side="left", padx=5)
+            filters = {"search": search_var.get(), "payment_method": pay_var.get()}
+            if s_date: filters.update({"start_date": str(s_date), "end_date": str(e_date)})
+            current["filters"] = filters
+            
+            # First page only; later pages are fetched as the table nears its end
+            pager.reset()
+            pager.load_more()
+            
+            current["total"] = None
+            count_lbl.configure(text="Loading...")
+            self.tasks.submit(fetch_count, filters, on_success=on_count, on_error=lambda e: None,
+                              key="bill_log_count", owner=count_lbl)
+
+        def export_pdfs():
+            if export_btn.cget("text") != "📦 Export PDFs":
+                self.tasks.cancel("bill_pdf_export")
+                return finish_export(None)
+            out_dir = filedialog.askdirectory(title="Export invoices to folder")
+            if not out_dir: return
+            filters, total = current["filters"], current["total"]
+            
+            def bills():
+                # Every bill matching the filters, fetched one page at a time while the pool renders
+                cursor = None
+                while True:
+                    rows, cursor = fetch_bills(filters, cursor, 200)
+                    for row in rows:
+                        r = self.api.get(f"/sales/{row['id']}")
+                        if r.status_code == 200:
+                            yield self.bill_print_data(r.json())
+                    if cursor is None: break
+            
+            def run(progress):
+                from pdf_generator import generate_invoices
+                return generate_invoices(bills(), out_dir, progress=progress)
+            
+            def on_progress(p):
+                done, _, _, _ = p
+                count_lbl.configure(text=f"Exporting PDFs... {done:,}" + (f" / {total:,}" if total else ""))
+            
+            export_btn.configure(text="✖ Cancel Export", fg_color="#ef4444")
+            self.tasks.submit(run, on_progress=on_progress, on_success=finish_export,
+                              on_error=lambda e: finish_export(None, e),
+                              key="bill_pdf_export", owner=count_lbl)
+        
+        def finish_export(result, error=None):
+            export_btn.configure(text="📦 Export PDFs", fg_color="#475569")
+            update_count_label()
+            if error is not None:
+                messagebox.showerror("Error", f"PDF export failed: {error}")
+            elif result is not None:
+                written, failed = result
+                msg = f"Exported {len(written):,} invoices."
+                if failed: msg += f"\n{len(failed):,} failed (first: {failed[0][1]})"
+                messagebox.showinfo("Export Complete", msg)
 
         ctk.CTkButton(flt_frame, text="🔍 Search", command=load_bills, width=100).pack(side="left", padx=20)
+        export_btn = ctk.CTkButton(flt_frame, text="📦 Export PDFs", command=export_pdfs, width=120, fg_color="#475569")
+        export_btn.pack(side="left", padx=(0, 20))
         
         # Initial Load
         load_bills()
 
+    def bill_print_data(self, data):
+        """Invoice PDF data for a bill from /sales/:id (reprints and batch export)"""
+        return {
+            "bill_number": data['bill_number'],
+            "created_at": DateUtils.ad_to_bs(data['created_at'].split('T')[0]),
+            "customer_name": data.get('customer_name'),
+            "customer_contact": data.get('customer_contact'),
+            "customer_address": data.get('customer_address'), # May not be in DB unless we added it
+            "payment_category": data['payment_category'],
+            "sold_by": data.get('sold_by', 'Admin'),
+            "grand_total": data['grand_total'],
+            "discount_amount": data.get('discount_amount', 0),
+            "items": data.get('items', []),
+            "pharmacy_name": data.get('pharmacy_name'),
+            "pharmacy_address": data.get('pharmacy_address'),
+            "pharmacy_contact": data.get('pharmacy_contact'),
+            "pan_number": data.get('pan_number')
+        }
+
+    def print_invoice_async(self, p_data, fname, on_error=None):
+        """Write an invoice PDF on a worker and open it when it is ready"""
+        def write():
+            from pdf_generator import generate_invoice
+            os.makedirs(os.path.dirname(fname) or ".", exist_ok=True)
+            return generate_invoice(p_data, fname)
+        
+        # Persistent: the screen usually resets right after, which must not drop the print
+        self.tasks.submit(write, on_success=lambda path: os.startfile(os.path.abspath(path)),
+                          on_error=on_error, persistent=True)
+
     def show_bill_detail(self, bill_row):
         """Detail Modal for Bill"""
         top = ctk.CTkToplevel(self.root)
@@ -7652,14 +8010,17 @@ class AarambhaPMS(ctk.CTk):
         lbl_load = ctk.CTkLabel(top, text="Fetching details...", font=("Segoe UI", 16))
         lbl_load.pack(pady=20)
         
-        try:
+        def fetch():
             headers = {"Authorization": f"Bearer {self.token}"}
-            r = requests.get(f"{self.API_BASE}/sales/{bill_row['id']}", headers=headers)
+            r = self.api.get(f"/sales/{bill_row['id']}", headers=headers)
             if r.status_code != 200:
-                lbl_load.configure(text=f"Error: {r.text}", text_color="red")
-                return
-            
-            data = r.json()
+                raise Exception(r.text)
+            return r.json()
+        
+        def show_error(e):
+            lbl_load.configure(text=f"Error: {e}", text_color="red")
+        
+        def render(data):
             lbl_load.destroy()
             
             # --- UI Layout ---
@@ -7668,34 +8029,9 @@ class AarambhaPMS(ctk.CTk):
             act_frm.pack(fill="x", padx=20, pady=10)
             
             def reprint_bill():
-                try:
-                    from .pdf_generator import generate_invoice
-                    import os
-                    if not os.path.exists("invoices"): os.makedirs("invoices")
-                    fname = f"invoices/REPRINT_{data['bill_number']}.pdf"
-                    
-                    # Prepare Data
-                    p_data = {
-                        "bill_number": data['bill_number'],
-                        "created_at": DateUtils.ad_to_bs(data['created_at'].split('T')[0]),
-                        "customer_name": data.get('customer_name'),
-                        "customer_contact": data.get('customer_contact'),
-                        "customer_address": data.get('customer_address'), # May not be in DB unless we added it
-                        "payment_category": data['payment_category'],
-                        "sold_by": data.get('sold_by', 'Admin'),
-                        "grand_total": data['grand_total'],
-                        "discount_amount": data.get('discount_amount', 0),
-                        "items": data.get('items', []),
-                        "pharmacy_name": data.get('pharmacy_name'),
-                        "pharmacy_address": data.get('pharmacy_address'),
-                        "pharmacy_contact": data.get('pharmacy_contact'),
-                        "pan_number": data.get('pan_number')
-                    }
-                    
-                    generate_invoice(p_data, fname)
-                    os.startfile(os.path.abspath(fname))
-                except Exception as e:
-                    messagebox.showerror("Error", f"Reprint Failed: {e}")
+                fname = f"invoices/REPRINT_{data['bill_number']}.pdf"
+                self.print_invoice_async(self.bill_print_data(data), fname,
+                                         on_error=lambda e: messagebox.showerror("Error", f"Reprint Failed: {e}"))
 
             ctk.CTkButton(act_frm, text="🖨️ Reprint (A4)", command=reprint_bill, width=120).pack(side="right")
             
@@ -7731,8 +8067,7 @@ class AarambhaPMS(ctk.CTk):
             ctk.CTkLabel(info, text=f"Grand Total: Rs. {float(data['grand_total']):,.2f}", font=("Arial", 14, "bold"), text_color="black").pack(anchor="e", padx=20)
             ctk.CTkLabel(info, text="* VAT Exempted Goods (Medicine)", font=("Arial", 10, "italic"), text_color="black").pack(pady=10)
 
-        except Exception as e:
-            lbl_load.configure(text=f"Error: {e}", text_color="red")
+        self.tasks.submit(fetch, on_success=render, on_error=show_error, owner=top)
 
 
         
@@ -7745,8 +8080,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_low_stock_alerts(self):
         """Low Stock Alerts Page - View all low stock items with SMS buttons"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -7764,7 +8098,7 @@ class AarambhaPMS(ctk.CTk):
         def load_alerts():
             try:
                 headers = {"Authorization": f"Bearer {self.token}"}
-                r = requests.get(f"{API_BASE}/dashboard/alerts", headers=headers)
+                r = self.api.get("/dashboard/alerts", headers=headers)
                 if r.status_code == 200:
                     data = r.json()
                     display_alerts(data.get('lowStock', []))
@@ -7843,7 +8177,7 @@ class AarambhaPMS(ctk.CTk):
                 
                 payload = {'type': alert_type, 'productData': productData, 'toNumber': phone}
                 headers = {"Authorization": f"Bearer {self.token}"}
-                r = requests.post(f"{API_BASE}/sms/send-alert", json=payload, headers=headers)
+                r = self.api.post("/sms/send-alert", json=payload, headers=headers)
                 
                 if r.status_code == 200:
                     messagebox.showinfo("Success", "SMS sent!")
@@ -7862,8 +8196,7 @@ class AarambhaPMS(ctk.CTk):
     
     def show_expiry_alerts(self):
         """Expiry Alerts Page - View all expiring items with SMS buttons"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -7881,7 +8214,7 @@ class AarambhaPMS(ctk.CTk):
         def load_alerts():
             try:
                 headers = {"Authorization": f"Bearer {self.token}"}
-                r = requests.get(f"{API_BASE}/dashboard/alerts", headers=headers)
+                r = self.api.get("/dashboard/alerts", headers=headers)
                 if r.status_code == 200:
                     data = r.json()
                     display_alerts(data.get('expiry', []))
@@ -7956,7 +8289,7 @@ class AarambhaPMS(ctk.CTk):
                 
                 payload = {'type': alert_type, 'productData': productData, 'toNumber': phone}
                 headers = {"Authorization": f"Bearer {self.token}"}
-                r = requests.post(f"{API_BASE}/sms/send-alert", json=payload, headers=headers)
+                r = self.api.post("/sms/send-alert", json=payload, headers=headers)
                 
                 if r.status_code == 200:
                     messagebox.showinfo("Success", "SMS sent!")
@@ -7975,8 +8308,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_customer_management(self):
         """Customer Management - Simple CRM (NO SMS)"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -8008,7 +8340,7 @@ class AarambhaPMS(ctk.CTk):
             try:
                 headers = {"Authorization": f"Bearer {self.token}"}
                 params = {'search': search_var.get()} if search_var.get() else {}
-                r = requests.get(f"{API_BASE}/customers", headers=headers, params=params)
+                r = self.api.get("/customers", headers=headers, params=params)
                 if r.status_code == 200:
                     display_customers(r.json())
             except Exception as e:
@@ -8120,7 +8452,7 @@ class AarambhaPMS(ctk.CTk):
                     'address': address_var.get().strip() or None,
                     'notes': notes_var.get().strip() or None
                 }
-                r = requests.post(f"{API_BASE}/customers", json=data, headers=headers)
+                r = self.api.post("/customers", json=data, headers=headers)
                 if r.status_code == 200:
                     messagebox.showinfo("Success", "Customer added successfully!", parent=dialog)
                     dialog.destroy()
@@ -8185,7 +8517,7 @@ class AarambhaPMS(ctk.CTk):
                     'notes': notes_var.get() or None,
                     'status': 'active'
                 }
-                r = requests.put(f"{API_BASE}/customers/{customer['id']}", json=data, headers=headers)
+                r = self.api.put(f"/customers/{customer['id']}", json=data, headers=headers)
                 if r.status_code == 200:
                     messagebox.showinfo("Success", "Customer updated!")
                     dialog.destroy()
@@ -8200,8 +8532,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_notification_management(self):
         """Admin - Notification Management"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -8225,7 +8556,7 @@ class AarambhaPMS(ctk.CTk):
             try:
                 headers = {"Authorization": f"Bearer {self.token}"}
                 params = {'status': status_var.get()}
-                r = requests.get(f"{API_BASE}/notifications/admin", headers=headers, params=params)
+                r = self.api.get("/notifications/admin", headers=headers, params=params)
                 if r.status_code == 200:
                     display_notifs(r.json())
             except Exception as e:
@@ -8312,7 +8643,7 @@ class AarambhaPMS(ctk.CTk):
         cashier_checkboxes = []
         try:
             headers = {"Authorization": f"Bearer {self.token}"}
-            r = requests.get(f"{API_BASE}/users/cashiers", headers=headers)
+            r = self.api.get("/users/cashiers", headers=headers)
             if r.status_code == 200:
                 cashiers = r.json()
                 for cashier in cashiers:
@@ -8363,7 +8694,7 @@ class AarambhaPMS(ctk.CTk):
                     'cashier_ids': cashier_ids
                 }
                 
-                r = requests.post(f"{API_BASE}/notifications", json=data, headers=headers)
+                r = self.api.post("/notifications", json=data, headers=headers)
                 if r.status_code == 200:
                     messagebox.showinfo("Success", "Notification created successfully!", parent=dialog)
                     dialog.destroy()
@@ -8383,8 +8714,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_refund_management(self):
         """Admin - Refund Management"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -8403,7 +8733,7 @@ class AarambhaPMS(ctk.CTk):
             try:
                 headers = {"Authorization": f"Bearer {self.token}"}
                 params = {'status': status_var.get()} if status_var.get() != "ALL" else {}
-                r = requests.get(f"{API_BASE}/refunds", headers=headers, params=params)
+                r = self.api.get("/refunds", headers=headers, params=params)
                 if r.status_code == 200:
                     display_refunds(r.json())
             except Exception as e:
@@ -8474,7 +8804,7 @@ class AarambhaPMS(ctk.CTk):
             
             try:
                 headers = {"Authorization": f"Bearer {self.token}"}
-                r = requests.put(f"{API_BASE}/refunds/{refund_id}/approve", headers=headers)
+                r = self.api.put(f"/refunds/{refund_id}/approve", headers=headers)
                 if r.status_code == 200:
                     messagebox.showinfo("Success", "Refund approved and stock adjusted!")
                     load_refunds()
@@ -8491,7 +8821,7 @@ class AarambhaPMS(ctk.CTk):
             try:
                 headers = {"Authorization": f"Bearer {self.token}"}
                 data = {'admin_remarks': remarks}
-                r = requests.put(f"{API_BASE}/refunds/{refund_id}/reject", json=data, headers=headers)
+                r = self.api.put(f"/refunds/{refund_id}/reject", json=data, headers=headers)
                 if r.status_code == 200:
                     messagebox.showinfo("Success", "Refund rejected")
                     load_refunds()
@@ -8508,8 +8838,7 @@ class AarambhaPMS(ctk.CTk):
 
     def show_profile_management(self):
         """Profile Management for Admin/Super Admin"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.clear()
         
         main_container = ctk.CTkFrame(self.root, fg_color=("#f1f5f9", "#0f172a"))
         main_container.pack(fill="both", expand=True)
@@ -8532,7 +8861,7 @@ class AarambhaPMS(ctk.CTk):
         # Load current profile
         try:
             headers = {"Authorization": f"Bearer {self.token}"}
-            r = requests.get(f"{API_BASE}/profile", headers=headers)
+            r = self.api.get("/profile", headers=headers)
             if r.status_code == 200:
                 profile = r.json()
             else:
@@ -8588,7 +8917,7 @@ class AarambhaPMS(ctk.CTk):
                     
                     # Get current profile to preserve other fields
                     try:
-                        r_profile = requests.get(f"{API_BASE}/profile", headers=headers)
+                        r_profile = self.api.get("/profile", headers=headers)
                         current_profile = r_profile.json() if r_profile.status_code == 200 else {}
                     except:
                         current_profile = {}
@@ -8599,7 +8928,7 @@ class AarambhaPMS(ctk.CTk):
                         'email': current_profile.get('email', email_var.get()),
                         'profile_pic': pic_data
                     }
-                    r = requests.post(f"{API_BASE}/profile", json=data, headers=headers)
+                    r = self.api.post("/profile", json=data, headers=headers)
                     
                     print(f"Response status: {r.status_code}")
                     print(f"Response: {r.text}")
@@ -8648,7 +8977,7 @@ class AarambhaPMS(ctk.CTk):
                     'email': email_var.get(),
                     'profile_pic': profile.get('profile_pic')
                 }
-                r = requests.post(f"{API_BASE}/profile", json=data, headers=headers)
+                r = self.api.post("/profile", json=data, headers=headers)
                 if r.status_code == 200:
                     messagebox.showinfo("Success", "Profile updated successfully!")
                     self.user['name'] = name_var.get().strip()
@@ -8665,6 +8994,9 @@ class AarambhaPMS(ctk.CTk):
         self.root.mainloop()
 
 if __name__ == "__main__":
+    # Required for the invoice process pool in the PyInstaller build
+    import multiprocessing
+    multiprocessing.freeze_support()
     try:
         app = AarambhaPMS()
         app.run()
@@ -0,0 +1,52 @@
+class CursorPager:
+    """Loads a cursor-paginated endpoint one page at a time on the TaskRunner.
+
+    ``fetch_page(cursor, limit)`` runs on a worker thread and returns
+    ``(rows, next_cursor)``; a ``next_cursor`` of None means the last page
+    was reached. ``on_page(rows, first)`` is called on the Tk thread with
+    each page, ``first`` being True for the page after a ``reset()``.
+    ``load_more()`` is cheap to call repeatedly (e.g. from every scroll
+    event): it does nothing while a page is in flight or after the end.
+    """
+
+    def __init__(self, tasks, fetch_page, on_page, key, owner=None, page_size=100, on_error=None):
+        self.tasks = tasks
+        self.fetch_page = fetch_page
+        self.on_page = on_page
+        self.on_error = on_error
+        self.key = key
+        self.owner = owner
+        self.page_size = page_size
+        self.reset()
+
+    def reset(self):
+        """Start again from the first page (e.g. after the filters changed)"""
+        if getattr(self, "loading", False):
+            self.tasks.cancel(self.key)
+        self.cursor = None
+        self.loading = False
+        self.exhausted = False
+        self.loaded = 0
+
+    def load_more(self):
+        if self.loading or self.exhausted:
+            return False
+        self.loading = True
+        first = self.loaded == 0 and self.cursor is None
+
+        def done(result):
+            rows, next_cursor = result
+            self.loading = False
+            self.cursor = next_cursor
+            self.exhausted = next_cursor is None
+            self.loaded += len(rows)
+            self.on_page(rows, first)
+
+        def failed(e):
+            self.loading = False
+            if self.on_error:
+                self.on_error(e)
+
+        self.tasks.submit(self.fetch_page, self.cursor, self.page_size,
+                          on_success=done, on_error=failed, key=self.key, owner=self.owner)
+        return True
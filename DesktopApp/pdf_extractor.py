@@ -1,78 +1,128 @@
 import pdfplumber
 import re
+import os
+import glob
+import multiprocessing
 from datetime import datetime
 
+TEMPLATE_ID = "TEMPLATE_ID:AARAMBHA_A4_V1"
+
+# Items table: from the "SN Product ..." header down to the totals block
+TABLE_HEADER_RE = r"SN\s+Product"
+TABLE_END_RE = r"(Sub\s*Total|Grand\s*Total|Total\s*Amount|Net\s*Amount)"
+
 class InvoiceExtractor:
     def __init__(self, pdf_path):
         self.pdf_path = pdf_path
         self.metadata = {}
         self.items = []
         self.is_valid_template = False
-        
+
     def extract(self):
         try:
             with pdfplumber.open(self.pdf_path) as pdf:
-                page = pdf.pages[0]
-                text = page.extract_text()
-                
+                # Text is extracted once per page and shared by detection, meta and raw_text
+                pages = [(page, page.extract_text() or "") for page in pdf.pages]
+                if not pages:
+                    return {"error": "PDF has no pages"}
+
                 # Check for hidden white text? pdfplumber extracts all text usually
                 # Or check strict strings
-                if "TEMPLATE_ID:AARAMBHA_A4_V1" in text:
+                if TEMPLATE_ID in pages[0][1]:
                     self.is_valid_template = True
-                    return self._extract_template_mode(page)
+                    return self._extract_template_mode(pages)
                 else:
-                    return self._extract_generic_mode(page)
+                    return self._extract_generic_mode(pages)
         except Exception as e:
             return {"error": str(e)}
 
-    def _extract_template_mode(self, page):
-        text = page.extract_text()
-        
-        # 1. Meta
+    def _table_area(self, page):
+        """Crop the page to the items table so table detection skips header/footer text.
+
+        Returns (area, column x positions); the columns come from the
+        "SN Product ..." header words and are None on pages without one.
+        """
+        # page.search reuses the text map built by extract_text, so this is cheap
+        top, bottom, columns = 0, page.height, None
+        header = page.search(TABLE_HEADER_RE)
+        if header:
+            top = header[0]["top"]
+            words = page.crop((0, top, page.width, header[0]["bottom"])).extract_words()
+            columns = [w["x0"] - 1 for w in words] + [page.width]
+        end = [m for m in page.search(TABLE_END_RE) if m["top"] > top]
+        if end:
+            bottom = end[0]["top"]
+        return page.crop((0, top, page.width, bottom)), columns
+
+    def _extract_template_mode(self, pages):
+        text = "\n".join(t for _, t in pages)
+
+        # 1. Meta (first match wins, usually page 1)
         inv_match = re.search(r"INV_NO:([^\s]+)", text)
         date_match = re.search(r"DATE:([^\n]+)", text)
-        
-        # 2. Table extraction (Coordinates based on Generator)
-        # We know table starts roughly after header.
-        # ReportLab coordinates are Bottom-Left origin, but pdfplumber is Top-Left.
-        # We need to define bounding box for table.
-        # Or better: search for "SN Product Batch" header line
-        
+
+        # 2. Table extraction, page by page
+        # ReportLab coordinates are Bottom-Left origin, but pdfplumber is Top-Left,
+        # so the table bbox is found from the "SN Product Batch" header line instead.
         table_settings = {
-            "vertical_strategy": "text", 
+            "vertical_strategy": "text",
             "horizontal_strategy": "text",
         }
-        tables = page.extract_tables(table_settings)
-        
-        # Process tables to find the items table
+
         items_data = []
-        for table in tables:
-            # Check header
-            if table[0] and "SN" in str(table[0]) and "Product" in str(table[0]):
-                # This is items table
-                for row in table[1:]:
+        columns = None
+        for page, _ in pages:
+            area, page_columns = self._table_area(page)
+            # Continuation pages have no column header; reuse the last header's column lines
+            columns = page_columns or columns
+            settings = table_settings
+            if columns:
+                settings = dict(table_settings, vertical_strategy="explicit", explicit_vertical_lines=columns)
+            for table in area.extract_tables(settings):
+                for row in table:
                     # row: [SN, Product, Batch, Exp, Qty, Rate, Amount] (approx)
-                    if not row[0]: continue # Skip empty
-                    # Clean vals
-                    try:
-                        clean_row = [str(c).strip() if c else "" for c in row]
-                        # Merge if needed
-                        items_data.append(clean_row)
-                    except: pass
-                    
+                    clean_row = [str(c).strip() if c else "" for c in row]
+                    # Header, title and blank lines have no serial number
+                    if not clean_row or not clean_row[0].isdigit(): continue
+                    items_data.append(clean_row)
+
         return {
             "template": "AARAMBHA_A4_V1",
             "invoice_no": inv_match.group(1) if inv_match else "Unknown",
             "date": date_match.group(1) if date_match else "Unknown",
             "items": items_data,
+            "pages": len(pages),
             "raw_text": text[:200] + "..."
         }
 
-    def _extract_generic_mode(self, page):
+    def _extract_generic_mode(self, pages):
         # Fallback
         return {
             "template": "Generic (Unknown)",
             "warning": "Template ID not found. Extraction may be inaccurate.",
             "items": [],
-            "raw_text": page.extract_text()[:500]
+            "pages": len(pages),
+            "raw_text": pages[0][1][:500]
         }
+
+
+def _extract_path(path):
+    return path, InvoiceExtractor(path).extract()
+
+def extract_many(paths, workers=None, chunksize=2):
+    """Extract many PDFs on a process pool, yielding (path, result) as each one finishes.
+
+    Results arrive in completion order, not input order. Closing the
+    generator early (e.g. on cancel) stops the pool.
+    """
+    paths = list(paths)
+    if not paths:
+        return
+    with multiprocessing.Pool(min(workers or os.cpu_count() or 1, len(paths))) as pool:
+        for result in pool.imap_unordered(_extract_path, paths, chunksize):
+            yield result
+
+def extract_folder(folder, workers=None):
+    """extract_many over every *.pdf in a folder (not recursive)"""
+    paths = sorted(glob.glob(os.path.join(folder, "*.pdf")) + glob.glob(os.path.join(folder, "*.PDF")))
+    return extract_many(dict.fromkeys(paths), workers)
@@ -2,8 +2,12 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A5, landscape
 from reportlab.lib import colors
 from reportlab.lib.units import mm
+import multiprocessing
 import os
 
+HEADER_FORM = "InvoiceHeader"
+FOOTER_FORM = "InvoiceFooter"
+
 class PDFInvoiceGenerator:
     def __init__(self, output_path, invoice_data):
         self.output_path = output_path
@@ -17,8 +21,10 @@ class PDFInvoiceGenerator:
         self.top = self.height - 10 * mm
         self.bottom = 10 * mm
         self.y = self.top
+        self.header_bottom = None # y below the header, known once the form is recorded
 
     def generate(self):
+        self.define_forms()
         self.draw_header()
         self.draw_meta()
         self.draw_table()
@@ -29,7 +35,24 @@ class PDFInvoiceGenerator:
         except: pass
         return self.output_path
 
+    def define_forms(self):
+        """Record the static header and footer once as form XObjects; every page reuses them"""
+        self.c.beginForm(HEADER_FORM)
+        self.y = self.top
+        self.draw_header_content()
+        self.header_bottom = self.y
+        self.c.endForm()
+        
+        self.c.beginForm(FOOTER_FORM)
+        self.draw_footer_content()
+        self.c.endForm()
+        self.y = self.top
+
     def draw_header(self):
+        self.c.doForm(HEADER_FORM)
+        self.y = self.header_bottom
+
+    def draw_header_content(self):
         # 1. Pharmacy Name (Centered, Bold, Largest)
         self.c.setFont("Helvetica-Bold", 16)
         name = self.data.get('pharmacy_name', 'PHARMACY NAME').upper()
@@ -162,10 +185,11 @@ class PDFInvoiceGenerator:
             
             # Page Break Check (Minimal implementation)
             if self.y < 35 * mm:
+                self.draw_footer()
                 self.c.showPage()
-                self.y = self.height - 10 * mm
-                self.draw_header() # Repeat header? Maybe simplified
-                self.y -= 10 * mm
+                self.c.setFont("Helvetica", 8)
+                self.draw_header() # Same header XObject on every page
+                self.y -= 2 * mm
 
     def draw_totals(self):
         # Bottom Right
@@ -200,6 +224,9 @@ class PDFInvoiceGenerator:
         self.c.drawRightString(x_val, self.y, f"Rs. {grand:,.2f}")
         
     def draw_footer(self):
+        self.c.doForm(FOOTER_FORM)
+
+    def draw_footer_content(self):
         # Bottom Left: Cashier Name
         # Bottom Right/Center: Thank you
         
@@ -212,3 +239,43 @@ class PDFInvoiceGenerator:
 def generate_invoice(data, path):
     gen = PDFInvoiceGenerator(path, data)
     return gen.generate()
+
+def invoice_filename(data):
+    """<bill number>_<YYYYMMDD>.pdf, as written by the billing terminal"""
+    inv_date = str(data.get('invoice_date') or data.get('created_at') or '')[:10]
+    safe_date = inv_date.replace("-", "").replace("/", "")
+    return f"{data.get('bill_number', 'invoice')}_{safe_date}.pdf"
+
+def _render_job(job):
+    data, path = job
+    try:
+        generate_invoice(data, path)
+        return path, None
+    except Exception as e:
+        return path, str(e)
+
+def generate_invoices(invoices, out_dir, workers=None, progress=None, chunksize=4):
+    """Render many invoices into out_dir on a process pool.
+
+    ``invoices`` may be any iterable (including a generator that fetches
+    bills as it goes). ``progress((done, total, path, error))`` is called
+    as each file is finished; ``total`` is None when the iterable has no
+    length. If ``progress`` has a truthy ``cancelled`` attribute (see
+    task_runner.Progress) the pool is stopped early.
+    Returns (written paths, [(path, error)]).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    total = len(invoices) if hasattr(invoices, '__len__') else None
+    jobs = ((data, os.path.join(out_dir, invoice_filename(data))) for data in invoices)
+    
+    written, failed = [], []
+    with multiprocessing.Pool(workers) as pool:
+        for done, (path, error) in enumerate(pool.imap_unordered(_render_job, jobs, chunksize), 1):
+            if error: failed.append((path, error))
+            else: written.append(path)
+            if progress:
+                progress((done, total, path, error))
+                if getattr(progress, 'cancelled', False):
+                    pool.terminate()
+                    break
+    return written, failed
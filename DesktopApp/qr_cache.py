@@ -0,0 +1,144 @@
+import hashlib
+import io
+import json
+import os
+import threading
+
+import customtkinter as ctk
+from PIL import Image
+
+
+class QRImageCache:
+    """Decoded, pre-scaled payment QR images kept in memory and on disk.
+
+    Each method's QR is stored once per size in ``SIZES`` as a PNG named
+    after the server's ETag, plus an index of which ``updated_at`` that
+    ETag belongs to. A method whose ``updated_at`` still matches is served
+    without any request; when it changed, the caller asks the server with
+    ``If-None-Match: known_etag(method)`` and either ``touch``es the entry
+    (304: only other fields changed) or ``store``s the new image.
+
+    ``store`` / ``touch`` may run on a worker thread; ``image`` builds the
+    CTkImage and must run on the Tk thread.
+    """
+
+    SIZES = {"preview": (200, 200), "fullscreen": (500, 500)}
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(directory, "index.json")
+        self._index = self._load_index()  # str(method id) -> {"version", "etag"}
+        self._images = {}  # (method id, etag, size) -> PIL image
+        self._ctk = {}     # (method id, etag, size) -> CTkImage
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self._index_path)
+
+    @staticmethod
+    def version(method):
+        return str(method.get('updated_at') or "")
+
+    def _path(self, method_id, etag, size):
+        safe = "".join(c for c in etag if c.isalnum())[:40] or "noetag"
+        return os.path.join(self.directory, f"{method_id}_{safe}_{size}.png")
+
+    # --- LOOKUP ---
+
+    def known_etag(self, method):
+        entry = self._index.get(str(method['id']))
+        return entry["etag"] if entry else None
+
+    def fresh(self, method):
+        entry = self._index.get(str(method['id']))
+        return bool(entry) and entry["version"] == self.version(method)
+
+    def pil_image(self, method, size="preview"):
+        """The pre-scaled PIL image for a fresh entry (memory, then disk), else None"""
+        if not self.fresh(method):
+            return None
+        key = (method['id'], self.known_etag(method), size)
+        with self._lock:
+            img = self._images.get(key)
+            if img is None:
+                try:
+                    with Image.open(self._path(*key)) as f:
+                        img = f.copy()
+                except OSError:
+                    img = None
+                else:
+                    self._images[key] = img
+        if img is None:
+            # File gone or unreadable: forget the entry so the next fetch is unconditional (not a 304)
+            self.invalidate(method['id'])
+        return img
+
+    def image(self, method, size="preview"):
+        """CTkImage for a fresh entry, built once per method/version/size (Tk thread)"""
+        img = self.pil_image(method, size)
+        if img is None:
+            return None
+        key = (method['id'], self.known_etag(method), size)
+        photo = self._ctk.get(key)
+        if photo is None:
+            photo = ctk.CTkImage(light_image=img, dark_image=img, size=img.size)
+            self._ctk[key] = photo
+        return photo
+
+    # --- UPDATE ---
+
+    def store(self, method, etag, data):
+        """Decode raw image bytes once and save every size"""
+        etag = etag or hashlib.md5(data).hexdigest()
+        src = Image.open(io.BytesIO(data))
+        src.load()
+        scaled = {}
+        for size, box in self.SIZES.items():
+            img = src.copy()
+            img.thumbnail(box)
+            img.save(self._path(method['id'], etag, size), "PNG")
+            scaled[size] = img
+        with self._lock:
+            old = self._index.get(str(method['id']))
+            if old and old["etag"] != etag:
+                self._drop_files(method['id'], old["etag"])
+            for size, img in scaled.items():
+                self._images[(method['id'], etag, size)] = img
+            self._index[str(method['id'])] = {"version": self.version(method), "etag": etag}
+            self._save_index()
+
+    def touch(self, method):
+        """Server said 304: the image is unchanged, only the method's other fields were edited"""
+        with self._lock:
+            entry = self._index.get(str(method['id']))
+            if entry:
+                entry["version"] = self.version(method)
+                self._save_index()
+
+    def invalidate(self, method_id):
+        """Forget a method's QR (e.g. right after a new one was uploaded)"""
+        with self._lock:
+            entry = self._index.pop(str(method_id), None)
+            if entry:
+                self._drop_files(method_id, entry["etag"])
+                self._save_index()
+
+    def _drop_files(self, method_id, etag):
+        for size in self.SIZES:
+            self._images.pop((method_id, etag, size), None)
+            self._ctk.pop((method_id, etag, size), None)
+            try:
+                os.remove(self._path(method_id, etag, size))
+            except OSError:
+                pass
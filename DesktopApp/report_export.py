@@ -0,0 +1,177 @@
+import csv
+import os
+
+
+# Column layout per super-admin report: (header, row key, PDF width in points)
+REPORT_LAYOUTS = {
+    "Sales Summary": [
+        ("Date", "created_at", 70), ("Pharmacy", "pharmacy_name", 150), ("Bill No", "bill_number", 100),
+        ("Cashier", "cashier_name", 100), ("Total", "total_amount", 80), ("Grand Total", "grand_total", 80),
+        ("Mode", "payment_category", 70),
+    ],
+    "Item-wise Sales": [
+        ("Date", "created_at", 70), ("Item Name", "medicine_name", 180), ("Quantity", "quantity", 60),
+        ("Price", "unit_price", 70), ("Total", "total_price", 80), ("Pharmacy", "pharmacy_name", 170),
+    ],
+    "Top Selling Products": [
+        ("Medicine Name", "name", 200), ("Total Sold", "total_sold", 100), ("Revenue", "total_revenue", 100),
+        ("Pharmacy", "pharmacy_name", 200),
+    ],
+}
+DATE_KEYS = ("created_at", "date")
+PROGRESS_EVERY = 1000
+
+
+def paged_rows(fetch_page, limit=1000):
+    """Yield rows from a cursor API; ``fetch_page(cursor, limit)`` returns (rows, next_cursor)"""
+    cursor = None
+    while True:
+        rows, cursor = fetch_page(cursor, limit)
+        yield from rows
+        if cursor is None:
+            return
+
+
+def format_row(row, keys, to_bs=None):
+    """Row dict -> list of cell strings; dates become BS when ``to_bs`` is given"""
+    out = []
+    for key in keys:
+        val = row.get(key)
+        if val is None:
+            val = ""
+        elif key in DATE_KEYS:
+            val = str(val).split("T")[0][:10]
+            if to_bs and val:
+                val = to_bs(val)
+        out.append(str(val))
+    return out
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def _counted(rows, keys, to_bs, progress, total):
+    """Format rows lazily, reporting (done, total) and stopping when the task is cancelled"""
+    done = 0
+    for row in rows:
+        yield format_row(row, keys, to_bs)
+        done += 1
+        if progress and done % PROGRESS_EVERY == 0:
+            if getattr(progress, 'cancelled', False):
+                raise _Cancelled()
+            progress((done, total))
+    if progress:
+        progress((done, total))
+
+
+def _write_csv(path, headers, cells):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:  # BOM so Excel reads Devanagari
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(cells)
+
+
+def _write_xlsx(path, title, headers, cells):
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+    from openpyxl.cell import WriteOnlyCell
+
+    wb = Workbook(write_only=True)  # rows go straight to disk instead of a cell grid in memory
+    ws = wb.create_sheet(title[:31])
+    bold = []
+    for h in headers:
+        cell = WriteOnlyCell(ws, value=h)
+        cell.font = Font(bold=True)
+        bold.append(cell)
+    ws.append(bold)
+    for row in cells:
+        ws.append(row)
+    wb.save(path)
+
+
+class _StreamedStory(list):
+    """Flowable list that ReportLab's build loop refills from a generator.
+
+    ``build()`` only ever looks at the front of the story, so tables are
+    made ``chunk`` rows at a time as it consumes them and a report of any
+    length is never held as one giant ``Table``.
+    """
+
+    def __init__(self, head, tables):
+        super().__init__(head)
+        self._tables = tables
+
+    def __len__(self):
+        if list.__len__(self) < 2:
+            nxt = next(self._tables, None)
+            if nxt is not None:
+                self.append(nxt)
+        return list.__len__(self)
+
+
+def _write_pdf(path, title, subtitle, headers, widths, cells, chunk):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ])
+
+    def tables():
+        batch = []
+        for row in cells:
+            batch.append(row)
+            if len(batch) == chunk:
+                yield Table([headers] + batch, colWidths=widths, repeatRows=1, style=style)
+                batch = []
+        if batch:
+            yield Table([headers] + batch, colWidths=widths, repeatRows=1, style=style)
+
+    styles = getSampleStyleSheet()
+    head = [Paragraph(title, styles['Title']), Paragraph(subtitle, styles['Normal']), Spacer(1, 8)]
+    SimpleDocTemplate(path, pagesize=landscape(A4)).build(_StreamedStory(head, tables()))
+
+
+def export_report(path, r_type, rows, subtitle="", to_bs=None, progress=None, total=None, chunk=500):
+    """Write a report to .xlsx, .pdf or .csv (by extension) while ``rows`` is being iterated.
+
+    ``rows`` may be a list or a generator such as ``paged_rows(...)``, so
+    nothing beyond the current page and PDF chunk is kept in memory.
+    ``progress((done, total))`` is called every ``PROGRESS_EVERY`` rows;
+    when it reports ``cancelled`` the partial file is removed and None is
+    returned. Otherwise returns the number of rows written.
+    """
+    layout = REPORT_LAYOUTS[r_type]
+    headers = [h for h, _, _ in layout]
+    keys = [k for _, k, _ in layout]
+    widths = [w for _, _, w in layout]
+    counter = {"rows": 0}
+
+    def cells():
+        for row in _counted(rows, keys, to_bs, progress, total):
+            counter["rows"] += 1
+            yield row
+
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext == ".xlsx":
+            _write_xlsx(path, r_type, headers, cells())
+        elif ext == ".pdf":
+            _write_pdf(path, f"{r_type} Report", subtitle, headers, widths, cells(), chunk)
+        else:
+            _write_csv(path, headers, cells())
+    except _Cancelled:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    return counter["rows"]
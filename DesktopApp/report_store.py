@@ -0,0 +1,156 @@
+import sqlite3
+import threading
+
+import pandas as pd
+
+
+class ReportStore:
+    """Local copy of one pharmacy's sales, kept in SQLite for instant reports.
+
+    Invoices are stored as they are and sale items are folded into daily
+    aggregates keyed by (day, medicine, batch, payment mode, cashier).
+    ``sync(fetch_page)`` only asks the backend for sales after the highest
+    id already stored (sales are never edited in place), so after the first
+    run a refresh is a single empty request. The backend holds back sales
+    from the last couple of minutes so that a sale still committing under a
+    lower id cannot be skipped; those show up on a later refresh. Reports over any AD date range
+    are then pandas group-bys over the local tables.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()  # one sync / reset at a time (a started task cannot be cancelled)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS sales (
+                id INTEGER PRIMARY KEY,
+                bill_number TEXT,
+                day TEXT NOT NULL,
+                created_at TEXT,
+                customer_name TEXT,
+                payment_category TEXT,
+                cashier_id INTEGER,
+                cashier_name TEXT,
+                amount REAL NOT NULL DEFAULT 0,
+                discount REAL NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS sales_day ON sales (day);
+            CREATE TABLE IF NOT EXISTS item_daily (
+                day TEXT NOT NULL,
+                medicine_id INTEGER NOT NULL,
+                name TEXT,
+                batch_number TEXT NOT NULL DEFAULT '',
+                payment_category TEXT NOT NULL DEFAULT '',
+                cashier_id INTEGER NOT NULL DEFAULT 0,
+                qty REAL NOT NULL DEFAULT 0,
+                amount REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, medicine_id, batch_number, payment_category, cashier_id)
+            );
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+
+    @property
+    def last_id(self):
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'last_sale_id'").fetchone()
+        return int(row[0]) if row else 0
+
+    # --- SYNC ---
+
+    def apply(self, sales, items):
+        """Store one page of new sales and fold their items into the daily aggregates"""
+        with self._lock:
+            # Sales already stored (an overlapping sync) must not add their items twice
+            last_id = self.last_id
+            by_id = {s['id']: s for s in sales if s['id'] > last_id}
+            if not by_id:
+                return 0
+            sales = list(by_id.values())
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO sales VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(s['id'], s.get('bill_number'), s['day'], str(s.get('created_at') or ""),
+                      s.get('customer_name'), s.get('payment_category') or "", s.get('cashier_id') or 0,
+                      s.get('cashier_name'), float(s.get('amount') or 0), float(s.get('discount') or 0))
+                     for s in sales])
+                self._db.executemany(
+                    """INSERT INTO item_daily VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (day, medicine_id, batch_number, payment_category, cashier_id)
+                       DO UPDATE SET qty = qty + excluded.qty, amount = amount + excluded.amount""",
+                    [(by_id[i['sale_id']]['day'], i['medicine_id'], i.get('name') or f"Item #{i['medicine_id']}",
+                      i.get('batch_number') or "",
+                      by_id[i['sale_id']].get('payment_category') or "", by_id[i['sale_id']].get('cashier_id') or 0,
+                      float(i.get('qty') or 0), float(i.get('amount') or 0))
+                     for i in items if i['sale_id'] in by_id])
+                self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_sale_id', ?)",
+                                 (str(max(by_id)),))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return len(sales)
+
+    def sync(self, fetch_page, limit=2000):
+        """Pull everything after ``last_id``; ``fetch_page(since_id, limit)`` returns a /reports/sync page"""
+        added = 0
+        with self._sync_lock:
+            while True:
+                page = fetch_page(self.last_id, limit)
+                added += self.apply(page.get('sales', []), page.get('items', []))
+                if not page.get('has_more') or not page.get('sales'):
+                    return added
+
+    def reset(self):
+        """Forget everything; the next sync downloads the full history again (waits for a running sync)"""
+        with self._sync_lock, self._lock:
+            self._db.executescript("DELETE FROM sales; DELETE FROM item_daily; DELETE FROM meta;")
+
+    # --- REPORTS (AD dates, inclusive) ---
+
+    def _frame(self, sql, start, end):
+        with self._lock:
+            return pd.read_sql_query(sql, self._db, params=(start, end))
+
+    @staticmethod
+    def _records(df):
+        return df.to_dict("records")
+
+    def sales_summary(self, start, end):
+        """Per day: bill count, sales, discount (newest first)"""
+        df = self._frame("SELECT day, amount, discount FROM sales WHERE day BETWEEN ? AND ?", start, end)
+        out = (df.groupby("day", sort=False)
+                 .agg(count=("amount", "size"), total_sales=("amount", "sum"), total_discount=("discount", "sum"))
+                 .reset_index().rename(columns={"day": "date"})
+                 .sort_values("date", ascending=False))
+        out["net_sales"] = out["total_sales"]
+        return self._records(out)
+
+    def invoices(self, start, end):
+        df = self._frame("""SELECT bill_number, created_at, customer_name, payment_category, amount
+                            FROM sales WHERE day BETWEEN ? AND ? ORDER BY id DESC""", start, end)
+        return self._records(df)
+
+    def items(self, start, end):
+        """Per medicine and batch: quantity and revenue (best sellers first)"""
+        df = self._frame("""SELECT medicine_id, name, batch_number, qty, amount
+                            FROM item_daily WHERE day BETWEEN ? AND ?""", start, end)
+        out = (df.groupby(["medicine_id", "name", "batch_number"], dropna=False, sort=False)
+                 .agg(qty=("qty", "sum"), total_amount=("amount", "sum"))
+                 .reset_index().sort_values("total_amount", ascending=False))
+        out["qty"] = out["qty"].astype(int)
+        return self._records(out)
+
+    def breakdown(self, by, start, end):
+        """Bill count and sales per ``payment_category`` or ``cashier_name``"""
+        if by not in ("payment_category", "cashier_name"):
+            raise ValueError(f"Unknown breakdown: {by}")
+        df = self._frame(f"SELECT {by}, amount FROM sales WHERE day BETWEEN ? AND ?", start, end)
+        out = (df.fillna({by: "-"}).groupby(by, sort=False)
+                 .agg(count=("amount", "size"), total_sales=("amount", "sum"))
+                 .reset_index().sort_values("total_sales", ascending=False))
+        return self._records(out)
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,214 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+
+PENDING, SYNCED, REJECTED, RESOLVED = "pending", "synced", "rejected", "resolved"
+
+
+class SalesJournal:
+    """Durable local write-ahead journal of sales made at this terminal.
+
+    A sale is committed to SQLite (WAL mode, fsync on commit) before the
+    invoice is printed, so checkout never waits on the backend. Each entry
+    gets an idempotency key for the server and a provisional invoice number
+    (``PRV-<terminal>-<seq>``) that is unique per terminal. ``SalesSync``
+    later pushes pending entries to the backend in the order they were
+    recorded, each with the token of the cashier who made the sale, so a
+    logout before the sync does not re-attribute it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT UNIQUE NOT NULL,
+                provisional_number TEXT,
+                payload TEXT NOT NULL,
+                auth_token TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                bill_number TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                synced_at REAL
+            )""")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.terminal_id = self._terminal_id()
+
+    def _terminal_id(self):
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'terminal_id'").fetchone()
+        if row:
+            return row[0]
+        terminal_id = uuid.uuid4().hex[:4].upper()
+        self._db.execute("INSERT INTO meta (key, value) VALUES ('terminal_id', ?)", (terminal_id,))
+        return terminal_id
+
+    # --- WRITE ---
+
+    def record(self, payload, auth_token=None):
+        """Persist a sale; returns (idempotency_key, provisional_number)"""
+        key = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self._db.execute(
+                    "INSERT INTO journal (idempotency_key, payload, auth_token, created_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(payload, default=str), auth_token, time.time()))
+                provisional = f"PRV-{self.terminal_id}-{cur.lastrowid:06d}"
+                self._db.execute("UPDATE journal SET provisional_number = ? WHERE seq = ?",
+                                 (provisional, cur.lastrowid))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return key, provisional
+
+    def mark_synced(self, key, bill_number):
+        with self._lock:
+            self._db.execute(
+                "UPDATE journal SET status = ?, bill_number = ?, synced_at = ?, last_error = NULL WHERE idempotency_key = ?",
+                (SYNCED, bill_number, time.time(), key))
+
+    def mark_failed(self, key, error, permanent=False):
+        """Record a failed push; permanent failures are not retried"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE journal SET attempts = attempts + 1, last_error = ?, status = ? WHERE idempotency_key = ?",
+                (str(error)[:500], REJECTED if permanent else PENDING, key))
+
+    def retry(self, key):
+        """Put a rejected entry back in the queue (e.g. after fixing the data on the server)"""
+        with self._lock:
+            self._db.execute("UPDATE journal SET status = ? WHERE idempotency_key = ? AND status = ?",
+                             (PENDING, key, REJECTED))
+
+    def resolve(self, key, note=""):
+        """Close a rejected entry that was settled by hand; it is kept for the record but never sent"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE journal SET status = ?, last_error = last_error || ? WHERE idempotency_key = ? AND status = ?",
+                (RESOLVED, f" | resolved: {note}" if note else " | resolved", key, REJECTED))
+
+    # --- READ ---
+
+    def pending(self, limit=50):
+        """Unsynced entries, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM journal WHERE status = ? ORDER BY seq LIMIT ?", (PENDING, limit)).fetchall()
+        return [dict(r, payload=json.loads(r['payload'])) for r in rows]
+
+    def rejected(self):
+        """Entries the server refused, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM journal WHERE status = ? ORDER BY seq", (REJECTED,)).fetchall()
+        return [dict(r, payload=json.loads(r['payload'])) for r in rows]
+
+    def counts(self):
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM journal GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class SalesSync:
+    """Background worker that pushes journal entries to the backend in order.
+
+    ``post(payload, idempotency_key, auth_token)`` sends one sale (with its
+    ``provisional_number``) and returns the response. A network error or
+    5xx/401 stops the pass (later sales must not overtake an earlier one)
+    and the worker retries with backoff. A 409 means another attempt with
+    the same key is being recorded: ``lookup(idempotency_key, auth_token)``
+    returns that sale's bill number, or None to try again later. Other 4xx
+    answers mean the server will never accept the sale, so the entry is set
+    aside as rejected for the cashier to retry or resolve.
+    ``on_synced(entry, bill_number)`` runs on the worker thread after each
+    success.
+    """
+
+    def __init__(self, journal, post, interval=5.0, max_backoff=60.0, on_synced=None, lookup=None):
+        self.journal = journal
+        self.post = post
+        self.lookup = lookup
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.on_synced = on_synced
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sales-sync", daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """Push now instead of waiting for the next interval"""
+        self._wake.set()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        delay = self.interval
+        while not self._stop.is_set():
+            ok = self.sync_once()
+            delay = self.interval if ok else min(delay * 2, self.max_backoff)
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def sync_once(self):
+        """Push pending entries in order; False if the backend could not be reached"""
+        while not self._stop.is_set():
+            batch = self.journal.pending()
+            if not batch:
+                return True
+            for entry in batch:
+                key = entry['idempotency_key']
+                payload = dict(entry['payload'], provisional_number=entry['provisional_number'])
+                try:
+                    r = self.post(payload, key, entry['auth_token'])
+                except Exception as e:
+                    self.journal.mark_failed(key, e)
+                    return False
+
+                if r.status_code in (200, 201):
+                    self._synced(entry, r.json().get('bill_number'))
+                elif r.status_code == 409:
+                    # Same key raced another attempt: adopt that sale's number once it is committed
+                    try:
+                        bill_number = self.lookup(key, entry['auth_token']) if self.lookup else None
+                    except Exception as e:
+                        bill_number = None
+                        print(f"Sale lookup failed: {e}")
+                    if not bill_number:
+                        self.journal.mark_failed(key, f"HTTP 409: {r.text}")
+                        return False
+                    self._synced(entry, bill_number)
+                elif r.status_code >= 500 or r.status_code in (401, 403, 408, 429):
+                    self.journal.mark_failed(key, f"HTTP {r.status_code}: {r.text}")
+                    return False
+                else:
+                    self.journal.mark_failed(key, f"HTTP {r.status_code}: {r.text}", permanent=True)
+        return True
+
+    def _synced(self, entry, bill_number):
+        self.journal.mark_synced(entry['idempotency_key'], bill_number)
+        if self.on_synced:
+            self.on_synced(entry, bill_number)
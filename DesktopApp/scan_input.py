@@ -0,0 +1,147 @@
+from collections import deque
+
+
+class WedgeDetector:
+    """Separates keyboard-wedge scanner bursts from a person typing.
+
+    Bind ``key(event)`` to an entry's ``<Key>``. Printable keys are held
+    back (the entry never sees them) until the timing is clear: a burst of
+    at least ``min_length`` characters with gaps under ``max_gap_ms`` is a
+    scan and goes to ``on_scan(code)``; anything slower is a person, and
+    the held characters are handed to ``on_typed(text)`` to insert as usual
+    (a delay of one gap, ~40 ms). A scan therefore never writes to the
+    entry's StringVar or triggers its traces. Enter ends a burst at once.
+
+    ``after(ms, fn)`` / ``after_cancel(id)`` are the Tk timer calls
+    (``widget.after``); ``clock()`` returns milliseconds, and key events
+    carry their own ``time`` when Tk provides it.
+    """
+
+    def __init__(self, after, after_cancel, on_scan, on_typed, max_gap_ms=40, min_length=4):
+        self.after = after
+        self.after_cancel = after_cancel
+        self.on_scan = on_scan
+        self.on_typed = on_typed
+        self.max_gap_ms = max_gap_ms
+        self.min_length = min_length
+        self._chars = []
+        self._last = None
+        self._timer = None
+
+    def key(self, event):
+        """``<Key>`` handler; returns "break" when the key was consumed"""
+        char = getattr(event, "char", "")
+        t = getattr(event, "time", None) or 0
+        control = getattr(event, "state", 0) & 0x4
+
+        if getattr(event, "keysym", "") in ("Return", "KP_Enter"):
+            if self._chars and self._is_burst():
+                self._emit_scan()
+                return "break"
+            self._flush_typed()
+            return None  # a normal Enter for the entry's own <Return> binding
+
+        if len(char) != 1 or not char.isprintable() or control:
+            # Editing / navigation keys: let pending typed text land first
+            self._flush_typed()
+            return None
+
+        if self._chars and t - self._last > self.max_gap_ms:
+            # Too slow to belong to the current burst
+            self._settle()
+        self._chars.append(char)
+        self._last = t
+        self._restart_timer()
+        return "break"
+
+    def reset(self):
+        """Drop held keys (e.g. when the screen is reset)"""
+        self._take()
+        self._last = None
+
+    def _is_burst(self):
+        return len(self._chars) >= self.min_length
+
+    def _restart_timer(self):
+        if self._timer is not None:
+            self.after_cancel(self._timer)
+        self._timer = self.after(self.max_gap_ms, self._settle)
+
+    def _settle(self):
+        """No follow-up key within the gap: decide what the held characters were"""
+        if self._is_burst():
+            self._emit_scan()
+        else:
+            self._flush_typed()
+
+    def _take(self):
+        if self._timer is not None:
+            self.after_cancel(self._timer)
+            self._timer = None
+        text, self._chars = "".join(self._chars), []
+        return text
+
+    def _emit_scan(self):
+        code = self._take().strip()
+        if code:
+            self.on_scan(code)
+
+    def _flush_typed(self):
+        text = self._take()
+        if text:
+            self.on_typed(text)
+
+
+class ScanQueue:
+    """Handles scans strictly in the order they arrived.
+
+    ``resolve(code)`` is tried first on the Tk thread (e.g. the local
+    barcode map) and returns a result or None. On a miss ``fetch(code)``
+    runs on the TaskRunner and the queue waits for it, so a later scan that
+    resolves locally can never overtake an earlier one still in flight.
+    ``handle(code, result)`` is called on the Tk thread for every scan;
+    ``result`` is None when the fetch failed.
+    """
+
+    def __init__(self, tasks, resolve, fetch, handle, owner=None):
+        self.tasks = tasks
+        self.resolve = resolve
+        self.fetch = fetch
+        self.handle = handle
+        self.owner = owner
+        self._queue = deque()
+        self._busy = False
+        self._generation = 0
+
+    def __len__(self):
+        return len(self._queue) + (1 if self._busy else 0)
+
+    def clear(self):
+        """Drop waiting scans; a lookup still in flight is ignored when it returns"""
+        self._queue.clear()
+        self._busy = False
+        self._generation += 1
+
+    def push(self, code):
+        self._queue.append(code)
+        self._pump()
+
+    def _pump(self):
+        while self._queue and not self._busy:
+            code = self._queue.popleft()
+            result = self.resolve(code)
+            if result is not None:
+                self.handle(code, result)
+                continue
+            self._busy = True
+            self.tasks.submit(self.fetch, code,
+                              on_success=lambda result, c=code, g=self._generation: self._done(c, result, g),
+                              on_error=lambda e, c=code, g=self._generation: self._done(c, None, g),
+                              owner=self.owner)
+
+    def _done(self, code, result, generation):
+        if generation != self._generation:
+            return  # cleared while the lookup was running
+        self._busy = False
+        self.handle(code, result)
+        self._pump()
@@ -0,0 +1,86 @@
+class ScreenManager:
+    """Keeps chosen screens (and the sidebar) alive between visits.
+
+    Screens normally start by clearing the window and building everything
+    again. ``clear()`` replaces that: widgets that were ``keep``-t (the
+    sidebar) and ``register``-ed screens are only hidden, everything else
+    is destroyed as before. ``show_cached(name)`` brings a registered
+    screen back and calls its ``reset`` hook, so returning to the billing
+    terminal (or resetting it after a sale) costs a pack() instead of a
+    rebuild. ``discard_all()`` drops everything, e.g. on logout.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._screens = {}  # name -> (frame, reset)
+        self._kept = []
+        self.current = None
+
+    def _alive(self, widget):
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+    def _retained(self):
+        return [w for w in self._kept if self._alive(w)] + [f for f, _ in self._screens.values() if self._alive(f)]
+
+    def keep(self, widget):
+        """Hide instead of destroying this root child on clear()"""
+        if widget not in self._kept:
+            self._kept.append(widget)
+
+    def forget(self, widget):
+        if widget in self._kept:
+            self._kept.remove(widget)
+
+    def clear(self):
+        """Empty the window for a new screen"""
+        retained = self._retained()
+        for widget in self.root.winfo_children():
+            if widget in retained:
+                widget.pack_forget()
+            else:
+                widget.destroy()
+        self.current = None
+
+    def register(self, name, frame, reset=None):
+        """Cache a built screen; ``frame`` must be a direct child of the root"""
+        self._screens[name] = (frame, reset)
+        self.current = name
+
+    def show_cached(self, name):
+        """Re-show a cached screen (after reset) and return its frame; None if it has to be built"""
+        entry = self._screens.get(name)
+        if entry is None:
+            return None
+        frame, reset = entry
+        if not self._alive(frame):
+            del self._screens[name]
+            return None
+        self.clear()
+        frame.pack(fill="both", expand=True)
+        self.current = name
+        if reset:
+            reset()
+        return frame
+
+    def reset(self, name):
+        """Run a cached screen's reset hook without navigating"""
+        entry = self._screens.get(name)
+        if entry and entry[1]:
+            entry[1]()
+
+    def discard(self, name):
+        entry = self._screens.pop(name, None)
+        if entry and self._alive(entry[0]):
+            entry[0].destroy()
+
+    def discard_all(self):
+        for name in list(self._screens):
+            self.discard(name)
+        for widget in self._kept:
+            if self._alive(widget):
+                widget.destroy()
+        self._kept = []
+        self.current = None
@@ -0,0 +1,188 @@
+import bisect
+import time
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _expiry_key(row):
+    # ISO dates sort correctly as strings; batches without expiry go last
+    return row.get('expiry_date') or "9999-12-31"
+
+
+class StockIndex:
+    """In-memory index of sellable stock for the billing terminal.
+
+    Built from ``/inventory/stock`` rows (one row per batch). Barcode / item
+    code lookups are a dict hit, name searches use a sorted prefix list plus
+    a trigram index for substrings, and each medicine's batches are kept in
+    expiry order (FEFO) so a scan always picks the batch expiring first.
+
+    Build a new index off the UI thread with ``StockIndex.from_rows`` and
+    swap it in on the Tk thread; the instance itself is only mutated from
+    the Tk thread (``apply_sale`` / ``upsert``).
+    """
+
+    def __init__(self):
+        self.loaded_at = None
+        self._batches = {}      # stock id -> row
+        self._by_medicine = {}  # medicine id -> [rows] ordered by expiry
+        self._by_code = {}      # barcode / item code (lower) -> medicine id
+        self._names = {}        # medicine id -> lower-case name
+        self._sorted_names = [] # [(lower-case name, medicine id)]
+        self._trigram_map = {}  # trigram -> {medicine ids}
+
+    @classmethod
+    def from_rows(cls, rows):
+        index = cls()
+        index.load(rows)
+        return index
+
+    @property
+    def loaded(self):
+        return self.loaded_at is not None
+
+    def __len__(self):
+        return len(self._batches)
+
+    # --- BUILD ---
+
+    def load(self, rows):
+        self.__init__()
+        for row in rows:
+            self._add(row)
+        for batches in self._by_medicine.values():
+            batches.sort(key=_expiry_key)
+        self._sorted_names.sort()
+        self.loaded_at = time.time()
+
+    def _add(self, row, keep_sorted=False):
+        row = dict(row)
+        try:
+            row['quantity'] = int(float(row.get('quantity') or 0))
+        except (TypeError, ValueError):
+            row['quantity'] = 0
+
+        stock_id = row['id']
+        med_id = row.get('medicine_id')
+        self._batches[stock_id] = row
+        self._by_medicine.setdefault(med_id, []).append(row)
+
+        for key in ('barcode', 'item_code'):
+            code = row.get(key)
+            if code:
+                self._by_code[str(code).strip().lower()] = med_id
+
+        if med_id not in self._names:
+            name = str(row.get('medicine_name') or "").lower()
+            self._names[med_id] = name
+            if keep_sorted:
+                bisect.insort(self._sorted_names, (name, med_id))
+            else:
+                self._sorted_names.append((name, med_id))
+            for tri in _trigrams(name):
+                self._trigram_map.setdefault(tri, set()).add(med_id)
+        return row
+
+    # --- INCREMENTAL UPDATES ---
+
+    def upsert(self, row):
+        """Insert or replace a single batch row (e.g. after a GRN)"""
+        old = self._batches.get(row['id'])
+        if old is not None:
+            row = dict(old, **row)
+            self._remove(old)
+            name = str(row.get('medicine_name') or "").lower()
+            if self._names.get(row.get('medicine_id'), name) != name:
+                self._forget_name(row.get('medicine_id'))  # renamed while other batches remain
+        med_id = self._add(row, keep_sorted=True).get('medicine_id')
+        self._by_medicine[med_id].sort(key=_expiry_key)
+
+    def _remove(self, row):
+        """Take a batch out of every index (codes and name only once no batch of its medicine uses them)"""
+        self._batches.pop(row['id'], None)
+        med_id = row.get('medicine_id')
+        batches = [b for b in self._by_medicine.get(med_id, []) if b['id'] != row['id']]
+        still_used = {str(b.get(key)).strip().lower() for b in batches for key in ('barcode', 'item_code') if b.get(key)}
+        for key in ('barcode', 'item_code'):
+            code = str(row.get(key) or "").strip().lower()
+            if code and code not in still_used and self._by_code.get(code) == med_id:
+                del self._by_code[code]
+        if batches:
+            self._by_medicine[med_id] = batches
+        else:
+            self._by_medicine.pop(med_id, None)
+            self._forget_name(med_id)
+
+    def _forget_name(self, med_id):
+        name = self._names.pop(med_id, None)
+        if name is None:
+            return
+        i = bisect.bisect_left(self._sorted_names, (name, med_id))
+        if i < len(self._sorted_names) and self._sorted_names[i] == (name, med_id):
+            del self._sorted_names[i]
+        for tri in _trigrams(name):
+            ids = self._trigram_map.get(tri)
+            if ids is not None:
+                ids.discard(med_id)
+                if not ids:
+                    del self._trigram_map[tri]
+
+    def apply_sale(self, cart_items):
+        """Decrement batch quantities for items that were just sold"""
+        for item in cart_items:
+            row = self._batches.get(item.get('id'))
+            if row is not None:
+                row['quantity'] = max(0, row['quantity'] - int(item.get('qty', 0)))
+
+    # --- LOOKUPS ---
+
+    def sellable_batches(self, medicine_id):
+        """Batches with stock left for a medicine, earliest expiry first"""
+        return [b for b in self._by_medicine.get(medicine_id, []) if b['quantity'] > 0]
+
+    def lookup_code(self, code):
+        """Exact barcode / item code match -> sellable batches (FEFO)"""
+        med_id = self._by_code.get(str(code).strip().lower())
+        if med_id is None:
+            return []
+        return self.sellable_batches(med_id)
+
+    def search(self, query, limit=100):
+        """Barcode, name-prefix or substring search over sellable batches"""
+        q = str(query or "").strip().lower()
+        if not q:
+            med_ids = [m for _, m in self._sorted_names]
+        else:
+            code_hit = self._by_code.get(q)
+            med_ids = [code_hit] if code_hit is not None else []
+
+            # Prefix matches in name order
+            i = bisect.bisect_left(self._sorted_names, (q,))
+            while i < len(self._sorted_names) and self._sorted_names[i][0].startswith(q):
+                med_ids.append(self._sorted_names[i][1])
+                i += 1
+
+            # Substring matches via trigrams (verified, since trigrams over-match)
+            if len(q) >= 3:
+                candidates = None
+                for tri in _trigrams(q):
+                    ids = self._trigram_map.get(tri, set())
+                    candidates = ids if candidates is None else candidates & ids
+                    if not candidates:
+                        break
+                seen = set(med_ids)
+                extra = sorted((self._names[m], m) for m in (candidates or ()) if m not in seen and q in self._names[m])
+                med_ids.extend(m for _, m in extra)
+
+        results = []
+        seen = set()
+        for med_id in med_ids:
+            if med_id in seen:
+                continue
+            seen.add(med_id)
+            results.extend(self.sellable_batches(med_id))
+            if len(results) >= limit:
+                break
+        return results[:limit]
@@ -0,0 +1,175 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Task:
+    """Handle for a unit of work submitted to the TaskRunner"""
+
+    def __init__(self, key=None, owner=None, persistent=False):
+        self.key = key
+        self.owner = owner
+        self.persistent = persistent
+        self.future = None
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Drop the result. Work that has not started yet is not run at all."""
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+
+class Progress:
+    """Passed to long-running work as ``progress``: call it to report, poll ``cancelled`` to stop early"""
+
+    def __init__(self, task, results, callback):
+        self._task = task
+        self._results = results
+        self._callback = callback
+
+    def __call__(self, value):
+        if not self._task.cancelled:
+            self._results.put((self._task, self._callback, value, None, False))
+
+    @property
+    def cancelled(self):
+        return self._task.cancelled
+
+
+class TaskRunner:
+    """Runs blocking work (HTTP calls, file IO) off the Tk main loop.
+
+    Workers never touch widgets. Results are put on a queue which the Tk
+    thread drains with ``root.after``, so ``on_success`` / ``on_error``
+    callbacks always run on the main thread.
+
+    Stale work is dropped instead of delivered:
+      - a new submit with the same ``key`` cancels the previous one
+        (e.g. the user clicks "Search" twice);
+      - ``cancel_all()`` is called on navigation so a screen the user has
+        left never receives late results (``persistent`` tasks, such as
+        app-wide cache refreshes, are exempt);
+      - if ``owner`` (a widget) no longer exists when the result arrives,
+        the callbacks are skipped.
+
+    With ``on_progress`` the work function is also given a ``progress``
+    keyword (a ``Progress``); each ``progress(value)`` is delivered to
+    ``on_progress(value)`` on the Tk thread while the work keeps running.
+    """
+
+    POLL_MS = 25
+
+    def __init__(self, root, max_workers=4):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ui-task")
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._by_key = {}
+        self._polling = False
+
+    def submit(self, fn, *args, on_success=None, on_error=None, on_progress=None, key=None, owner=None,
+               persistent=False, **kwargs):
+        """Run ``fn(*args, **kwargs)`` on a worker and deliver the result on the Tk thread"""
+        task = Task(key=key, owner=owner, persistent=persistent)
+        if on_progress is not None:
+            kwargs['progress'] = Progress(task, self._results, on_progress)
+
+        with self._lock:
+            if key is not None:
+                previous = self._by_key.get(key)
+                if previous is not None:
+                    previous.cancel()
+                self._by_key[key] = task
+            self._pending.add(task)
+
+        def run():
+            if task.cancelled:
+                self._results.put((task, None, None, None, True))
+                return
+            try:
+                result = fn(*args, **kwargs)
+                self._results.put((task, on_success, result, None, True))
+            except Exception as e:
+                self._results.put((task, on_error, None, e, True))
+
+        def release_if_skipped(future):
+            # A future cancelled before it starts never calls run(), so the
+            # task has to be released from the pending set here.
+            if future.cancelled():
+                self._results.put((task, None, None, None, True))
+
+        task.future = self.executor.submit(run)
+        task.future.add_done_callback(release_if_skipped)
+        self._ensure_polling()
+        return task
+
+    def cancel(self, key):
+        with self._lock:
+            task = self._by_key.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def cancel_all(self, include_persistent=False):
+        with self._lock:
+            tasks = [t for t in self._pending if include_persistent or not t.persistent]
+            for task in tasks:
+                if task.key is not None and self._by_key.get(task.key) is task:
+                    del self._by_key[task.key]
+        for task in tasks:
+            task.cancel()
+
+    def shutdown(self):
+        self.cancel_all(include_persistent=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # --- MAIN THREAD DELIVERY ---
+
+    def _ensure_polling(self):
+        if self._polling:
+            return
+        self._polling = True
+        try:
+            self.root.after(self.POLL_MS, self._drain)
+        except Exception:
+            # Root is gone (app closing); nothing left to deliver to.
+            self._polling = False
+
+    def _drain(self):
+        while True:
+            try:
+                task, callback, result, error, final = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if final:
+                with self._lock:
+                    self._pending.discard(task)
+                    if task.key is not None and self._by_key.get(task.key) is task:
+                        del self._by_key[task.key]
+
+            if task.cancelled or callback is None:
+                if error is not None and callback is None and not task.cancelled:
+                    print(f"Background task error: {error}")
+                continue
+            if task.owner is not None:
+                try:
+                    if not task.owner.winfo_exists():
+                        continue
+                except Exception:
+                    continue
+            try:
+                callback(error if error is not None else result)
+            except Exception as e:
+                print(f"Task callback error: {e}")
+
+        with self._lock:
+            more = bool(self._pending)
+        self._polling = False
+        if more:
+            self._ensure_polling()
@@ -0,0 +1,68 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from api_client import ApiClient
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"path": self.path, "auth": self.headers.get("Authorization")}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestApiClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(("127.0.0.1", 0), _EchoHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}/api"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        self.token = "abc"
+        self.api = ApiClient(self.base, token_provider=lambda: self.token)
+
+    def tearDown(self):
+        self.api.close()
+
+    def test_token_attached_and_path_resolved(self):
+        data = self.api.get("/vendors/12").json()
+        self.assertEqual(data["path"], "/api/vendors/12")
+        self.assertEqual(data["auth"], "Bearer abc")
+
+    def test_explicit_header_wins(self):
+        data = self.api.get("/profile", headers={"Authorization": "Bearer other"}).json()
+        self.assertEqual(data["auth"], "Bearer other")
+
+    def test_no_token_no_header(self):
+        self.token = None
+        self.assertIsNone(self.api.get("/login").json()["auth"])
+
+    def test_counters_group_ids_and_queries(self):
+        self.api.get("/vendors/1")
+        self.api.get("/vendors/2?x=1")
+        stats = self.api.stats()
+        self.assertEqual(stats["GET /vendors/:id"]["count"], 2)
+        self.assertEqual(stats["GET /vendors/:id"]["errors"], 0)
+
+    def test_endpoint_timeouts(self):
+        self.assertEqual(self.api.timeout_for("/reports/sales?type=x"), (3.05, 120))
+        self.assertEqual(self.api.timeout_for("/unknown"), ApiClient.DEFAULT_TIMEOUT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from autocomplete import PrefixCache, medicine_matches
+
+
+def med(id, name, generic_name, barcode, item_code=None):
+    """A row as /search-medicines returns it (every selected column present)"""
+    return {"id": id, "name": name, "generic_name": generic_name, "strength": None, "manufacturer": None,
+            "dosage_form": None, "unit": None, "avg_cost": 0, "last_purchase_rate": 0,
+            "item_code": item_code, "barcode": barcode}
+
+
+MEDS = [
+    med(1, "Paracetamol 500", "Acetaminophen", "890111"),
+    med(2, "Paracip", "Paracetamol", "890222"),
+    med(3, "Pantop 40", "Pantoprazole", None),
+]
+
+
+class TestPrefixCache(unittest.TestCase):
+    def test_exact_hit(self):
+        cache = PrefixCache(medicine_matches, page_limit=20)
+        cache.put("Pa", MEDS)
+        self.assertEqual(cache.get("pa"), MEDS)
+
+    def test_narrows_complete_superset(self):
+        cache = PrefixCache(medicine_matches, page_limit=20)
+        cache.put("pa", MEDS)
+        self.assertEqual([m["id"] for m in cache.get("paracetamol")], [1, 2])
+
+    def test_empty_narrowing_of_complete_superset(self):
+        cache = PrefixCache(medicine_matches, page_limit=20)
+        cache.put("pa", MEDS)
+        self.assertEqual(cache.get("pax"), [])
+
+    def test_truncated_superset_goes_to_server(self):
+        cache = PrefixCache(medicine_matches, page_limit=3)
+        cache.put("pa", MEDS)
+        self.assertIsNone(cache.get("par"))
+
+    def test_digit_queries_not_narrowed(self):
+        cache = PrefixCache(medicine_matches, page_limit=20)
+        cache.put("89", MEDS)
+        self.assertIsNone(cache.get("890111"))
+
+    def test_lru_eviction(self):
+        cache = PrefixCache(medicine_matches, max_entries=2)
+        cache.put("aa", [])
+        cache.put("bb", [])
+        cache.get("aa")
+        cache.put("cc", [])
+        self.assertIsNone(cache.get("bb"))
+        self.assertEqual(cache.get("aa"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
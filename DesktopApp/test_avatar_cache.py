@@ -0,0 +1,58 @@
+import base64
+import io
+import unittest
+
+from PIL import Image
+
+from avatar_cache import AvatarCache, render_circle
+
+
+def picture(color):
+    buf = io.BytesIO()
+    Image.new("RGB", (120, 80), color).save(buf, "PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+class TestAvatarCache(unittest.TestCase):
+    def setUp(self):
+        self.renders = []
+
+        def counting_render(b64, size, color):
+            self.renders.append((size, color))
+            return render_circle(b64, size, color)
+
+        self.cache = AvatarCache(maxsize=2, render=counting_render)
+
+    def test_same_picture_decoded_once(self):
+        pic = picture("red")
+        first = self.cache.get(pic, (65, 65), "#38bdf8")
+        self.assertIs(self.cache.get(pic, (65, 65), "#000000"), first)  # colour ignored for pictures
+        self.assertEqual(len(self.renders), 1)
+        self.cache.get(pic, (140, 140))
+        self.assertEqual(len(self.renders), 2)
+
+    def test_placeholders_keyed_by_colour(self):
+        a = self.cache.get(None, (40, 40), "#10b981")
+        self.assertIsNot(self.cache.get(None, (40, 40), "#ef4444"), a)
+        self.assertIs(self.cache.get(None, (40, 40), "#10b981"), a)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_least_recently_used_is_evicted(self):
+        a, b, c = picture("red"), picture("green"), picture("blue")
+        self.cache.get(a)
+        self.cache.get(b)
+        self.cache.get(a)  # a is now the most recent
+        self.cache.get(c)
+        self.assertEqual(len(self.cache), 2)
+        self.cache.get(a)
+        self.assertEqual(len(self.renders), 3)  # a survived, b was dropped
+
+    def test_render_is_circular(self):
+        img = render_circle(picture("red"), (60, 60))
+        self.assertEqual(img.size, (60, 60))
+        self.assertEqual(img.getpixel((0, 0))[3], 0)
+        self.assertEqual(img.getpixel((30, 30))[:3], (255, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
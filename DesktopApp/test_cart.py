@@ -0,0 +1,47 @@
+import unittest
+
+from cart import Cart
+
+
+def line(stock_id, rate, qty=1):
+    return {"id": stock_id, "medicine_id": stock_id, "name": f"Item {stock_id}", "batch": "B1",
+            "expiry": "2027-01-01", "rate": rate, "qty": qty}
+
+
+class TestCart(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.cart = Cart(on_change=lambda kind, l: self.events.append((kind, l['id'])))
+
+    def test_running_total(self):
+        self.cart.add(line(1, 10.5, 2))
+        self.cart.add(line(2, 3.25))
+        self.assertEqual(self.cart.total, 24.25)
+        self.cart.set_qty(1, 1)
+        self.assertEqual(self.cart.total, 13.75)
+        self.cart.remove(2)
+        self.assertEqual(self.cart.total, 10.5)
+
+    def test_same_batch_merges_into_one_row(self):
+        self.cart.add(line(1, 5.0))
+        self.cart.add(line(1, 5.0, 3))
+        self.assertEqual(len(self.cart), 1)
+        self.assertEqual(self.cart.get(1)['qty'], 4)
+        self.assertEqual(self.events, [("add", 1), ("update", 1)])
+
+    def test_zero_qty_removes(self):
+        self.cart.add(line(1, 5.0))
+        self.cart.set_qty(1, 0)
+        self.assertEqual(self.cart.items, [])
+        self.assertEqual(self.cart.total, 0)
+        self.assertEqual(self.events[-1], ("remove", 1))
+
+    def test_items_keep_insertion_order(self):
+        for stock_id in (3, 1, 2):
+            self.cart.add(line(stock_id, 1.0))
+        self.cart.remove(1)
+        self.assertEqual([l['id'] for l in self.cart.items], [3, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from datetime import datetime, timedelta
+
+from clock_service import ClockService
+
+
+class FakeVar:
+    def __init__(self):
+        self.sets = []
+
+    def set(self, value):
+        self.sets.append(value)
+
+
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+        self.window_state = "normal"
+
+    def after(self, ms, fn):
+        self.scheduled.append((ms, fn))
+
+    def state(self):
+        return self.window_state
+
+    def run_next(self, fn_name):
+        for i, (ms, fn) in enumerate(self.scheduled):
+            if fn.__name__ == fn_name:
+                return self.scheduled.pop(i)
+
+
+class TestClockService(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime(2025, 1, 1, 23, 59, 58, 250000)
+        self.root = FakeRoot()
+        self.var = FakeVar()
+        self.days = []
+        self.clock = ClockService(self.root, self.var, self.days.append, now=lambda: self.now)
+        self.clock.start()
+
+    def test_date_computed_once_per_day(self):
+        for _ in range(3):
+            self.now += timedelta(seconds=1)
+            self.root.run_next("_tick")[1]()
+        self.assertEqual([d.date() for d in self.days], [datetime(2025, 1, 1).date(), datetime(2025, 1, 2).date()])
+        self.assertEqual(len(self.var.sets), 4)
+
+    def test_ticks_align_to_second_and_midnight_is_scheduled(self):
+        self.assertEqual(self.root.run_next("_tick")[0], 750)
+        self.assertEqual(self.root.run_next("_on_midnight")[0], 1750 + 50)
+
+    def test_minimized_window_skips_time_updates(self):
+        self.root.window_state = "iconic"
+        self.now += timedelta(seconds=1)
+        self.root.run_next("_tick")[1]()
+        self.assertEqual(len(self.var.sets), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
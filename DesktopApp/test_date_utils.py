@@ -0,0 +1,37 @@
+import unittest
+from datetime import date, datetime
+
+import pandas as pd
+
+from date_utils import DateUtils
+
+
+class TestDateUtils(unittest.TestCase):
+    def test_scalar_round_trip(self):
+        bs = DateUtils.ad_to_bs("2024-04-13")
+        self.assertEqual(bs, "2081-01-01")
+        self.assertEqual(DateUtils.bs_to_ad(bs), "2024-04-13")
+
+    def test_accepts_timestamps_and_date_objects(self):
+        self.assertEqual(DateUtils.ad_to_bs("2024-04-13T10:15:00.000Z"), "2081-01-01")
+        self.assertEqual(DateUtils.ad_to_bs(datetime(2024, 4, 13, 10, 15)), "2081-01-01")
+        self.assertEqual(DateUtils.ad_to_bs(date(2024, 4, 13)), "2081-01-01")
+
+    def test_many_on_list(self):
+        self.assertEqual(DateUtils.ad_to_bs_many(["2024-04-13", "", "2024-04-13"]), ["2081-01-01", "", "2081-01-01"])
+        self.assertEqual(DateUtils.bs_to_ad_many(["2081-01-01"]), ["2024-04-13"])
+
+    def test_many_missing_values_on_list(self):
+        self.assertEqual(DateUtils.ad_to_bs_many(["2024-04-13", float("nan"), None]), ["2081-01-01", "", ""])
+        self.assertEqual(DateUtils.bs_to_ad_many([float("nan"), "2081-01-01"]), ["", "2024-04-13"])
+
+    def test_many_on_series(self):
+        s = pd.Series(["2024-04-13T00:00:00Z", None, "2024-04-14"])
+        self.assertEqual(list(DateUtils.ad_to_bs_many(s)), ["2081-01-01", "", "2081-01-02"])
+
+    def test_invalid_input_falls_back(self):
+        self.assertEqual(DateUtils.bs_to_ad("2081-13-40"), "2081-13-40")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from grn_import import (MedicineMatcher, parse_expiry, purchase_items, rows_from_distributor_file,
+                        rows_from_extract)
+
+
+MEDICINES = [
+    {"id": 1, "name": "Paracetamol", "strength": "500mg", "barcode": "8901"},
+    {"id": 2, "name": "Amoxicillin", "strength": "250mg"},
+    {"id": 3, "name": "Azithromycin", "strength": "500mg", "mrp": 120},
+    {"id": 4, "name": "Cetirizine"},
+]
+
+
+class TestMedicineMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = MedicineMatcher(MEDICINES)
+
+    def test_exact_name_and_code(self):
+        self.assertEqual(self.matcher.match("PARACETAMOL")[0]["id"], 1)
+        self.assertEqual(self.matcher.match("anything", code="8901"), (MEDICINES[0], 1.0))
+
+    def test_fuzzy_name_with_strength_and_typo(self):
+        self.assertEqual(self.matcher.match("Azithromicin 500 mg")[0]["id"], 3)
+        self.assertEqual(self.matcher.match("Amoxycillin")[0]["id"], 2)
+
+    def test_unrelated_name_is_unmatched(self):
+        med, score = self.matcher.match("Omeprazole")
+        self.assertIsNone(med)
+        self.assertLess(score, self.matcher.threshold)
+
+
+class TestRowsFromExtract(unittest.TestCase):
+    def test_maps_values_and_keeps_unmatched_name(self):
+        rows = rows_from_extract([
+            ["1", "Azithromycin 500mg", "AZ1", "2027/03", "10", "", "1,050.00"],
+            ["2", "Unknown Syrup", "U1", "2082-04-15", "5", "30", "150"],
+        ], MedicineMatcher(MEDICINES))
+        self.assertEqual(rows[0]["medicine_id"], 3)
+        self.assertEqual((rows[0]["expiry"], rows[0]["exp_fmt"]), ("2027-03-01", "AD"))
+        self.assertEqual(rows[0]["rate"], 105.0)
+        self.assertEqual(rows[0]["mrp"], 120.0)
+        self.assertEqual(rows[1]["medicine_id"], 0)
+        self.assertEqual(rows[1]["name"], "Unknown Syrup")
+        self.assertEqual(rows[1]["exp_fmt"], "BS")
+
+    def test_parse_expiry_formats(self):
+        self.assertEqual(parse_expiry("01/27"), ("2027-01-01", "AD"))
+        self.assertEqual(parse_expiry("2081.5"), ("2081-05-01", "BS"))
+        self.assertEqual(parse_expiry("soon"), ("", "BS"))
+
+
+CSV = """ABC Distributors Pvt. Ltd.
+Invoice No: 771
+S.N,Item Name,Batch No,Exp Date,Qty,Free,Rate,MRP,Disc%
+1,PARACETAMOL 500MG,P1,2028/01,100,10,1.5,2.5,5
+2,Amoxicilin 250mg,A9,2024/01,20,0,8,12,0
+3,Paracetamol 500mg,P2,2081-05-15,50,0,1.5,,0
+4,Unknown Syrup,U1,2028/01,5,0,50,80,0
+,,,,,,,,
+"""
+
+
+def fake_to_ad(bs):
+    return "2024-08-31" if bs.startswith("2081") else bs
+
+
+class TestDistributorFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.matcher = MedicineMatcher(MEDICINES)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, path):
+        return rows_from_distributor_file(path, self.matcher, today=date(2025, 1, 1), to_ad=fake_to_ad)
+
+    def write_csv(self):
+        path = os.path.join(self.tmp.name, "invoice.csv")
+        with open(path, "w", newline="") as f:
+            f.write(CSV)
+        return path
+
+    def test_csv_header_found_and_lines_validated(self):
+        rows = self.read(self.write_csv())
+        self.assertEqual([r['line'] for r in rows], [4, 5, 6, 7])
+        self.assertEqual(rows[0]['medicine_id'], 1)
+        self.assertEqual((rows[0]['free'], rows[0]['disc'], rows[0]['expiry']), (10, 5.0, "2028-01-01"))
+        self.assertEqual(rows[0]['issues'], [])
+        self.assertEqual(rows[1]['issues'], ["expired"])           # 2024/01 AD
+        self.assertEqual(rows[2]['issues'], ["expired"])           # BS date converted first
+        self.assertIn("no matching product", rows[3]['issues'])
+
+    def test_xlsx_streams_the_same_rows(self):
+        from openpyxl import Workbook
+        path = os.path.join(self.tmp.name, "invoice.xlsx")
+        wb = Workbook()
+        for line in CSV.splitlines():
+            wb.active.append(line.split(","))
+        wb.active.append(["5", "Cetirizine", "C1", date(2029, 3, 1), 30, 0, 2, 4, 0])
+        wb.save(path)
+        rows = self.read(path)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual((rows[-1]['medicine_id'], rows[-1]['expiry'], rows[-1]['exp_fmt']), (4, "2029-03-01", "AD"))
+
+    def test_purchase_items_totals(self):
+        rows = [r for r in self.read(self.write_csv()) if not r['issues']]
+        items, totals = purchase_items(rows, to_ad=fake_to_ad)
+        self.assertEqual(items[0]['discount_amount'], 7.5)
+        self.assertAlmostEqual(items[0]['line_total'], 142.5 * 1.13, delta=0.006)
+        self.assertEqual(totals['grand_total'], items[0]['line_total'])
+
+    def test_month_only_expiry_is_valid_through_the_month(self):
+        path = os.path.join(self.tmp.name, "month.csv")
+        with open(path, "w", newline="") as f:
+            f.write("Item Name,Batch,Expiry,Qty,Rate\n"
+                    "Cetirizine,C1,2025/01,10,2\nCetirizine,C2,01/25,10,2\n"
+                    "Cetirizine,C3,2024/12,10,2\nCetirizine,C4,2025-01-15,10,2\n")
+        rows = rows_from_distributor_file(path, self.matcher, today=date(2025, 1, 15), to_ad=fake_to_ad)
+        self.assertEqual([r['issues'] for r in rows], [[], [], ["expired"], ["expired"]])
+
+    def test_vat_column_overrides_the_default(self):
+        path = os.path.join(self.tmp.name, "vat.csv")
+        with open(path, "w", newline="") as f:
+            f.write("Item Name,Batch,Expiry,Qty,Rate,VAT\n"
+                    "Cetirizine,C1,2028/01,10,10,13%\nCetirizine,C2,2028/01,10,10,Exempt\nCetirizine,C3,2028/01,10,10,\n")
+        rows = self.read(path)
+        self.assertEqual([r['vat'] for r in rows], [True, False, None])
+        items, totals = purchase_items(rows, to_ad=fake_to_ad, vat=False)
+        self.assertEqual([i['tax_amount'] for i in items], [13.0, 0.0, 0.0])
+        items, totals = purchase_items(rows, to_ad=fake_to_ad, vat=True)
+        self.assertEqual(totals['tax_total'], 26.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from grn_totals import GRNTotals
+
+
+def naive(lines):
+    sub = disc = tax = 0.0
+    for qty, rate, d, vat in lines:
+        base = qty * rate
+        sub += base
+        disc += base * d / 100
+        tax += (base - base * d / 100) * 0.13 if vat else 0
+    return sub, disc, tax
+
+
+class TestGRNTotals(unittest.TestCase):
+    def test_incremental_matches_full_sum(self):
+        totals = GRNTotals(capacity=4)  # forces the arrays to grow
+        lines = [(i % 7 + 1, 10.5 + i, i % 3 * 5, i % 2 == 0) for i in range(150)]
+        slots = [totals.add(*line) for line in lines]
+        totals.update(slots[10], qty=40)
+        lines[10] = (40,) + lines[10][1:]
+        totals.update(slots[20], vat=False)
+        lines[20] = lines[20][:3] + (False,)
+        totals.remove(slots[30])
+        del lines[30]
+
+        sub, disc, tax = naive(lines)
+        self.assertAlmostEqual(totals.subtotal, sub, places=6)
+        self.assertAlmostEqual(totals.discount, disc, places=6)
+        self.assertAlmostEqual(totals.tax, tax, places=6)
+        self.assertEqual(len(totals), 149)
+
+        incremental = (totals.subtotal, totals.discount, totals.tax)
+        totals.recompute()
+        for a, b in zip(incremental, (totals.subtotal, totals.discount, totals.tax)):
+            self.assertAlmostEqual(a, b, places=6)
+
+    def test_line_total_and_amounts(self):
+        totals = GRNTotals()
+        slot = totals.add(qty=10, rate=100, disc=10, vat=True)
+        self.assertAlmostEqual(totals.line_total(slot), 1017.0)
+        self.assertAlmostEqual(totals.update(slot, disc=0), 1130.0)
+        disc, tax, line = totals.amounts([slot])
+        self.assertEqual((disc[0], round(tax[0], 2), round(line[0], 2)), (0.0, 130.0, 1130.0))
+        self.assertEqual(totals.summary(), {"subtotal": 1000.0, "discount_total": 0.0,
+                                            "tax_total": 130.0, "grand_total": 1130.0})
+
+    def test_remove_is_idempotent(self):
+        totals = GRNTotals()
+        slot = totals.add(qty=2, rate=5, vat=False)
+        totals.remove(slot)
+        totals.remove(slot)
+        self.assertEqual(totals.summary()["grand_total"], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
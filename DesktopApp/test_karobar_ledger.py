@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+from openpyxl import load_workbook
+
+from karobar_ledger import StatementLedger, export_ledger_xlsx
+
+
+def entry(i, type_, amount):
+    return {"id": i, "created_at": "2025-01-0%dT04:00:00.000Z" % (i % 9 + 1), "type": type_, "amount": amount,
+            "bank_name": "NIC Asia", "category_name": "Misc", "reference_no": f"R{i}", "performed_by_name": "Ram"}
+
+
+ENTRIES = [entry(1, "IN", 1000), entry(2, "OUT", 250), entry(3, "IN", 50), entry(4, "OUT", 300), entry(5, "IN", 10)]
+
+
+def fake_statements(opening=500):
+    """/karobar/statements in ledger mode over ENTRIES"""
+    calls = []
+
+    def fetch_page(cursor, limit):
+        calls.append(cursor)
+        start = cursor or 0
+        page = {"rows": [dict(e) for e in ENTRIES[start:start + limit]],
+                "next_cursor": start + limit if start + limit < len(ENTRIES) else None}
+        if cursor is None:
+            page["opening_balance"] = opening
+        return page
+    fetch_page.calls = calls
+    return fetch_page
+
+
+class TestStatementLedger(unittest.TestCase):
+    def test_balance_carries_across_pages(self):
+        fetch, ledger = fake_statements(), StatementLedger()
+        page1 = ledger.add_page(fetch(None, 2))
+        page2 = ledger.add_page(fetch(2, 2))
+        self.assertEqual([r['running_balance'] for r in page1], [1500, 1250])
+        self.assertEqual([r['running_balance'] for r in page2], [1300, 1000])
+        self.assertEqual((page2[1]['in_amount'], page2[1]['out_amount']), (None, 300))
+        self.assertEqual((ledger.opening, ledger.total_in, ledger.total_out, ledger.closing), (500, 1050, 550, 1000))
+
+    def test_export_streams_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ledger.xlsx")
+            fetch = fake_statements()
+            ledger = export_ledger_xlsx(path, fetch, to_bs=lambda d: "2081-09-" + d[-2:], limit=2)
+            self.assertEqual(fetch.calls, [None, 2, 4])
+            rows = list(load_workbook(path, read_only=True).active.iter_rows(values_only=True))
+        self.assertEqual(rows[1][1:7], ("Opening Balance", None, None, None, None, 500))
+        self.assertEqual(rows[2][0], "2081-09-02")
+        self.assertEqual(rows[-1][4:7], (1060, 550, ledger.closing))
+        self.assertEqual(len(rows), 1 + 1 + 5 + 1)
+
+    def test_filtered_export_has_no_balance(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ledger.xlsx")
+            ledger = export_ledger_xlsx(path, fake_statements(), limit=2, running=False)
+            rows = list(load_workbook(path, read_only=True).active.iter_rows(values_only=True))
+        self.assertIsNone(ledger.closing)
+        self.assertEqual({r[6] for r in rows[2:-1]}, {None})
+        self.assertEqual(rows[-1][1:7], ("Filtered Totals", None, None, 1060, 550, None))
+
+    def test_cancelled_export_writes_nothing(self):
+        class Cancelled:
+            cancelled = True
+
+            def __call__(self, value):
+                pass
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ledger.xlsx")
+            self.assertIsNone(export_ledger_xlsx(path, fake_statements(), progress=Cancelled(), limit=2))
+            self.assertFalse(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
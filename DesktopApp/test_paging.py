@@ -0,0 +1,78 @@
+import unittest
+
+from paging import CursorPager
+
+
+class ManualTasks:
+    """TaskRunner stand-in that runs a job only when the test says so"""
+
+    def __init__(self):
+        self.pending = []
+        self.cancelled = []
+
+    def submit(self, fn, *args, on_success=None, on_error=None, key=None, owner=None):
+        self.pending.append((fn, args, on_success, on_error))
+
+    def cancel(self, key):
+        self.cancelled.append(key)
+        self.pending.clear()
+
+    def run_next(self):
+        fn, args, on_success, on_error = self.pending.pop(0)
+        try:
+            result = fn(*args)
+        except Exception as e:
+            on_error(e)
+        else:
+            on_success(result)
+
+
+BILLS = list(range(250, 0, -1))  # newest id first
+
+
+def fetch_page(cursor, limit):
+    rows = [i for i in BILLS if cursor is None or i < cursor][:limit]
+    more = rows and rows[-1] != BILLS[-1]
+    return rows, (rows[-1] if more else None)
+
+
+class TestCursorPager(unittest.TestCase):
+    def setUp(self):
+        self.tasks = ManualTasks()
+        self.pages = []
+        self.pager = CursorPager(self.tasks, fetch_page, lambda rows, first: self.pages.append((rows, first)),
+                                 key="bill_log", page_size=100)
+
+    def test_walks_pages_until_exhausted(self):
+        while self.pager.load_more():
+            self.tasks.run_next()
+        self.assertEqual([len(rows) for rows, _ in self.pages], [100, 100, 50])
+        self.assertEqual([first for _, first in self.pages], [True, False, False])
+        self.assertEqual(self.pages[1][0][0], 150)
+        self.assertEqual(self.pager.loaded, 250)
+
+    def test_only_one_request_in_flight(self):
+        self.assertTrue(self.pager.load_more())
+        self.assertFalse(self.pager.load_more())
+        self.assertEqual(len(self.tasks.pending), 1)
+
+    def test_reset_cancels_and_restarts(self):
+        self.pager.load_more()
+        self.pager.reset()
+        self.assertEqual(self.tasks.cancelled, ["bill_log"])
+        self.pager.load_more()
+        self.tasks.run_next()
+        self.assertEqual(self.pages, [(BILLS[:100], True)])
+
+    def test_error_allows_retry(self):
+        errors = []
+        pager = CursorPager(self.tasks, lambda c, l: 1 / 0, lambda rows, first: None,
+                            key="k", on_error=errors.append)
+        pager.load_more()
+        self.tasks.run_next()
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+        self.assertTrue(pager.load_more())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from pdf_extractor import InvoiceExtractor, extract_folder
+
+
+COLS = [40, 70, 220, 290, 350, 400, 460]
+
+
+def supplier_invoice(path, inv_no, rows_per_page=(3, 2)):
+    """A minimal AARAMBHA_A4_V1 invoice; only the first page carries the column header"""
+    c = canvas.Canvas(path, pagesize=A4)
+    sn = 0
+    for page_no, count in enumerate(rows_per_page):
+        y = 800
+        c.setFont("Helvetica", 9)
+        c.drawString(40, y, f"TEMPLATE_ID:AARAMBHA_A4_V1 INV_NO:{inv_no}")
+        y -= 14
+        c.drawString(40, y, "DATE:2082-01-15")
+        y -= 30
+        if page_no == 0:
+            for x, title in zip(COLS, ["SN", "Product", "Batch", "Exp", "Qty", "Rate", "Amount"]):
+                c.drawString(x, y, title)
+            y -= 16
+        for _ in range(count):
+            sn += 1
+            values = [sn, f"Paracetamol{sn}", f"B{sn}", "2027/01", 10, "2.50", "25.00"]
+            for x, value in zip(COLS, values):
+                c.drawString(x, y, str(value))
+            y -= 16
+        c.drawString(350, y - 20, "Grand Total: 999.00")
+        c.showPage()
+    c.save()
+
+
+class TestInvoiceExtractor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_items_from_every_page(self):
+        path = os.path.join(self.tmp.name, "a.pdf")
+        supplier_invoice(path, "S-1")
+        data = InvoiceExtractor(path).extract()
+        self.assertEqual(data["invoice_no"], "S-1")
+        self.assertEqual(data["pages"], 2)
+        self.assertEqual([row[0] for row in data["items"]], ["1", "2", "3", "4", "5"])
+        self.assertEqual(data["items"][3][1], "Paracetamol4")
+
+    def test_folder_streams_a_result_per_file(self):
+        for n in range(3):
+            supplier_invoice(os.path.join(self.tmp.name, f"{n}.pdf"), f"S-{n}", rows_per_page=(2,))
+        results = dict(extract_folder(self.tmp.name, workers=2))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(sorted(r["invoice_no"] for r in results.values()), ["S-0", "S-1", "S-2"])
+        self.assertTrue(all(len(r["items"]) == 2 for r in results.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
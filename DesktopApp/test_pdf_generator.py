@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+from pdf_generator import generate_invoice, generate_invoices, invoice_filename
+
+
+def invoice(n, items=3):
+    return {
+        "bill_number": f"INV-{n}", "invoice_date": "2082-10-01", "pharmacy_name": "Hamro Pharmacy",
+        "pharmacy_address": "Kathmandu", "pan_number": "123", "customer_name": "Ram", "sold_by": "Sita",
+        "items": [{"name": f"Med {i}", "batch": "B1", "expiry": "2027/01", "rate": 2.5, "qty": 2} for i in range(items)],
+        "total_amount": 5.0 * items, "grand_total": 5.0 * items,
+    }
+
+
+class TestPdfGenerator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_header_is_one_form_reused_across_pages(self):
+        path = os.path.join(self.tmp.name, "long.pdf")
+        generate_invoice(invoice(1, items=40), path)
+        with open(path, "rb") as f:
+            pdf = f.read()
+        # Several pages, but the header and footer are each stored once
+        self.assertGreater(pdf.count(b"/Type /Page\n"), 1)
+        self.assertEqual(pdf.count(b"/Subtype /Form"), 2)
+
+    def test_batch_writes_every_invoice_and_reports_progress(self):
+        seen = []
+        written, failed = generate_invoices([invoice(n) for n in range(5)], self.tmp.name,
+                                            workers=2, progress=seen.append)
+        self.assertEqual(failed, [])
+        self.assertEqual(sorted(os.path.basename(p) for p in written),
+                         sorted(invoice_filename(invoice(n)) for n in range(5)))
+        self.assertEqual([done for done, total, _, _ in seen], [1, 2, 3, 4, 5])
+        self.assertTrue(all(total == 5 for _, total, _, _ in seen))
+
+    def test_filename_from_invoice_date(self):
+        self.assertEqual(invoice_filename({"bill_number": "PRV-AB-000001", "invoice_date": "2082-10-01"}),
+                         "PRV-AB-000001_20821001.pdf")
+
+
+if __name__ == '__main__':
+    unittest.main()
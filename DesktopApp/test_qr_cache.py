@@ -0,0 +1,65 @@
+import io
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from qr_cache import QRImageCache
+
+
+def png(color="black", size=(800, 800)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, "PNG")
+    return buf.getvalue()
+
+
+class TestQRImageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = QRImageCache(self.tmp.name)
+        self.method = {"id": 7, "name": "eSewa", "updated_at": "2025-01-01T10:00:00Z"}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_store_prescales_every_size(self):
+        self.assertIsNone(self.cache.pil_image(self.method))
+        self.cache.store(self.method, '"abc"', png())
+        self.assertEqual(self.cache.pil_image(self.method, "preview").size, (200, 200))
+        self.assertEqual(self.cache.pil_image(self.method, "fullscreen").size, (500, 500))
+
+    def test_survives_restart_until_method_changes(self):
+        self.cache.store(self.method, '"abc"', png())
+        reopened = QRImageCache(self.tmp.name)
+        self.assertEqual(reopened.pil_image(self.method).size, (200, 200))
+
+        renamed = dict(self.method, updated_at="2025-02-01T10:00:00Z")
+        self.assertIsNone(reopened.pil_image(renamed))
+        self.assertEqual(reopened.known_etag(renamed), '"abc"')
+        reopened.touch(renamed)  # 304 from the server
+        self.assertIsNotNone(reopened.pil_image(renamed))
+
+    def test_invalidate_and_replace(self):
+        self.cache.store(self.method, '"abc"', png())
+        self.cache.invalidate(7)
+        self.assertIsNone(self.cache.pil_image(self.method))
+        self.assertIsNone(self.cache.known_etag(self.method))
+
+        self.cache.store(self.method, '"def"', png("red", (300, 300)))
+        self.assertEqual(self.cache.pil_image(self.method, "fullscreen").size, (300, 300))
+
+    def test_missing_files_drop_the_entry(self):
+        self.cache.store(self.method, '"abc"', png())
+        reopened = QRImageCache(self.tmp.name)  # nothing in memory yet
+        for name in os.listdir(self.tmp.name):
+            if name.endswith(".png"):
+                os.remove(os.path.join(self.tmp.name, name))
+        self.assertTrue(reopened.fresh(self.method))
+        self.assertIsNone(reopened.pil_image(self.method))
+        self.assertFalse(reopened.fresh(self.method))
+        self.assertIsNone(reopened.known_etag(self.method))  # next request has no If-None-Match
+
+
+if __name__ == '__main__':
+    unittest.main()
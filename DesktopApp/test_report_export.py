@@ -0,0 +1,88 @@
+import csv
+import os
+import tempfile
+import unittest
+
+import pdfplumber
+from openpyxl import load_workbook
+
+from report_export import export_report, paged_rows
+
+
+def sale(i):
+    return {"created_at": "2025-01-02T05:00:00.000Z", "pharmacy_name": "City Pharmacy", "bill_number": f"B{i}",
+            "cashier_name": "Ram", "total_amount": i, "grand_total": i, "payment_category": "CASH"}
+
+
+class FakeCursorApi:
+    def __init__(self, total):
+        self.total = total
+        self.pages = 0
+
+    def __call__(self, cursor, limit):
+        self.pages += 1
+        start = cursor or 0
+        rows = [sale(i) for i in range(start, min(start + limit, self.total))]
+        nxt = start + limit if start + limit < self.total else None
+        return rows, nxt
+
+
+class Recorder:
+    def __init__(self, cancel_after=None):
+        self.calls = []
+        self.cancel_after = cancel_after
+
+    def __call__(self, value):
+        self.calls.append(value)
+
+    @property
+    def cancelled(self):
+        return self.cancel_after is not None and len(self.calls) >= self.cancel_after
+
+
+class TestReportExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_csv_from_paged_cursor(self):
+        api, progress = FakeCursorApi(2500), Recorder()
+        n = export_report(self.path("r.csv"), "Sales Summary", paged_rows(api, 1000),
+                          to_bs=lambda d: "2081-09-18", progress=progress)
+        self.assertEqual((n, api.pages), (2500, 3))
+        with open(self.path("r.csv"), encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0][:3], ["Date", "Pharmacy", "Bill No"])
+        self.assertEqual(rows[1][0], "2081-09-18")
+        self.assertEqual(progress.calls[-1], (2500, None))
+
+    def test_xlsx_write_only(self):
+        export_report(self.path("r.xlsx"), "Sales Summary", (sale(i) for i in range(50)))
+        ws = load_workbook(self.path("r.xlsx"), read_only=True).active
+        rows = list(ws.iter_rows(values_only=True))
+        self.assertEqual(len(rows), 51)
+        self.assertEqual(rows[1][0], "2025-01-02")
+
+    def test_pdf_is_chunked_and_repeats_header(self):
+        export_report(self.path("r.pdf"), "Sales Summary", (sale(i) for i in range(120)), chunk=25)
+        with pdfplumber.open(self.path("r.pdf")) as pdf:
+            self.assertGreater(len(pdf.pages), 1)
+            for page in pdf.pages:
+                self.assertIn("Bill No", page.extract_text())
+            text = "\n".join(p.extract_text() for p in pdf.pages)
+        self.assertIn("B119", text)
+
+    def test_cancel_removes_partial_file(self):
+        result = export_report(self.path("r.csv"), "Sales Summary", paged_rows(FakeCursorApi(5000), 1000),
+                               progress=Recorder(cancel_after=1))
+        self.assertIsNone(result)
+        self.assertFalse(os.path.exists(self.path("r.csv")))
+
+
+if __name__ == '__main__':
+    unittest.main()
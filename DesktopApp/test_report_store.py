@@ -0,0 +1,110 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from report_store import ReportStore
+
+
+def sale(i, day, amount, payment="CASH", cashier=(1, "Ram")):
+    return {"id": i, "bill_number": f"B{i}", "day": day, "created_at": f"{day}T10:00:00.000Z",
+            "customer_name": "Walk-in", "payment_category": payment, "cashier_id": cashier[0],
+            "cashier_name": cashier[1], "amount": amount, "discount": 0}
+
+
+SALES = [
+    sale(1, "2025-01-01", 100), sale(2, "2025-01-01", 50, "QR"),
+    sale(3, "2025-01-02", 200, cashier=(2, "Sita")), sale(4, "2025-01-03", 10),
+]
+ITEMS = [
+    {"sale_id": 1, "medicine_id": 7, "name": "Paracetamol", "batch_number": "P1", "qty": 10, "amount": 100},
+    {"sale_id": 2, "medicine_id": 7, "name": "Paracetamol", "batch_number": "P1", "qty": 5, "amount": 50},
+    {"sale_id": 3, "medicine_id": 9, "name": "Cetirizine", "batch_number": None, "qty": 20, "amount": 200},
+    {"sale_id": 4, "medicine_id": 7, "name": "Paracetamol", "batch_number": "P2", "qty": 1, "amount": 10},
+]
+
+
+class FakeBackend:
+    def __init__(self, sales, items):
+        self.sales, self.items, self.calls = sales, items, []
+
+    def __call__(self, since_id, limit):
+        self.calls.append(since_id)
+        page = [s for s in self.sales if s['id'] > since_id][:limit]
+        ids = {s['id'] for s in page}
+        return {"sales": page, "items": [i for i in self.items if i['sale_id'] in ids],
+                "has_more": len(page) == limit}
+
+
+class TestReportStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ReportStore(os.path.join(self.tmp.name, "reports.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_sync_is_paged_and_incremental(self):
+        backend = FakeBackend(SALES[:3], ITEMS)
+        self.assertEqual(self.store.sync(backend, limit=2), 3)
+        self.assertEqual(backend.calls, [0, 2])
+        backend.sales = SALES
+        self.assertEqual(self.store.sync(backend, limit=2), 1)
+        self.assertEqual(backend.calls[-1], 3)  # only the delta was asked for
+        self.assertEqual(self.store.last_id, 4)
+
+    def test_reports_over_a_range(self):
+        self.store.sync(FakeBackend(SALES, ITEMS))
+        summary = self.store.sales_summary("2025-01-01", "2025-01-02")
+        self.assertEqual([(r['date'], r['count'], r['total_sales']) for r in summary],
+                         [("2025-01-02", 1, 200.0), ("2025-01-01", 2, 150.0)])
+        self.assertEqual([r['bill_number'] for r in self.store.invoices("2025-01-02", "2025-01-03")], ["B4", "B3"])
+
+        items = self.store.items("2025-01-01", "2025-01-03")
+        self.assertEqual([(r['name'], r['batch_number'], r['qty'], r['total_amount']) for r in items],
+                         [("Cetirizine", "", 20, 200.0), ("Paracetamol", "P1", 15, 150.0), ("Paracetamol", "P2", 1, 10.0)])
+
+        by_cashier = self.store.breakdown("cashier_name", "2025-01-01", "2025-01-03")
+        self.assertEqual([(r['cashier_name'], r['count']) for r in by_cashier], [("Sita", 1), ("Ram", 3)])
+
+    def test_reset_forces_full_resync(self):
+        backend = FakeBackend(SALES, ITEMS)
+        self.store.sync(backend)
+        self.store.reset()
+        self.assertEqual(self.store.last_id, 0)
+        self.store.sync(backend)
+        self.assertEqual(self.store.items("2025-01-01", "2025-01-01")[0]['qty'], 15)  # not double counted
+
+    def test_unnamed_medicine_gets_a_label(self):
+        items = [dict(ITEMS[0], name=None)]
+        self.store.sync(FakeBackend(SALES[:1], items))
+        self.assertEqual(self.store.items("2025-01-01", "2025-01-01")[0]['name'], "Item #7")
+
+    def test_overlapping_syncs_count_items_once(self):
+        backend = FakeBackend(SALES[:1], [dict(ITEMS[0], qty=2, amount=100)])
+        both_fetched = threading.Barrier(2, timeout=0.5)
+
+        def fetch(since_id, limit):
+            page = backend(since_id, limit)
+            try:
+                both_fetched.wait()  # without the sync lock both threads hold the same page here
+            except threading.BrokenBarrierError:
+                pass
+            return page
+
+        threads = [threading.Thread(target=self.store.sync, args=(fetch,)) for _ in range(2)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        self.assertEqual(self.store.invoices("2025-01-01", "2025-01-01")[0]['bill_number'], "B1")
+        item = self.store.items("2025-01-01", "2025-01-01")[0]
+        self.assertEqual((item['qty'], item['total_amount']), (2, 100.0))
+
+    def test_apply_skips_sales_already_stored(self):
+        self.store.apply(SALES[:2], ITEMS[:2])
+        self.assertEqual(self.store.apply(SALES[:3], ITEMS[:3]), 1)
+        self.assertEqual(self.store.items("2025-01-01", "2025-01-01")[0]['qty'], 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+from sales_journal import SalesJournal, SalesSync
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body or {}
+        self.text = str(self.body)
+
+    def json(self):
+        return self.body
+
+
+class TestSalesJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "journal.db")
+        self.journal = SalesJournal(self.path)
+
+    def tearDown(self):
+        self.journal.close()
+        self.tmp.cleanup()
+
+    def test_record_is_durable_and_numbered(self):
+        key1, prv1 = self.journal.record({"grand_total": 10})
+        key2, prv2 = self.journal.record({"grand_total": 20})
+        self.assertNotEqual(key1, key2)
+        self.assertTrue(prv1.endswith("-000001") and prv2.endswith("-000002"))
+
+        self.journal.close()
+        self.journal = SalesJournal(self.path)
+        self.assertEqual([e['payload']['grand_total'] for e in self.journal.pending()], [10, 20])
+        self.assertTrue(prv1.startswith(f"PRV-{self.journal.terminal_id}-"))
+
+    def test_sync_in_order_and_stop_on_outage(self):
+        for total in (1, 2, 3):
+            self.journal.record({"grand_total": total})
+        responses = [FakeResponse(200, {"bill_number": "INV-1"}), ConnectionError("backend down")]
+        sent = []
+
+        def post(payload, key, token):
+            sent.append((payload['grand_total'], key))
+            r = responses.pop(0)
+            if isinstance(r, Exception):
+                raise r
+            return r
+
+        sync = SalesSync(self.journal, post)
+        self.assertFalse(sync.sync_once())
+        self.assertEqual([t for t, _ in sent], [1, 2])
+        self.assertEqual([e['payload']['grand_total'] for e in self.journal.pending()], [2, 3])
+
+        # Retry re-sends entry 2 with the same idempotency key
+        retry_key = sent[1][1]
+        sent.clear()
+        sync.post = lambda payload, key, token: sent.append(key) or FakeResponse(200, {"bill_number": "INV-2"})
+        self.assertTrue(sync.sync_once())
+        self.assertEqual(sent[0], retry_key)
+        self.assertEqual(self.journal.counts(), {"synced": 3})
+
+    def test_validation_error_is_set_aside(self):
+        self.journal.record({"grand_total": 1})
+        self.journal.record({"grand_total": 2})
+        answers = iter([FakeResponse(400, {"error": "bad"}), FakeResponse(201, {"bill_number": "INV-9"})])
+        sync = SalesSync(self.journal, lambda payload, key, token: next(answers))
+        self.assertTrue(sync.sync_once())
+        self.assertEqual(self.journal.counts(), {"rejected": 1, "synced": 1})
+
+    def test_conflict_adopts_existing_bill(self):
+        key, prv = self.journal.record({"grand_total": 1})
+        self.journal.record({"grand_total": 2})
+        sent = []
+        answers = iter([FakeResponse(409, {"error": "dup"}), FakeResponse(200, {"bill_number": "INV-2"})])
+        lookups = iter([None, "INV-1"])
+
+        def post(payload, k, token):
+            sent.append(payload['provisional_number'])
+            return next(answers)
+
+        sync = SalesSync(self.journal, post, lookup=lambda k, token: next(lookups))
+        # Not committed yet on the server: stays pending and blocks later sales
+        self.assertFalse(sync.sync_once())
+        self.assertEqual(self.journal.counts(), {"pending": 2})
+        self.assertEqual(sent, [prv])
+
+        sync.post = lambda payload, k, token: FakeResponse(409, {"error": "dup"}) if k == key else next(answers)
+        self.assertTrue(sync.sync_once())
+        self.assertEqual(self.journal.counts(), {"synced": 2})
+
+    def test_rejected_can_be_retried_or_resolved(self):
+        key1, _ = self.journal.record({"grand_total": 1})
+        key2, _ = self.journal.record({"grand_total": 2})
+        sync = SalesSync(self.journal, lambda payload, key, token: FakeResponse(422, {"error": "bad batch"}))
+        sync.sync_once()
+        self.assertEqual([e['idempotency_key'] for e in self.journal.rejected()], [key1, key2])
+
+        self.journal.retry(key1)
+        self.journal.resolve(key2, "re-billed")
+        self.assertEqual([e['idempotency_key'] for e in self.journal.pending()], [key1])
+        self.assertEqual(self.journal.counts(), {"pending": 1, "resolved": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+from types import SimpleNamespace
+
+from scan_input import ScanQueue, WedgeDetector
+
+
+class FakeTimers:
+    def __init__(self):
+        self.pending = {}
+        self.next_id = 0
+
+    def after(self, ms, fn):
+        self.next_id += 1
+        self.pending[self.next_id] = fn
+        return self.next_id
+
+    def after_cancel(self, timer_id):
+        self.pending.pop(timer_id, None)
+
+    def fire(self):
+        for timer_id in list(self.pending):
+            self.pending.pop(timer_id)()
+
+
+def key(char, t, keysym=None):
+    return SimpleNamespace(char=char, time=t, keysym=keysym or char, state=0)
+
+
+class TestWedgeDetector(unittest.TestCase):
+    def setUp(self):
+        self.timers = FakeTimers()
+        self.scans, self.typed = [], []
+        self.wedge = WedgeDetector(self.timers.after, self.timers.after_cancel,
+                                   self.scans.append, self.typed.append)
+
+    def type(self, text, start, gap):
+        return [self.wedge.key(key(c, start + i * gap)) for i, c in enumerate(text)]
+
+    def test_fast_burst_with_enter_is_a_scan(self):
+        self.assertEqual(self.type("8901234567890", 1000, 8), ["break"] * 13)
+        self.assertEqual(self.wedge.key(key("\r", 1110, "Return")), "break")
+        self.assertEqual(self.scans, ["8901234567890"])
+        self.assertEqual(self.typed, [])
+
+    def test_burst_without_terminator_settles_as_scan(self):
+        self.type("ABC123", 0, 5)
+        self.timers.fire()
+        self.assertEqual(self.scans, ["ABC123"])
+
+    def test_slow_typing_reaches_the_entry(self):
+        self.type("para", 0, 150)
+        self.timers.fire()
+        self.assertEqual("".join(self.typed), "para")
+        self.assertEqual(self.scans, [])
+        # Enter after typing is left to the entry's own binding
+        self.assertIsNone(self.wedge.key(key("\r", 900, "Return")))
+
+    def test_back_to_back_scans_stay_separate(self):
+        self.type("11112222", 0, 5)
+        self.type("33334444", 500, 5)
+        self.wedge.key(key("\r", 560, "Return"))
+        self.assertEqual(self.scans, ["11112222", "33334444"])
+
+
+class ManualTasks:
+    def __init__(self):
+        self.pending = []
+
+    def submit(self, fn, *args, on_success=None, on_error=None, owner=None):
+        self.pending.append((fn, args, on_success, on_error))
+
+    def finish(self, index=0):
+        fn, args, on_success, _ = self.pending.pop(index)
+        on_success(fn(*args))
+
+
+class TestScanQueue(unittest.TestCase):
+    def test_local_hits_wait_behind_a_remote_lookup(self):
+        tasks, handled = ManualTasks(), []
+        local = {"A": "a", "C": "c"}
+        queue = ScanQueue(tasks, local.get, lambda code: code.lower() + "!",
+                          lambda code, result: handled.append((code, result)))
+        for code in ["A", "B", "C"]:
+            queue.push(code)
+        self.assertEqual(handled, [("A", "a")])
+        self.assertEqual(len(queue), 2)
+        tasks.finish()
+        self.assertEqual(handled, [("A", "a"), ("B", "b!"), ("C", "c")])
+        self.assertEqual(len(queue), 0)
+
+    def test_clear_drops_waiting_and_stale_results(self):
+        tasks, handled = ManualTasks(), []
+        queue = ScanQueue(tasks, lambda code: None, str.lower,
+                          lambda code, result: handled.append((code, result)))
+        queue.push("A")
+        queue.push("B")
+        queue.clear()
+        self.assertEqual(len(queue), 0)
+        tasks.finish()
+        self.assertEqual(handled, [])
+        queue.push("C")
+        tasks.finish()
+        self.assertEqual(handled, [("C", "c")])
+
+
+if __name__ == '__main__':
+    unittest.main()
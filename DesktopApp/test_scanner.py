@@ -0,0 +1,103 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from ScannerModule import FramePipeline, SymbologyRouter, gtin_checksum_ok
+
+
+def frame_with_qr(text, x=700, y=250, size=240):
+    qr = cv2.QRCodeEncoder.create().encode(text)
+    qr = cv2.resize(qr, (size, size), interpolation=cv2.INTER_NEAREST)
+    frame = np.full((720, 1280, 3), 255, np.uint8)
+    frame[y:y + size, x:x + size] = qr[:, :, None]
+    return frame
+
+
+class CountingDecoder:
+    def __init__(self):
+        self.detector = cv2.QRCodeDetector()
+        self.shapes = []
+
+    def __call__(self, gray):
+        self.shapes.append(gray.shape)
+        ok, infos, points, _ = self.detector.detectAndDecodeMulti(gray)
+        return [(t, points[i]) for i, t in enumerate(infos) if t] if ok else []
+
+
+class TestFramePipeline(unittest.TestCase):
+    def setUp(self):
+        self.decoder = CountingDecoder()
+        self.pipeline = FramePipeline([("QR", self.decoder)], detect_width=640)
+
+    def test_decodes_downscaled_grayscale_then_tracks_roi(self):
+        frame = frame_with_qr("8901234567890")
+        self.assertEqual(self.pipeline.process(frame, now=0), "8901234567890")
+        self.assertEqual(self.decoder.shapes[0], (360, 640))  # small and single-channel
+        x0, y0, x1, y1 = self.pipeline.roi
+        self.assertTrue(x0 < 700 < 940 < x1 and y0 < 250 < 490 < y1)
+
+        self.assertEqual(self.pipeline.process(frame, now=1), "8901234567890")
+        h, w = self.decoder.shapes[1]
+        self.assertLess(w * h, 640 * 360)  # only the crop was decoded
+
+    def test_roi_dropped_after_misses(self):
+        self.pipeline.process(frame_with_qr("A1"), now=0)
+        blank = np.full((720, 1280, 3), 255, np.uint8)
+        for i in range(self.pipeline.roi_max_misses):
+            self.assertIsNone(self.pipeline.process(blank, now=i + 1))
+        self.assertIsNone(self.pipeline.roi)
+
+    def test_backs_off_when_idle(self):
+        blank = np.full((720, 1280, 3), 255, np.uint8)
+        for i in range(20):
+            self.pipeline.process(blank, now=0)
+        self.assertEqual(self.pipeline.interval, self.pipeline.max_interval)
+        self.assertFalse(self.pipeline.due(0.1))
+        self.assertTrue(self.pipeline.due(0.5))
+        self.pipeline.process(frame_with_qr("A1"), now=1)
+        self.assertEqual(self.pipeline.interval, self.pipeline.min_interval)
+
+
+class StubDecoder:
+    def __init__(self, results):
+        self.results = results
+        self.calls = 0
+
+    def __call__(self, gray):
+        self.calls += 1
+        return self.results
+
+
+class TestSymbologyRouter(unittest.TestCase):
+    def test_only_configured_decoders_run(self):
+        qr, bar = StubDecoder([]), StubDecoder([("4006381333931", None, "EAN_13")])
+        router = SymbologyRouter([("QR", qr), ("BARCODE", bar)], symbologies=["EAN_13"])
+        self.assertEqual(router.decode(None), ("4006381333931", None))
+        self.assertEqual(qr.calls, 0)
+
+    def test_bad_check_digit_falls_through(self):
+        bar = StubDecoder([("4006381333932", None, "EAN_13")])
+        qr = StubDecoder([("MED-42", None, "QR")])
+        router = SymbologyRouter([("QR", qr), ("BARCODE", bar)], symbologies=["EAN_13", "QR"])
+        self.assertEqual(router.decode(None)[0], "MED-42")
+        self.assertEqual(router.rejected, 1)
+
+    def test_valid_read_stops_early_and_reorders(self):
+        qr, bar = StubDecoder([]), StubDecoder([("96385074", None, "EAN_8")])
+        router = SymbologyRouter([("QR", qr), ("BARCODE", bar)])
+        self.assertEqual(router.order(), ["QR", "BARCODE"])
+        router.decode(None)
+        self.assertEqual(router.order(), ["BARCODE", "QR"])
+        router.decode(None)
+        self.assertEqual(qr.calls, 1)  # second frame exits after the barcode hit
+        self.assertEqual(router.attempts, {"QR": 1, "BARCODE": 2})
+
+    def test_gtin_checksum(self):
+        self.assertTrue(gtin_checksum_ok("4006381333931"))
+        self.assertTrue(gtin_checksum_ok("036000291452"))
+        self.assertFalse(gtin_checksum_ok("4006381333932"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from screen_manager import ScreenManager
+
+
+class FakeWidget:
+    def __init__(self, root=None):
+        self.alive = True
+        self.packed = True
+        self.children = []
+        if root is not None:
+            root.children.append(self)
+
+    def winfo_children(self):
+        return [w for w in self.children if w.alive]
+
+    def winfo_exists(self):
+        return self.alive
+
+    def pack(self, **kwargs):
+        self.packed = True
+
+    def pack_forget(self):
+        self.packed = False
+
+    def destroy(self):
+        self.alive = False
+
+
+class TestScreenManager(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeWidget()
+        self.screens = ScreenManager(self.root)
+
+    def test_clear_hides_kept_and_destroys_the_rest(self):
+        sidebar, page = FakeWidget(self.root), FakeWidget(self.root)
+        self.screens.keep(sidebar)
+        self.screens.clear()
+        self.assertTrue(sidebar.alive)
+        self.assertFalse(sidebar.packed)
+        self.assertFalse(page.alive)
+
+    def test_cached_screen_is_reshown_and_reset(self):
+        resets = []
+        billing = FakeWidget(self.root)
+        self.screens.register("billing", billing, reset=lambda: resets.append(1))
+        self.screens.clear()
+        FakeWidget(self.root)  # some other screen
+        self.assertIs(self.screens.show_cached("billing"), billing)
+        self.assertTrue(billing.packed)
+        self.assertEqual(resets, [1])
+        self.assertEqual(self.root.winfo_children(), [billing])
+
+    def test_discard_all_forces_rebuild(self):
+        billing = FakeWidget(self.root)
+        self.screens.register("billing", billing)
+        self.screens.discard_all()
+        self.assertFalse(billing.alive)
+        self.assertIsNone(self.screens.show_cached("billing"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from stock_index import StockIndex
+
+
+def row(stock_id, med_id, name, batch, expiry, qty, barcode=None):
+    return {"id": stock_id, "medicine_id": med_id, "medicine_name": name, "batch_number": batch,
+            "expiry_date": expiry, "quantity": qty, "selling_price": "10.00", "barcode": barcode}
+
+
+class TestStockIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = StockIndex.from_rows([
+            row(1, 10, "Paracetamol 500", "B2", "2027-06-01", 5, barcode="8901234567890"),
+            row(2, 10, "Paracetamol 500", "B1", "2026-12-01", 3, barcode="8901234567890"),
+            row(3, 11, "Amoxicillin 250", "A1", "2027-01-01", 0),
+            row(4, 12, "Cetirizine", "C1", None, 7),
+        ])
+
+    def test_barcode_lookup_is_fefo(self):
+        batches = self.index.lookup_code("8901234567890")
+        self.assertEqual([b['batch_number'] for b in batches], ["B1", "B2"])
+
+    def test_out_of_stock_batches_hidden(self):
+        self.assertEqual(self.index.search("amox"), [])
+
+    def test_prefix_and_substring_search(self):
+        self.assertEqual({b['id'] for b in self.index.search("para")}, {1, 2})
+        self.assertEqual([b['id'] for b in self.index.search("tiriz")], [4])
+
+    def test_apply_sale_and_upsert(self):
+        self.index.apply_sale([{"id": 2, "qty": 3}])
+        self.assertEqual([b['batch_number'] for b in self.index.lookup_code("8901234567890")], ["B2"])
+        self.index.upsert(row(5, 13, "Azithromycin", "Z1", "2026-01-01", 4))
+        self.assertEqual([b['id'] for b in self.index.search("azi")], [5])
+        self.index.upsert(row(3, 11, "Amoxicillin 250", "A1", "2027-01-01", 9))
+        self.assertEqual([b['id'] for b in self.index.search("amox")], [3])
+
+    def test_upsert_moves_codes_and_medicine(self):
+        self.index.upsert(row(1, 10, "Paracetamol 500", "B2", "2027-06-01", 5, barcode="111"))
+        self.index.upsert(row(2, 10, "Paracetamol 500", "B1", "2026-12-01", 3, barcode="111"))
+        self.assertEqual(self.index.lookup_code("8901234567890"), [])
+        self.assertEqual([b['batch_number'] for b in self.index.lookup_code("111")], ["B1", "B2"])
+
+        # Batch re-assigned to another medicine leaves the old one's list
+        self.index.upsert(row(4, 10, "Paracetamol 500", "C1", "2026-01-01", 7, barcode="111"))
+        self.assertEqual([b['id'] for b in self.index.sellable_batches(10)], [4, 2, 1])
+        self.assertEqual(self.index.search("cetiriz"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import threading
+import time
+import unittest
+
+from task_runner import TaskRunner
+
+
+class FakeRoot:
+    """Stands in for the Tk root: queues after() callbacks until pumped"""
+
+    def __init__(self):
+        self.callbacks = []
+        self.thread = threading.current_thread()
+
+    def after(self, ms, fn):
+        self.callbacks.append(fn)
+
+    def pump(self, timeout=2.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            pending, self.callbacks = self.callbacks, []
+            for fn in pending:
+                fn()
+            if not self.callbacks:
+                return
+            time.sleep(0.005)
+
+
+class FakeWidget:
+    def __init__(self):
+        self.alive = True
+
+    def winfo_exists(self):
+        return self.alive
+
+
+class TestTaskRunner(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.runner = TaskRunner(self.root, max_workers=2)
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def test_result_delivered_on_main_thread(self):
+        seen = []
+        self.runner.submit(lambda: 41 + 1, on_success=lambda r: seen.append((r, threading.current_thread())))
+        self.root.pump()
+        self.assertEqual(seen, [(42, self.root.thread)])
+
+    def test_error_goes_to_on_error(self):
+        errors = []
+
+        def boom():
+            raise ValueError("nope")
+
+        self.runner.submit(boom, on_success=lambda r: self.fail("unexpected"), on_error=errors.append)
+        self.root.pump()
+        self.assertIsInstance(errors[0], ValueError)
+
+    def test_same_key_supersedes_previous(self):
+        gate = threading.Event()
+        seen = []
+        self.runner.submit(lambda: gate.wait(1) and "old", on_success=seen.append, key="search")
+        self.runner.submit(lambda: "new", on_success=seen.append, key="search")
+        gate.set()
+        self.root.pump()
+        self.assertEqual(seen, ["new"])
+
+    def test_dead_owner_skips_callback(self):
+        owner = FakeWidget()
+        seen = []
+        self.runner.submit(lambda: 1, on_success=seen.append, owner=owner)
+        owner.alive = False
+        self.root.pump()
+        self.assertEqual(seen, [])
+
+    def test_cancel_all_drops_results(self):
+        gate = threading.Event()
+        seen = []
+        self.runner.submit(lambda: gate.wait(1), on_success=seen.append)
+        self.runner.cancel_all()
+        gate.set()
+        self.root.pump()
+        self.assertEqual(seen, [])
+
+    def test_cancel_all_keeps_persistent_tasks(self):
+        seen = []
+        self.runner.submit(lambda: "cache", on_success=seen.append, persistent=True)
+        self.runner.cancel_all()
+        self.root.pump()
+        self.assertEqual(seen, ["cache"])
+
+    def test_progress_delivered_before_result(self):
+        seen = []
+
+        def work(progress):
+            for i in range(3):
+                progress(i)
+            return "done"
+
+        self.runner.submit(work, on_progress=lambda p: seen.append(("p", p, threading.current_thread())),
+                           on_success=lambda r: seen.append(("r", r, threading.current_thread())))
+        self.root.pump()
+        self.assertEqual([(k, v) for k, v, _ in seen], [("p", 0), ("p", 1), ("p", 2), ("r", "done")])
+        self.assertTrue(all(t is self.root.thread for _, _, t in seen))
+
+    def test_progress_sees_cancellation(self):
+        started, stop = threading.Event(), threading.Event()
+        checks = []
+
+        def work(progress):
+            started.set()
+            stop.wait(1)
+            checks.append(progress.cancelled)
+
+        self.runner.submit(work, on_progress=lambda p: None, key="export")
+        started.wait(1)
+        self.runner.cancel("export")
+        stop.set()
+        self.root.pump()
+        self.assertEqual(checks, [True])
+
+
+if __name__ == '__main__':
+    unittest.main()
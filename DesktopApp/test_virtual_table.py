@@ -0,0 +1,44 @@
+import unittest
+
+from virtual_table import Column, TableModel
+
+
+ROWS = [
+    {"name": "paracetamol", "qty": "120", "amount": "Rs. 1,200.00"},
+    {"name": "Amoxicillin", "qty": "8", "amount": "Rs. 15,000.00"},
+    {"name": "cetirizine", "qty": None, "amount": "Rs. 90.00"},
+]
+
+
+class TestTableModel(unittest.TestCase):
+    def setUp(self):
+        self.model = TableModel([Column("Name", 200, "name"), Column("Qty", 80, "qty"),
+                                 Column("Amount", 100, "amount")], ROWS)
+
+    def test_text_sorts_case_insensitively(self):
+        self.model.sort_by(0)
+        self.assertEqual([r['name'] for r in self.model.rows], ["Amoxicillin", "cetirizine", "paracetamol"])
+
+    def test_numbers_sort_numerically_and_toggle(self):
+        self.model.sort_by(2)
+        self.assertEqual([r['amount'] for r in self.model.rows], ["Rs. 90.00", "Rs. 1,200.00", "Rs. 15,000.00"])
+        self.model.sort_by(2)
+        self.assertEqual(self.model.rows[0]['amount'], "Rs. 15,000.00")
+
+    def test_missing_values_render_as_dash(self):
+        self.assertEqual(self.model.columns[1].text(ROWS[2]), "-")
+
+    def test_window_and_clamp(self):
+        model = TableModel([Column("N", 50, "n")], [{"n": i} for i in range(100)])
+        self.assertEqual(model.clamp(95, 20), 80)
+        self.assertEqual(model.clamp(-5, 20), 0)
+        self.assertEqual([r['n'] for r in model.window(80, 20)][-1], 99)
+
+    def test_new_rows_keep_sort(self):
+        self.model.sort_by(0)
+        self.model.set_rows(ROWS + [{"name": "Azithro", "qty": "1", "amount": "0"}])
+        self.assertEqual(self.model.rows[1]['name'], "Azithro")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,257 @@
+import customtkinter as ctk
+
+
+DEFAULT_TEXT = ("#1e293b", "#f1f5f9")
+
+
+def _natural_key(text):
+    """Sort numbers numerically ("Rs. 1,200.00" < "Rs. 15,000") and text case-insensitively"""
+    cleaned = str(text).replace("Rs.", "").replace(",", "").strip()
+    try:
+        return (0, float(cleaned), "")
+    except ValueError:
+        return (1, 0.0, str(text).lower())
+
+
+class Column:
+    """A VirtualTable column.
+
+    ``value`` is a row key or a callable ``row -> value``; ``sort_key``
+    overrides the natural sort of the displayed text and ``color`` is an
+    optional ``row -> text colour`` (None falls back to the default).
+    """
+
+    def __init__(self, title, width, value=None, sort_key=None, color=None, anchor="center"):
+        self.title = title
+        self.width = width
+        if value is None:
+            value = title
+        self.value = value if callable(value) else (lambda row, key=value: row.get(key))
+        self.sort_key = sort_key
+        self.color = color
+        self.anchor = anchor
+
+    def text(self, row):
+        value = self.value(row)
+        return "-" if value is None or value == "" else str(value)
+
+
+class TableModel:
+    """Rows plus the current sort order; the part of VirtualTable that has no widgets"""
+
+    def __init__(self, columns, rows=()):
+        self.columns = columns
+        self.sort_column = None
+        self.sort_reverse = False
+        self._rows = []
+        self.set_rows(rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def rows(self):
+        return self._rows
+
+    def set_rows(self, rows):
+        self._rows = list(rows)
+        if self.sort_column is not None:
+            self._sort()
+
+    def sort_by(self, index):
+        """Sort by a column; sorting the same column again reverses the order"""
+        if self.sort_column == index:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = index, False
+        self._sort()
+
+    def _sort(self):
+        col = self.columns[self.sort_column]
+        key = col.sort_key or (lambda row: _natural_key(col.text(row)))
+        self._rows.sort(key=key, reverse=self.sort_reverse)
+
+    def window(self, first, count):
+        return self._rows[first:first + count]
+
+    def clamp(self, first, visible):
+        return max(0, min(first, len(self._rows) - visible))
+
+
+class VirtualTable(ctk.CTkFrame):
+    """Scrollable grid that only materializes the rows that are on screen.
+
+    A fixed pool of row widgets (one per visible line) is re-bound to
+    different data rows as the user scrolls, so opening a table with
+    thousands of rows costs the same as one with thirty. Clicking a header
+    sorts by that column.
+
+    ``actions`` are ``(text, command)`` or ``(text, command, button_kwargs)``
+    tuples rendered as buttons at the end of every row; ``command(row)``
+    receives the data row currently shown in that line. ``row_color`` is an
+    optional ``row -> text colour`` applied to columns without their own.
+    ``on_scroll_end()`` is called whenever the view gets within a screenful
+    of the last row, so a pager can prefetch the next page.
+    """
+
+    def __init__(self, master, columns, rows=(), actions=None, row_height=34, action_width=None,
+                 row_color=None, on_scroll_end=None, empty_text="No records found", **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+        self.model = TableModel(columns, rows)
+        self.columns = columns
+        self.actions = actions or []
+        self.row_height = row_height
+        self.row_color = row_color
+        self.on_scroll_end = on_scroll_end
+        self.action_width = action_width or 90 * len(self.actions)
+
+        self._first = 0
+        self._visible = 0
+        self._pool = []  # [(frame, [labels], [buttons], [cached texts])]
+        self._bound = []  # data row shown by each pooled line
+
+        # 1. Header (click to sort)
+        self.header = ctk.CTkFrame(self, fg_color=("#e2e8f0", "#334155"))
+        self.header.pack(fill="x", pady=(0, 2))
+        self._header_buttons = []
+        for i, col in enumerate(columns):
+            btn = ctk.CTkButton(self.header, text=col.title, width=col.width, height=30,
+                                font=("Segoe UI Bold", 12), fg_color="transparent",
+                                text_color=DEFAULT_TEXT, hover_color=("#cbd5e1", "#475569"),
+                                command=lambda i=i: self.sort_by(i))
+            btn.pack(side="left", padx=2)
+            self._header_buttons.append(btn)
+        if self.actions:
+            ctk.CTkLabel(self.header, text="Actions", width=self.action_width,
+                         font=("Segoe UI Bold", 12)).pack(side="left", padx=2)
+
+        # 2. Body + scrollbar
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.empty_lbl = ctk.CTkLabel(self.body, text=empty_text, font=("Segoe UI", 14), text_color="gray")
+
+        self.body.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.body)
+
+    # --- PUBLIC ---
+
+    def set_title(self, index, title):
+        """Relabel a column header (e.g. when a filter changes what it shows)"""
+        self.columns[index].title = title
+        self._header_buttons[index].configure(text=title)
+
+    def set_rows(self, rows):
+        self.model.set_rows(rows)
+        self._first = 0
+        self.refresh()
+
+    def append_rows(self, rows):
+        """Add rows (e.g. the next page) without moving the current view"""
+        self.model.set_rows(self.model.rows + list(rows))
+        self.refresh()
+
+    def sort_by(self, index):
+        self.model.sort_by(index)
+        for i, btn in enumerate(self._header_buttons):
+            arrow = ""
+            if i == index:
+                arrow = " ▼" if self.model.sort_reverse else " ▲"
+            btn.configure(text=self.columns[i].title + arrow)
+        self.refresh()
+
+    def scroll_to(self, first):
+        first = self.model.clamp(first, self._visible)
+        if first != self._first:
+            self._first = first
+            self.refresh()
+
+    def refresh(self):
+        """Re-bind the pooled lines to the rows in the current window"""
+        total = len(self.model)
+        if total == 0:
+            self.empty_lbl.place(relx=0.5, y=40, anchor="n")
+        else:
+            self.empty_lbl.place_forget()
+
+        self._first = self.model.clamp(self._first, self._visible)
+        window = self.model.window(self._first, self._visible)
+        for i, (frame, labels, _, texts) in enumerate(self._pool):
+            if i >= len(window):
+                self._bound[i] = None
+                frame.place_forget()
+                continue
+            row = window[i]
+            self._bound[i] = row
+            base_color = self.row_color(row) if self.row_color else None
+            for j, col in enumerate(self.columns):
+                text = col.text(row)
+                color = (col.color(row) if col.color else None) or base_color or DEFAULT_TEXT
+                if texts[j] != (text, color):
+                    labels[j].configure(text=text, text_color=color)
+                    texts[j] = (text, color)
+            frame.place(x=0, y=i * self.row_height, relwidth=1, height=self.row_height)
+
+        if total:
+            self.scrollbar.set(self._first / total, min(1.0, (self._first + self._visible) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+        if self.on_scroll_end and self._visible and self._first + 2 * self._visible >= total:
+            self.on_scroll_end()
+
+    # --- POOL ---
+
+    def _on_resize(self, event):
+        visible = max(1, event.height // self.row_height)
+        if visible == self._visible:
+            return
+        self._visible = visible
+        while len(self._pool) < visible:
+            self._pool.append(self._make_line(len(self._pool)))
+            self._bound.append(None)
+        self.refresh()
+
+    def _make_line(self, slot):
+        frame = ctk.CTkFrame(self.body, fg_color="transparent", height=self.row_height)
+        labels = []
+        for col in self.columns:
+            lbl = ctk.CTkLabel(frame, text="", width=col.width, anchor=col.anchor)
+            lbl.pack(side="left", padx=2)
+            labels.append(lbl)
+        buttons = []
+        for action in self.actions:
+            text, command = action[0], action[1]
+            options = {"width": 80, "height": 26, **(action[2] if len(action) > 2 else {})}
+            btn = ctk.CTkButton(frame, text=text, command=lambda s=slot, c=command: self._invoke(s, c), **options)
+            btn.pack(side="left", padx=2)
+            buttons.append(btn)
+        for widget in [frame] + labels:
+            self._bind_wheel(widget)
+        return frame, labels, buttons, [None] * len(self.columns)
+
+    def _invoke(self, slot, command):
+        row = self._bound[slot]
+        if row is not None:
+            command(row)
+
+    # --- SCROLLING ---
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel, add="+")
+        widget.bind("<Button-4>", lambda e: self.scroll_to(self._first - 3), add="+")
+        widget.bind("<Button-5>", lambda e: self.scroll_to(self._first + 3), add="+")
+
+    def _on_wheel(self, event):
+        step = -1 if event.delta > 0 else 1
+        self.scroll_to(self._first + step * 3)
+
+    def _on_scrollbar(self, *args):
+        total = len(self.model)
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * total))
+        elif args[0] == "scroll":
+            amount = int(args[1]) * (self._visible if args[2] == "pages" else 1)
+            self.scroll_to(self._first + amount)
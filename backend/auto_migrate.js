@@ -15,6 +15,22 @@ function runAutoMigration(db) {
             definition: "ENUM('ACTIVE', 'INACTIVE', 'SUSPENDED') DEFAULT 'ACTIVE'",
             checkQuery: "SHOW COLUMNS FROM users LIKE 'status'",
             alterQuery: "ALTER TABLE users ADD COLUMN status ENUM('ACTIVE', 'INACTIVE', 'SUSPENDED') DEFAULT 'ACTIVE'"
+        },
+        {
+            // Lets desktop terminals retry queued offline sales without double-posting
+            table: 'sales',
+            column: 'idempotency_key',
+            definition: "VARCHAR(64) NULL UNIQUE",
+            checkQuery: "SHOW COLUMNS FROM sales LIKE 'idempotency_key'",
+            alterQuery: "ALTER TABLE sales ADD COLUMN idempotency_key VARCHAR(64) NULL UNIQUE"
+        },
+        {
+            // PRV-<terminal>-<seq> printed on the invoice before the sale reached the server
+            table: 'sales',
+            column: 'provisional_number',
+            definition: "VARCHAR(32) NULL",
+            checkQuery: "SHOW COLUMNS FROM sales LIKE 'provisional_number'",
+            alterQuery: "ALTER TABLE sales ADD COLUMN provisional_number VARCHAR(32) NULL, ADD INDEX (provisional_number)"
         }
     ];
 
@@ -216,11 +216,56 @@ router.get('/statements', async (req, res) => {
         params.push(val, val, val);
     }
 
-    sql += ' ORDER BY s.created_at DESC, s.id DESC';
+    // Without ?limit= the whole history is returned, newest first, as before.
+    const limit = req.query.limit ? Math.min(parseInt(req.query.limit) || 200, 1000) : null;
+    if (!limit) {
+        sql += ' ORDER BY s.created_at DESC, s.id DESC';
+        try {
+            const [rows] = await db.promise().query(sql, params);
+            return res.json(rows);
+        } catch (error) {
+            return res.status(500).json({ error: error.message });
+        }
+    }
+
+    // Ledger mode: oldest first, a page at a time, keyed by (created_at, id) because
+    // entries can be back-dated. The cursor is "<created_at>|<id>" of the last row sent.
+    if (req.query.cursor) {
+        const [at, id] = String(req.query.cursor).split('|');
+        sql += ' AND (s.created_at > ? OR (s.created_at = ? AND s.id > ?))';
+        params.push(at, at, parseInt(id) || 0);
+    }
+    sql = sql.replace('SELECT s.*,', "SELECT s.*, DATE_FORMAT(s.created_at, '%Y-%m-%d %H:%i:%s') as sort_at,");
+    sql += ' ORDER BY s.created_at ASC, s.id ASC LIMIT ?';
+    params.push(limit + 1);
 
     try {
-        const [rows] = await db.promise().query(sql, params);
-        res.json(rows);
+        const [results] = await db.promise().query(sql, params);
+        const rows = results.slice(0, limit);
+        const last = rows[rows.length - 1];
+        const next_cursor = results.length > limit ? `${last.sort_at}|${last.id}` : null;
+        const page = { rows, next_cursor };
+
+        if (!req.query.cursor) {
+            // Balance of the selected account(s) before the range; later pages carry it forward
+            const accFilter = account_id ? ' AND id = ?' : '';
+            const [[base]] = await db.promise().query(
+                `SELECT COALESCE(SUM(opening_balance), 0) as total FROM sahakari_accounts WHERE client_id = ?${accFilter}`,
+                account_id ? [client_id, account_id] : [client_id]
+            );
+            let moved = 0;
+            if (start_date) {
+                const [[before]] = await db.promise().query(
+                    `SELECT COALESCE(SUM(CASE WHEN type = 'IN' THEN amount ELSE -amount END), 0) as total
+                     FROM karobar_statements
+                     WHERE client_id = ? AND status = 'ACTIVE' AND DATE(created_at) < ?${account_id ? ' AND account_id = ?' : ''}`,
+                    account_id ? [client_id, start_date, account_id] : [client_id, start_date]
+                );
+                moved = parseFloat(before.total);
+            }
+            page.opening_balance = parseFloat(base.total) + moved;
+        }
+        res.json(page);
     } catch (error) {
         res.status(500).json({ error: error.message });
     }
@@ -3,6 +3,7 @@ const router = express.Router();
 const multer = require('multer');
 const path = require('path');
 const fs = require('fs');
+const crypto = require('crypto');
 
 // Configure multer for QR image upload
 const storage = multer.diskStorage({
@@ -277,6 +278,13 @@ router.get('/payment-methods/:id/qr', (req, res) => {
                 return res.status(404).json({ error: 'QR image not found' });
             }
 
+            // Content hash lets terminals revalidate their cached copy with If-None-Match
+            const etag = '"' + crypto.createHash('md5').update(results[0].qr_image_blob).digest('hex') + '"';
+            res.set('ETag', etag);
+            if (req.headers['if-none-match'] === etag) {
+                return res.status(304).end();
+            }
+
             // Convert BLOB to base64
             const base64Image = results[0].qr_image_blob.toString('base64');
             res.json({ qr_image: `data:image/png;base64,${base64Image}` });
@@ -10,7 +10,7 @@ router.get('/search-medicines', (req, res) => {
     const db = getDb(req);
     const query = req.query.q || '';
     const sql = `
-        SELECT id, name, strength, manufacturer, dosage_form, unit,
+        SELECT id, name, generic_name, strength, manufacturer, dosage_form, unit,
                avg_cost, last_purchase_rate, item_code, barcode
         FROM medicines 
         WHERE (name LIKE ? OR generic_name LIKE ? OR barcode = ? OR item_code = ?)
@@ -473,13 +473,38 @@ app.post('/api/super/announcements', authenticateToken, (req, res) => {
 
 // --- SUPER ADMIN REPORTING ENDPOINTS ---
 
+// Platform-wide reports can be very large. With ?limit= they are returned a page
+// at a time as { rows, next_cursor } (keyset on idColumn, newest first) so the
+// desktop can stream an export; without it the full array is returned as before.
+function sendReport(req, res, query, params, idColumn) {
+    const limit = req.query.limit ? Math.min(parseInt(req.query.limit) || 1000, 5000) : null;
+    if (!limit) {
+        return db.query(query + ' ORDER BY s.created_at DESC', params, (err, results) => {
+            if (err) return res.status(500).json({ error: err.message });
+            res.json(results);
+        });
+    }
+    if (req.query.cursor) {
+        query += ` AND ${idColumn} < ?`;
+        params.push(parseInt(req.query.cursor));
+    }
+    query += ` ORDER BY ${idColumn} DESC LIMIT ?`;
+    params.push(limit + 1);
+    db.query(query, params, (err, results) => {
+        if (err) return res.status(500).json({ error: err.message });
+        const rows = results.slice(0, limit);
+        const next_cursor = results.length > limit ? rows[rows.length - 1].row_id : null;
+        res.json({ rows, next_cursor });
+    });
+}
+
 // 1. Sales Report (Summary of all bills)
 app.get('/api/super/reports/sales', authenticateToken, (req, res) => {
     if (req.user.role !== 'SUPER_ADMIN') return res.sendStatus(403);
     const { client_id, start_date, end_date } = req.query;
 
     let query = `
-        SELECT s.*, c.pharmacy_name, u.name as cashier_name 
+        SELECT s.*, s.id as row_id, c.pharmacy_name, u.name as cashier_name 
         FROM sales s 
         JOIN clients c ON s.client_id = c.id 
         JOIN users u ON s.cashier_id = u.id 
@@ -500,12 +525,7 @@ app.get('/api/super/reports/sales', authenticateToken, (req, res) => {
         params.push(end_date);
     }
 
-    query += ' ORDER BY s.created_at DESC';
-
-    db.query(query, params, (err, results) => {
-        if (err) return res.status(500).json({ error: err.message });
-        res.json(results);
-    });
+    sendReport(req, res, query, params, 's.id');
 });
 
 // 2. Item-wise Sales Report
@@ -514,7 +534,7 @@ app.get('/api/super/reports/item-wise', authenticateToken, (req, res) => {
     const { client_id, start_date, end_date } = req.query;
 
     let query = `
-        SELECT si.*, m.name as medicine_name, s.bill_number, s.created_at, c.pharmacy_name 
+        SELECT si.*, si.id as row_id, m.name as medicine_name, s.bill_number, s.created_at, c.pharmacy_name 
         FROM sale_items si 
         JOIN sales s ON si.sale_id = s.id 
         JOIN medicines m ON si.medicine_id = m.id 
@@ -536,12 +556,7 @@ app.get('/api/super/reports/item-wise', authenticateToken, (req, res) => {
         params.push(end_date);
     }
 
-    query += ' ORDER BY s.created_at DESC';
-
-    db.query(query, params, (err, results) => {
-        if (err) return res.status(500).json({ error: err.message });
-        res.json(results);
-    });
+    sendReport(req, res, query, params, 'si.id');
 });
 
 // 3. Top Selling Products
@@ -1500,18 +1515,64 @@ app.get('/api/inventory/stock-levels', authenticateToken, (req, res) => {
     });
 });
 
+// Sellable Stock (one row per batch) for the billing terminal's lookup index and product search
+app.get('/api/inventory/stock', authenticateToken, (req, res) => {
+    const { client_id } = req.user;
+    const { query } = req.query;
+    let sql = `
+        SELECT s.id, s.medicine_id, m.name as medicine_name, m.barcode, m.item_code,
+               s.batch_number, s.expiry_date, s.quantity, s.selling_price
+        FROM stocks s
+        JOIN medicines m ON s.medicine_id = m.id
+        WHERE s.client_id = ? AND s.quantity > 0
+    `;
+    const params = [client_id];
+    if (query) {
+        sql += ' AND (m.name LIKE ? OR m.generic_name LIKE ? OR m.barcode = ? OR m.item_code = ?)';
+        params.push(`%${query}%`, `%${query}%`, query, query);
+    }
+    sql += ' ORDER BY m.name ASC, s.expiry_date ASC';
+    db.query(sql, params, (err, results) => {
+        if (err) return res.status(500).json({ error: err.message });
+        res.json(results);
+    });
+});
+
+// Bill number of a sale posted with this Idempotency-Key (desktop journal reconciliation)
+app.get('/api/sales/by-key/:key', authenticateToken, (req, res) => {
+    const { client_id } = req.user;
+    db.query('SELECT bill_number, provisional_number FROM sales WHERE client_id = ? AND idempotency_key = ?', [client_id, req.params.key], (err, rows) => {
+        if (err) return res.status(500).json({ error: err.message });
+        if (!rows.length) return res.status(404).json({ error: 'No sale with this key' });
+        res.json(rows[0]);
+    });
+});
+
 // Sales (Billing)
 app.post('/api/sales', authenticateToken, (req, res) => {
     const { client_id, id: userId } = req.user;
-    const { customer_name, customer_contact, customer_sex, invoice_date, customer_address, total_amount, vat_amount, discount_amount, grand_total, items, payment_category, payment_method_id, paid_amount, transaction_ref } = req.body;
+    const { customer_name, customer_contact, customer_sex, invoice_date, customer_address, total_amount, vat_amount, discount_amount, grand_total, items, payment_category, payment_method_id, paid_amount, transaction_ref, provisional_number } = req.body;
+    const idempotency_key = req.get('Idempotency-Key') || req.body.idempotency_key || null;
 
     const bill_number = 'INV-' + Date.now();
 
-    db.beginTransaction((err) => {
+    // A retried sale (same idempotency key) returns the original bill instead of selling twice
+    const replyExisting = (fallback) => {
+        db.query('SELECT bill_number FROM sales WHERE client_id = ? AND idempotency_key = ?', [client_id, idempotency_key], (err, rows) => {
+            if (!err && rows.length) return res.json({ message: 'Sale already recorded', bill_number: rows[0].bill_number, duplicate: true });
+            fallback();
+        });
+    };
+
+    const recordSale = () => db.beginTransaction((err) => {
         if (err) return res.status(500).json({ error: err.message });
 
-        const saleQuery = 'INSERT INTO sales (client_id, cashier_id, customer_name, customer_contact, customer_sex, invoice_date, customer_address, bill_number, total_amount, vat_amount, discount_amount, grand_total, payment_category, payment_method_id, paid_amount, transaction_ref) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)';
-        db.query(saleQuery, [client_id, userId, customer_name, customer_contact, customer_sex || 'Other', invoice_date || new Date(), customer_address, bill_number, total_amount, vat_amount, discount_amount, grand_total, payment_category || 'CASH', payment_method_id || null, paid_amount || grand_total, transaction_ref || null], (err, result) => {
+        const saleQuery = 'INSERT INTO sales (client_id, cashier_id, customer_name, customer_contact, customer_sex, invoice_date, customer_address, bill_number, idempotency_key, provisional_number, total_amount, vat_amount, discount_amount, grand_total, payment_category, payment_method_id, paid_amount, transaction_ref) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)';
+        db.query(saleQuery, [client_id, userId, customer_name, customer_contact, customer_sex || 'Other', invoice_date || new Date(), customer_address, bill_number, idempotency_key, provisional_number || null, total_amount, vat_amount, discount_amount, grand_total, payment_category || 'CASH', payment_method_id || null, paid_amount || grand_total, transaction_ref || null], (err, result) => {
+            if (err && err.code === 'ER_DUP_ENTRY' && idempotency_key) {
+                // Lost a race with a concurrent retry of the same sale
+                return db.rollback(() => replyExisting(() => res.status(409).json({ error: err.message })));
+            }
             if (err) return db.rollback(() => res.status(500).json({ error: err.message }));
 
             const saleId = result.insertId;
@@ -1548,6 +1609,9 @@ app.post('/api/sales', authenticateToken, (req, res) => {
             });
         });
     });
+
+    if (idempotency_key) replyExisting(recordSale);
+    else recordSale();
 });
 
 // REPORTS (CLIENT LEVEL)
@@ -1619,44 +1683,122 @@ app.get('/api/reports/items', authenticateToken, (req, res) => {
 });
 
 
-// 3. Bill Log (Invoice History)
-app.get('/api/sales/log', authenticateToken, (req, res) => {
+// 2b. Report Sync - sales (with their items) after a given id, for the desktop's local report cache.
+// Sales are never updated in place, but ids are allocated before a sale's transaction commits, so a
+// sale with a higher id can become visible first. Only sales older than REPORT_SYNC_LAG are returned:
+// by then every lower id has committed (or rolled back), so the client may advance its cursor past them.
+const REPORT_SYNC_LAG = 'INTERVAL 2 MINUTE';
+app.get('/api/reports/sync', authenticateToken, (req, res) => {
     const { client_id } = req.user;
-    const { search, start_date, end_date, payment_method } = req.query;
+    const sinceId = parseInt(req.query.since_id, 10) || 0;
+    const limit = Math.min(parseInt(req.query.limit, 10) || 2000, 5000);
 
-    let query = `
-        SELECT s.id, s.bill_number, s.created_at, s.customer_name, s.customer_contact, 
-               s.payment_category, s.grand_total, s.status,
-               u.name as sold_by
+    const salesQuery = `
+        SELECT s.id, s.bill_number, DATE_FORMAT(s.created_at, '%Y-%m-%d') as day, s.created_at,
+               s.customer_name, s.payment_category, s.cashier_id, u.name as cashier_name,
+               s.grand_total as amount, s.discount_amount as discount
         FROM sales s
-        LEFT JOIN users u ON s.user_id = u.id
-        WHERE s.client_id = ?
+        LEFT JOIN users u ON s.cashier_id = u.id
+        WHERE s.client_id = ? AND s.id > ? AND s.created_at < NOW() - ${REPORT_SYNC_LAG}
+        ORDER BY s.id ASC
+        LIMIT ?
     `;
+    db.query(salesQuery, [client_id, sinceId, limit], (err, sales) => {
+        if (err) return res.status(500).json({ error: err.message });
+        if (!sales.length) return res.json({ sales: [], items: [], last_id: sinceId, has_more: false });
+
+        const lastId = sales[sales.length - 1].id;
+        const itemsQuery = `
+            SELECT si.sale_id, si.medicine_id, COALESCE(m.name, CONCAT('Deleted item #', si.medicine_id)) as name,
+                   si.batch_number, si.quantity as qty, si.total_price as amount
+            FROM sale_items si
+            JOIN sales s ON si.sale_id = s.id
+            LEFT JOIN medicines m ON si.medicine_id = m.id
+            WHERE s.client_id = ? AND si.sale_id > ? AND si.sale_id <= ?
+        `;
+        db.query(itemsQuery, [client_id, sinceId, lastId], (err, items) => {
+            if (err) return res.status(500).json({ error: err.message });
+            res.json({ sales, items, last_id: lastId, has_more: sales.length === limit });
+        });
+    });
+});
+
+// 3. Bill Log (Invoice History)
+// Shared WHERE clause for the bill log list and its count
+function salesLogFilter(client_id, query) {
+    const { search, start_date, end_date, payment_method } = query;
+    let where = ' WHERE s.client_id = ?';
     const params = [client_id];
 
     if (search) {
-        query += ' AND (s.bill_number LIKE ? OR s.customer_name LIKE ? OR s.customer_contact LIKE ?)';
+        where += ' AND (s.bill_number LIKE ? OR s.customer_name LIKE ? OR s.customer_contact LIKE ?)';
         const term = `%${search}%`;
         params.push(term, term, term);
     }
     if (start_date) {
-        query += ' AND DATE(s.created_at) >= ?';
+        where += ' AND DATE(s.created_at) >= ?';
         params.push(start_date);
     }
     if (end_date) {
-        query += ' AND DATE(s.created_at) <= ?';
+        where += ' AND DATE(s.created_at) <= ?';
         params.push(end_date);
     }
     if (payment_method && payment_method !== 'All') {
-        query += ' AND s.payment_category = ?';
+        where += ' AND s.payment_category = ?';
         params.push(payment_method);
     }
+    return { where, params };
+}
 
-    query += ' ORDER BY s.created_at DESC LIMIT 500';
+// With ?limit= the log is returned a page at a time: { rows, next_cursor }.
+// The cursor is the last sale id of the page (ids follow created_at), so
+// each page is an index range scan no matter how deep the user scrolls.
+// Without ?limit= the old capped array is returned.
+app.get('/api/sales/log', authenticateToken, (req, res) => {
+    const { client_id } = req.user;
+    const { where, params } = salesLogFilter(client_id, req.query);
+    const limit = req.query.limit ? Math.min(parseInt(req.query.limit) || 100, 500) : null;
+
+    let query = `
+        SELECT s.id, s.bill_number, s.created_at, s.customer_name, s.customer_contact, 
+               s.payment_category, s.grand_total, s.status,
+               u.name as sold_by
+        FROM sales s
+        LEFT JOIN users u ON s.user_id = u.id
+    ` + where;
+
+    if (!limit) {
+        query += ' ORDER BY s.created_at DESC LIMIT 500';
+        return db.query(query, params, (err, results) => {
+            if (err) return res.status(500).json({ error: err.message });
+            res.json(results);
+        });
+    }
+
+    if (req.query.cursor) {
+        query += ' AND s.id < ?';
+        params.push(parseInt(req.query.cursor));
+    }
+    // Fetch one extra row to know whether another page exists
+    query += ' ORDER BY s.id DESC LIMIT ?';
+    params.push(limit + 1);
 
     db.query(query, params, (err, results) => {
         if (err) return res.status(500).json({ error: err.message });
-        res.json(results);
+        const rows = results.slice(0, limit);
+        const next_cursor = results.length > limit ? rows[rows.length - 1].id : null;
+        res.json({ rows, next_cursor });
+    });
+});
+
+// Count-only query for the bill log header
+app.get('/api/sales/log/count', authenticateToken, (req, res) => {
+    const { client_id } = req.user;
+    const { where, params } = salesLogFilter(client_id, req.query);
+
+    db.query('SELECT COUNT(*) as total FROM sales s' + where, params, (err, results) => {
+        if (err) return res.status(500).json({ error: err.message });
+        res.json({ total: results[0].total });
     });
 });
 
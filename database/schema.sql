@@ -81,6 +81,8 @@ CREATE TABLE IF NOT EXISTS sales (
     customer_name VARCHAR(100),
     customer_contact VARCHAR(20),
     bill_number VARCHAR(50) UNIQUE,
+    idempotency_key VARCHAR(64) UNIQUE,
+    provisional_number VARCHAR(32),
     total_amount DECIMAL(10, 2),
     vat_amount DECIMAL(10, 2),
     discount_amount DECIMAL(10, 2),